@@ -1,53 +1,552 @@
 import os
+import json
 import sys
 import argparse
-import asyncio
-from src.scanner import CursorVersionScanner
-from src.formatter import ReadmeFormatter
-from src.utils import logger
+from typing import TYPE_CHECKING
+# 顶层只导入轻量模块；asyncio、HTTP客户端和扫描器在需要联网的子命令中按需导入，
+# 使 query 等只读取本地文件的子命令能够快速启动
+from src.store import VersionStore
+from src.utils import logger, save_json_file
 
-async def main():
+if TYPE_CHECKING:
+    from src.http_client import AsyncHttpClient
+    from src.metrics import RunMetrics
+    from src.pipeline import VersionPipeline
+    from src.scanner import CursorVersionScanner
+
+def write_ci_output(output_file: str, result: dict) -> None:
+    """以 key=value 形式追加检查结果，供 CI 步骤读取"""
+    with open(output_file, "a", encoding="utf-8") as f:
+        f.write(f"new_version={'true' if result.get('new_version') else 'false'}\n")
+        f.write(f"version={result.get('version') or ''}\n")
+
+def run_migrate(args: argparse.Namespace) -> None:
+    """在紧凑格式与完整格式之间转换数据文件"""
+    store = VersionStore.load(args.data_file)
+    store.set_compact(args.format == "compact")
+
+    if not save_json_file(args.data_file, store.to_data()):
+        logger.error(f"转换数据文件失败: {args.data_file}")
+        sys.exit(1)
+
+    logger.info(f"已将 {args.data_file} 转换为{'紧凑' if store.compact else '完整'}格式，共 {len(store)} 个版本")
+
+    if args.index_file:
+        from src.index import build_index
+
+        build_index(args.data_file, args.index_file)
+        logger.info(f"已重建版本索引: {args.index_file}")
+
+def run_benchmark(args: argparse.Namespace) -> None:
+    """运行基准测试，保存结果并与基线比较"""
+    from src.benchmark import compare_results, format_results, load_results, run_benchmarks
+
+    report = run_benchmarks(args.sizes, repeat=args.repeat, seed=args.seed)
+    for line in format_results(report):
+        logger.info(line)
+
+    if args.output:
+        save_json_file(args.output, report)
+        logger.info(f"已保存基准测试结果: {args.output}")
+
+    if args.compare:
+        baseline = load_results(args.compare)
+        if baseline is None:
+            sys.exit(1)
+        regressions = compare_results(report, baseline, threshold=args.threshold)
+        for item in regressions:
+            logger.error(
+                f"性能回归: {item['size']} 个版本 {item['stage']} {item['metric']} "
+                f"{item['baseline']:.4g} -> {item['current']:.4g}（x{item['ratio']:.2f}）"
+            )
+        if regressions:
+            sys.exit(1)
+        logger.info("与基线相比没有性能回归")
+
+async def run_verify_links(args: argparse.Namespace) -> None:
+    """检查下载链接，保存报告，并按需在数据文件中标记失效链接"""
+    from datetime import timedelta
+    from src.http_client import AsyncHttpClient
+    from src.link_checker import LinkChecker, mark_dead_links
+
+    store = VersionStore.load(args.data_file)
+    async with AsyncHttpClient(
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        limit=args.concurrency,
+        limit_per_host=args.per_host,
+    ) as http_client:
+        checker = LinkChecker(
+            http_client,
+            cache_file=args.cache_file or f"{os.path.splitext(args.data_file)[0]}.links.json",
+            ttl=timedelta(hours=args.ttl_hours),
+            max_concurrency=args.concurrency,
+            per_host=args.per_host,
+            max_retries=args.max_retries,
+        )
+        report = await checker.check(store, force=args.force)
+
+    save_json_file(args.report, report)
+    logger.info(
+        f"共 {report['total']} 个链接，本次检查 {report['checked']} 个，"
+        f"失效 {len(report['dead'])} 个，暂时无法确认 {len(report['unknown'])} 个，报告已保存到 {args.report}"
+    )
+
+    if args.mark_dead and mark_dead_links(store, report["dead"], report["unknown"]):
+        if not save_json_file(args.data_file, store.to_data()):
+            logger.error(f"保存数据文件失败: {args.data_file}")
+            sys.exit(1)
+        if args.index_file:
+            from src.index import update_index
+
+            update_index(args.data_file, args.index_file)
+        logger.info(f"已在数据文件中标记失效链接: {args.data_file}")
+
+async def run_enrich(args: argparse.Namespace) -> None:
+    """为数据文件中缺少安装包信息的版本补充元数据，定期保存以便中断后继续"""
+    from src.http_client import AsyncHttpClient
+
+    store = VersionStore.load(args.data_file)
+
+    def checkpoint() -> None:
+        if not save_json_file(args.data_file, store.to_data()):
+            logger.error(f"保存数据文件失败: {args.data_file}")
+            sys.exit(1)
+        store.dirty = False
+
+    async with AsyncHttpClient(
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+    ) as http_client:
+        enricher = build_enricher(args, http_client)
+        entries = [entry for entry in store if enricher.needs_enrichment(store, entry)]
+        if args.limit is not None:
+            entries = entries[:args.limit]
+        await enricher.enrich(store, entries, checkpoint=checkpoint, checkpoint_every=args.checkpoint_every)
+
+    if args.index_file:
+        from src.index import update_index
+
+        update_index(args.data_file, args.index_file)
+
+def run_query(args: argparse.Namespace) -> None:
+    """按条件查询版本数据并输出 JSON 或下载链接，没有匹配结果时以非零状态退出"""
+    from src.query import VersionQuery, parse_specifier, result_urls
+
+    try:
+        specifier = parse_specifier(args.spec) if args.spec else None
+    except ValueError as e:
+        logger.error(f"无效的版本范围: {args.spec}, 错误: {e}")
+        sys.exit(2)
+
+    with VersionQuery(args.data_file, args.index_file) as query:
+        results = query.find(
+            platform=args.platform,
+            arch=args.arch,
+            specifier=specifier,
+            build_id=args.build_id,
+            since=args.since,
+            until=args.until,
+            limit=1 if args.latest else args.limit,
+            prereleases=True if args.pre else None,
+        )
+
+    if args.output_format == "urls":
+        output = "\n".join(result_urls(results))
+    else:
+        output = json.dumps(results, ensure_ascii=False, indent=2)
+    if output:
+        try:
+            print(output)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # 输出被 head 等命令提前关闭时静默退出；把标准输出指向 devnull，避免退出时再次刷新报错
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return
+    if not results:
+        sys.exit(1)
+
+async def run_backfill(args: argparse.Namespace) -> None:
+    """探测候选的历史构建，把确认存在的版本合并进数据文件"""
+    from src.backfill import DEFAULT_PROBE_TARGETS, HistoryBackfill, load_candidates
+    from src.http_client import AsyncHttpClient
+    from src.scanner import CursorVersionScanner
+
+    scanner = CursorVersionScanner(args.data_file, index_file=args.index_file)
+    candidates = [candidate for file_path in args.candidates for candidate in load_candidates(file_path, scanner)]
+    async with AsyncHttpClient(
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        limit=args.concurrency,
+        limit_per_host=args.per_host,
+    ) as http_client:
+        backfill = HistoryBackfill(
+            scanner,
+            http_client,
+            checkpoint_file=args.checkpoint_file or f"{os.path.splitext(args.data_file)[0]}.backfill.json",
+            max_concurrency=args.concurrency,
+            per_host=args.per_host,
+            rate=args.rate,
+            max_retries=args.max_retries,
+            probe_targets=None if args.probe_all else DEFAULT_PROBE_TARGETS,
+            probe_base_url=args.probe_base_url,
+            batch_size=args.batch_size,
+        )
+        report = await backfill.run(candidates)
+
+    logger.info(
+        f"共探测 {report['probed']} 个候选构建，确认 {report['confirmed']} 个，"
+        f"暂时无法确认 {report['unresolved']} 个，新增版本: {', '.join(report['added']) or '无'}"
+    )
+
+async def run_mirror(args: argparse.Namespace) -> None:
+    """把选定平台的安装包下载到本地镜像目录，中断后再次运行会继续未完成的下载"""
+    from src.http_client import AsyncHttpClient
+    from src.mirror import ArtifactMirror
+
+    megabyte = 1024 * 1024
+    store = VersionStore.load(args.data_file)
+    async with AsyncHttpClient(
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        limit=args.concurrency,
+        limit_per_host=args.per_host,
+    ) as http_client:
+        mirror = ArtifactMirror(
+            http_client,
+            args.dest,
+            max_concurrency=args.concurrency,
+            per_host=args.per_host,
+            chunk_size=int(args.chunk_size_mb * megabyte),
+            bandwidth=args.bandwidth_mb * megabyte if args.bandwidth_mb else None,
+            per_host_bandwidth=args.per_host_bandwidth_mb * megabyte if args.per_host_bandwidth_mb else None,
+            max_retries=args.max_retries,
+            verify=not args.no_verify,
+        )
+        items = mirror.select(store, platforms=args.platforms, archs=args.archs, versions=args.versions, latest=args.latest)
+        logger.info(f"需要镜像的安装包: {len(items)} 个")
+        report = await mirror.mirror(items)
+
+    if report["failed"]:
+        sys.exit(1)
+
+async def serve_api(args: argparse.Namespace) -> None:
+    """运行本地模拟下载接口，直到收到中断信号"""
+    import asyncio
+
+    from src.standin_api import StandInDownloadApi, fixtures_from_release, load_fixtures
+
+    if args.fixtures:
+        fixtures = load_fixtures(args.fixtures)
+    else:
+        latest = VersionStore.load(args.data_file).latest()
+        if not latest:
+            logger.error(f"数据文件中没有版本信息: {args.data_file}")
+            sys.exit(1)
+        fixtures = fixtures_from_release(latest["version"], latest["build_id"], tracks=args.tracks)
+
+    api = StandInDownloadApi(
+        fixtures,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        etag=not args.no_etag,
+        seed=args.seed,
+    )
+    await api.start(args.host, args.port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+
+def build_enricher(args: argparse.Namespace, http_client: "AsyncHttpClient"):
+    """根据命令行参数创建安装包信息补充器"""
+    from src.enricher import ArtifactEnricher
+
+    return ArtifactEnricher(http_client, checksum=args.sha256, max_retries=args.max_retries)
+
+def build_pipeline(args: argparse.Namespace, scanner: "CursorVersionScanner") -> "VersionPipeline":
+    """根据命令行参数创建版本处理流程"""
+    from src.pipeline import VersionPipeline
+
+    return VersionPipeline(
+        scanner,
+        readme_file=None if args.update_only else args.readme_file,
+        shard_dir=args.shard_dir,
+        readme_limit=args.readme_limit,
+        enricher=build_enricher(args, scanner.http_client) if args.enrich or args.sha256 else None,
+    )
+
+def write_metrics(args: argparse.Namespace, metrics: "RunMetrics") -> None:
+    """按参数保存运行报告和 Prometheus 指标，运行失败时同样保存"""
+    if args.metrics_file and metrics.write_report(args.metrics_file):
+        logger.info(f"已保存运行报告: {args.metrics_file}")
+    if args.prometheus_file and metrics.write_prometheus(args.prometheus_file):
+        logger.info(f"已保存 Prometheus 指标: {args.prometheus_file}")
+
+def write_profile(profiler, output_file: str) -> None:
+    """保存 cProfile 统计数据，并输出累计耗时最多的函数"""
+    import io
+    import pstats
+
+    profiler.dump_stats(output_file)
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(20)
+    logger.info(f"已保存性能分析数据: {output_file}（可用 python -m pstats {output_file} 查看）")
+    logger.debug(stream.getvalue())
+
+async def run_scan(args: argparse.Namespace, metrics: "RunMetrics") -> None:
+    """检查或更新版本数据并按需更新README"""
+    from src.http_client import AsyncHttpClient
+    from src.scanner import CursorVersionScanner
+
+    state_file = None
+    if not args.no_conditional:
+        state_file = args.state_file or f"{os.path.splitext(args.data_file)[0]}.state.json"
+
+    async with AsyncHttpClient(
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+    ) as http_client:
+        scanner = CursorVersionScanner(
+            args.data_file,
+            max_concurrency=args.max_concurrency,
+            fetch_timeout=args.fetch_timeout,
+            http_client=http_client,
+            state_file=state_file,
+            probe_platform=None if args.no_probe else args.probe_platform,
+            tracks=args.tracks,
+            index_file=args.index_file,
+            metrics=metrics,
+            max_retries=args.max_retries,
+            api_base_url=args.api_base_url,
+        )
+
+        if args.command == "watch":
+            from src.watcher import VersionWatcher
+
+            watcher = VersionWatcher(
+                build_pipeline(args, scanner),
+                min_interval=args.min_interval,
+                max_interval=args.max_interval,
+                backoff=args.backoff,
+                jitter=args.jitter,
+                on_poll=lambda result: write_metrics(args, metrics),
+            )
+            watcher.install_signal_handlers()
+            await watcher.run(max_polls=args.max_polls)
+            return
+
+        if args.check_only:
+            has_new = await scanner.check_new_version()
+            metrics.result = {"success": True, "new_version": has_new}
+        else:
+            result = await build_pipeline(args, scanner).run(probe=args.check_and_update)
+
+    if args.check_only:
+        if has_new:
+            logger.info("检测到新版本")
+            sys.exit(0)
+        else:
+            logger.info("没有新版本")
+            sys.exit(1)
+
+    if args.check_and_update and args.ci_output:
+        write_ci_output(args.ci_output, result)
+
+    if not result["success"]:
+        logger.error("检查或更新版本数据失败")
+        sys.exit(1)
+
+    if result["new_version"]:
+        logger.info(f"检测到新版本: {result['version']}")
+
+    logger.info("处理完成")
+
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数并补全派生的默认值"""
     parser = argparse.ArgumentParser(description="Cursor版本扫描器")
     parser.add_argument("--data-file", default="versions.json", help="版本数据文件路径")
     parser.add_argument("--readme-file", default="README.md", help="README文件路径")
+    parser.add_argument("--shard-dir", help="按主版本号分页输出的目录（如 docs/versions），README只保留最新版本")
+    parser.add_argument("--readme-limit", type=int, default=30, help="分页输出时README中保留的最新版本数")
     parser.add_argument("--update-only", action="store_true", help="只更新版本数据，不更新README")
     parser.add_argument("--check-only", action="store_true", help="只检查是否有新版本")
+    parser.add_argument("--check-and-update", action="store_true", help="只获取一次版本信息，有新版本时更新数据和README")
+    parser.add_argument("--ci-output", default=os.environ.get("GITHUB_OUTPUT"), help="检查结果输出文件（默认读取 GITHUB_OUTPUT）")
+    parser.add_argument("--state-file", help="记录 ETag/Last-Modified 的状态文件路径（默认与数据文件同名的 .state.json）")
+    parser.add_argument("--no-conditional", action="store_true", help="不发送条件请求，每次都获取完整响应")
+    parser.add_argument("--index-file", help="版本索引文件路径（默认与数据文件同名的 .idx）")
+    parser.add_argument("--no-index", action="store_true", help="不维护版本索引文件")
+    parser.add_argument("--probe-platform", default="linux-x64", help="检查新版本时先请求的代表平台")
+    parser.add_argument("--no-probe", action="store_true", help="检查新版本时直接请求全部平台")
+    parser.add_argument("--tracks", nargs="+", default=["latest"], help="需要扫描的发布通道，如 latest stable prerelease")
+    parser.add_argument("--max-concurrency", type=int, default=7, help="所有发布通道和平台共享的同时请求数上限")
+    parser.add_argument("--fetch-timeout", type=float, default=60, help="获取所有平台的整体超时时间（秒）")
+    parser.add_argument("--connect-timeout", type=float, default=5, help="建立连接的超时时间（秒）")
+    parser.add_argument("--read-timeout", type=float, default=10, help="读取响应的超时时间（秒）")
+    parser.add_argument("--api-base-url", default=os.environ.get("CURSOR_API_BASE_URL"), help="下载接口的基础地址，用于指向本地模拟服务（默认读取 CURSOR_API_BASE_URL）")
+    parser.add_argument("--enrich", action="store_true", help="保存前为新版本补充安装包大小和 ETag")
+    parser.add_argument("--sha256", action="store_true", help="补充安装包信息时同时计算 SHA-256（需要下载完整安装包）")
+    parser.add_argument("--max-retries", type=int, default=2, help="请求无响应、429 或 5xx 时的最大重试次数")
+    parser.add_argument("--metrics-file", help="保存各阶段耗时和请求延迟的 JSON 运行报告")
+    parser.add_argument("--prometheus-file", help="以 Prometheus textfile 格式保存运行指标")
+    parser.add_argument("--profile", nargs="?", const="scanner.prof", help="用 cProfile 分析本次运行并保存统计数据（默认 scanner.prof）")
     parser.add_argument("--verbose", action="store_true", help="显示详细日志")
+
+    subparsers = parser.add_subparsers(dest="command")
+    migrate_parser = subparsers.add_parser("migrate", help="转换数据文件的存储格式")
+    migrate_parser.add_argument("--format", choices=["compact", "full"], default="compact", help="目标格式")
+    watch_parser = subparsers.add_parser("watch", help="常驻运行，按自适应间隔轮询新版本")
+    watch_parser.add_argument("--min-interval", type=float, default=300, help="检测到新版本后的轮询间隔（秒）")
+    watch_parser.add_argument("--max-interval", type=float, default=3600, help="没有新版本时逐步退避到的最大间隔（秒）")
+    watch_parser.add_argument("--backoff", type=float, default=2.0, help="每次没有新版本时间隔的增长倍数")
+    watch_parser.add_argument("--jitter", type=float, default=0.1, help="轮询间隔的随机抖动比例")
+    watch_parser.add_argument("--max-polls", type=int, help="最多轮询次数，默认不限制")
+    importtime_parser = subparsers.add_parser("importtime", help="用 -X importtime 测量检查路径的导入耗时")
+    importtime_parser.add_argument("--budget-ms", type=float, help="导入耗时预算（毫秒），超出时以非零状态退出")
+    links_parser = subparsers.add_parser("verify-links", help="检查历史数据中的下载链接是否仍然可用")
+    links_parser.add_argument("--cache-file", help="检查结果缓存文件（默认与数据文件同名的 .links.json）")
+    links_parser.add_argument("--ttl-hours", type=float, default=168, help="缓存有效期（小时），过期的链接才重新检查")
+    links_parser.add_argument("--concurrency", type=int, default=20, help="同时检查的链接数上限")
+    links_parser.add_argument("--per-host", type=int, default=6, help="同一主机同时检查的链接数上限")
+    links_parser.add_argument("--report", default="links-report.json", help="检查报告输出文件")
+    links_parser.add_argument("--mark-dead", action="store_true", help="在数据文件中标记失效的链接")
+    links_parser.add_argument("--force", action="store_true", help="忽略缓存，重新检查全部链接")
+    enrich_parser = subparsers.add_parser("enrich", help="为已有版本补充安装包大小、ETag 和可选的 SHA-256，可中断后继续")
+    enrich_parser.add_argument("--limit", type=int, help="本次最多处理的版本数（从最新版本开始）")
+    enrich_parser.add_argument("--checkpoint-every", type=int, default=20, help="每处理多少个版本保存一次数据文件")
+    query_parser = subparsers.add_parser("query", help="按平台、架构、版本范围、构建哈希和日期查询版本，输出 JSON 或下载链接")
+    query_parser.add_argument("--platform", help="平台：mac、windows、linux，也可写成 linux-arm64 这样的接口格式")
+    query_parser.add_argument("--arch", help="架构：universal、x64、arm64")
+    query_parser.add_argument("--spec", help="PEP 440 版本范围，如 \">=2.0,<3\"、\"==2.*\"、\"~=2.6.0\"")
+    query_parser.add_argument("--build-id", help="构建哈希或其前缀")
+    query_parser.add_argument("--since", help="最早发布日期（YYYY-MM-DD，包含）")
+    query_parser.add_argument("--until", help="最晚发布日期（YYYY-MM-DD，包含）")
+    query_parser.add_argument("--limit", type=int, help="最多输出的版本数（从最新版本开始）")
+    query_parser.add_argument("--latest", action="store_true", help="只输出最新的一个匹配版本")
+    query_parser.add_argument("--pre", action="store_true", help="包含预发布版本")
+    query_parser.add_argument("--format", dest="output_format", choices=["json", "urls"], default="json", help="输出格式：JSON 或每行一个下载链接")
+    backfill_parser = subparsers.add_parser("backfill", help="探测候选的历史构建并补录确认存在的版本，可中断后继续")
+    backfill_parser.add_argument("candidates", nargs="+", help="候选构建文件：JSON 列表或 versions.json，或每行“版本号 构建哈希 [日期]”/下载链接的文本文件")
+    backfill_parser.add_argument("--checkpoint-file", help="探测进度文件（默认与数据文件同名的 .backfill.json）")
+    backfill_parser.add_argument("--concurrency", type=int, default=10, help="同时进行的探测请求数上限")
+    backfill_parser.add_argument("--per-host", type=int, default=4, help="同一主机同时进行的探测请求数上限")
+    backfill_parser.add_argument("--rate", type=float, default=5.0, help="每秒最多发出的探测请求数")
+    backfill_parser.add_argument("--batch-size", type=int, default=50, help="每批探测的候选数，每批结束后保存数据和进度")
+    backfill_parser.add_argument("--probe-all", action="store_true", help="探测全部平台的安装包（默认只探测 Linux x64 和 Windows x64）")
+    backfill_parser.add_argument("--probe-base-url", help="替换下载链接中的 https://downloads.cursor.com，用于向镜像或本地服务探测")
+    mirror_parser = subparsers.add_parser("mirror", help="按平台和架构把安装包下载到本地目录，支持分块并行下载和断点续传")
+    mirror_parser.add_argument("--dest", default="mirror", help="镜像目录，文件保存为 <目录>/<build_id>/<平台>/<架构>/<文件名>")
+    mirror_parser.add_argument("--platforms", nargs="+", choices=["mac", "windows", "linux"], help="需要镜像的平台（默认全部）")
+    mirror_parser.add_argument("--archs", nargs="+", choices=["universal", "x64", "arm64"], help="需要镜像的架构（默认全部）")
+    mirror_parser.add_argument("--versions", nargs="+", help="只镜像指定的版本号")
+    mirror_parser.add_argument("--latest", type=int, help="只镜像最新的若干个版本")
+    mirror_parser.add_argument("--concurrency", type=int, default=8, help="同时进行的下载请求数上限")
+    mirror_parser.add_argument("--per-host", type=int, default=4, help="同一主机同时进行的下载请求数上限")
+    mirror_parser.add_argument("--chunk-size-mb", type=float, default=8, help="每个 Range 分块的大小（MB）")
+    mirror_parser.add_argument("--bandwidth-mb", type=float, help="全局带宽上限（MB/s）")
+    mirror_parser.add_argument("--per-host-bandwidth-mb", type=float, help="单个主机的带宽上限（MB/s）")
+    mirror_parser.add_argument("--no-verify", action="store_true", help="不校验已记录的大小和 SHA-256")
+    serve_parser = subparsers.add_parser("serve-api", help="启动模拟 Cursor 下载接口的本地服务，用于离线测试")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    serve_parser.add_argument("--port", type=int, default=8000, help="监听端口")
+    serve_parser.add_argument("--fixtures", help="录制的接口响应文件（默认按数据文件中的最新版本生成）")
+    serve_parser.add_argument("--latency", type=float, default=0.0, help="每个响应的延迟（秒）")
+    serve_parser.add_argument("--error-rate", type=float, default=0.0, help="返回 500 的概率")
+    serve_parser.add_argument("--rate-limit", type=int, help="每秒允许的请求数，超出时返回 429")
+    serve_parser.add_argument("--retry-after", type=int, default=1, help="429 响应中 Retry-After 的秒数")
+    serve_parser.add_argument("--no-etag", action="store_true", help="不返回 ETag，也不处理条件请求")
+    serve_parser.add_argument("--seed", type=int, help="错误注入的随机种子")
+    benchmark_parser = subparsers.add_parser("benchmark", help="在合成历史数据上测量各阶段的耗时和峰值内存")
+    benchmark_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="合成历史的版本数")
+    benchmark_parser.add_argument("--repeat", type=int, default=3, help="每个阶段重复次数，取最短耗时")
+    benchmark_parser.add_argument("--seed", type=int, default=0, help="生成合成数据的随机种子")
+    benchmark_parser.add_argument("--output", help="保存结果的 JSON 文件")
+    benchmark_parser.add_argument("--compare", help="与之比较的基线结果 JSON 文件，出现回归时以非零状态退出")
+    benchmark_parser.add_argument("--threshold", type=float, default=0.2, help="允许的增长比例")
+
     args = parser.parse_args()
 
     if args.verbose:
         logger.setLevel("DEBUG")
 
-    scanner = CursorVersionScanner(args.data_file)
+    if args.no_index:
+        args.index_file = None
+    elif not args.index_file:
+        args.index_file = f"{os.path.splitext(args.data_file)[0]}.idx"
+    return args
 
-    if args.check_only:
-        has_new = await scanner.check_new_version()
-        if has_new:
-            logger.info("检测到新版本")
-            sys.exit(0)
-        else:
-            logger.info("没有新版本")
-            sys.exit(1)
+async def main(args: argparse.Namespace):
+    if args.command == "migrate":
+        run_migrate(args)
+        return
 
-    success = await scanner.update_versions()
+    if args.command == "benchmark":
+        run_benchmark(args)
+        return
 
-    if not success:
-        logger.error("更新版本数据失败")
-        sys.exit(1)
+    if args.command == "verify-links":
+        await run_verify_links(args)
+        return
 
-    if not args.update_only:
-        formatter = ReadmeFormatter(args.data_file, args.readme_file)
-        success = formatter.update_readme()
+    if args.command == "enrich":
+        await run_enrich(args)
+        return
 
-        if not success:
-            logger.error("更新README失败")
+    if args.command == "query":
+        run_query(args)
+        return
+
+    if args.command == "backfill":
+        await run_backfill(args)
+        return
+
+    if args.command == "mirror":
+        await run_mirror(args)
+        return
+
+    if args.command == "serve-api":
+        await serve_api(args)
+        return
+
+    if args.command == "importtime":
+        from src.importtime import CHECK_PATH_BUDGET_MS, check_import_budget
+
+        budget_ms = args.budget_ms if args.budget_ms is not None else CHECK_PATH_BUDGET_MS
+        if not check_import_budget(budget_ms, cwd=os.path.dirname(os.path.abspath(__file__))):
             sys.exit(1)
+        return
 
-    logger.info("处理完成")
+    from src.metrics import RunMetrics
+
+    metrics = RunMetrics()
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        await run_scan(args, metrics)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            write_profile(profiler, args.profile)
+        write_metrics(args, metrics)
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        args = parse_args()
+        if args.command == "query":
+            # 查询只读取本地文件，不需要启动事件循环
+            run_query(args)
+        else:
+            import asyncio
+
+            asyncio.run(main(args))
     except KeyboardInterrupt:
         logger.info("用户中断")
         sys.exit(0)
@@ -0,0 +1,227 @@
+import json
+import os
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.http_client import AsyncHttpClient, link_state, probe_with_fallback
+from src.scanner import CursorVersionScanner
+from src.scheduler import FetchScheduler
+from src.utils import DOWNLOAD_BASE_URL, format_date, get_current_timestamp, load_json_file, logger, save_json_file
+
+# 默认只探测这两个安装包，全部存在才视为该构建确实发布过
+DEFAULT_PROBE_TARGETS = (("linux", "x64"), ("windows", "x64"))
+
+def candidate_key(candidate: Dict[str, Any]) -> str:
+    return f"{candidate['version']}:{candidate['build_id']}"
+
+def probe_outcome(statuses: List[Optional[int]]) -> str:
+    """汇总一个候选的探测结果：confirmed（全部可用）、missing（任一 404/410），其余为 unknown（暂时性失败，下次重试）"""
+    states = [link_state(status) for status in statuses]
+    if states and all(state == "ok" for state in states):
+        return "confirmed"
+    if "dead" in states:
+        return "missing"
+    return "unknown"
+
+def load_candidates(file_path: str, scanner: CursorVersionScanner) -> List[Dict[str, Any]]:
+    """读取候选构建，支持以下格式：
+
+    - JSON：候选列表 [{"version", "build_id", "date"?}]、{"candidates": [...]}，或其他归档的 versions.json
+    - 文本：每行 "版本号 构建哈希 [日期]"（空格或逗号分隔），或一个下载链接（从中解析版本号和构建哈希）
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    if file_path.endswith(".json"):
+        data = json.loads(content)
+        if isinstance(data, dict):
+            data = data.get("candidates") or data.get("versions") or []
+        raw = [
+            {key: item[key] for key in ("version", "build_id", "date") if item.get(key)}
+            for item in data
+        ]
+    else:
+        raw = []
+        for line in content.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if "://" in line:
+                release = scanner._extract_release_from_url(line)
+                if release is None:
+                    logger.warning(f"无法从链接中解析版本信息: {line}")
+                    continue
+                raw.append(release)
+                continue
+            fields = line.replace(",", " ").split()
+            if len(fields) < 2:
+                logger.warning(f"无法解析候选构建: {line}")
+                continue
+            candidate = {"version": fields[0], "build_id": fields[1]}
+            if len(fields) > 2:
+                candidate["date"] = fields[2]
+            raw.append(candidate)
+
+    return [candidate for candidate in raw if candidate.get("version") and candidate.get("build_id")]
+
+class HistoryBackfill:
+    """补录轮询之间或项目开始之前发布的历史构建
+
+    按 _ensure_complete_downloads 使用的链接模板为候选 (版本号, 构建哈希) 生成下载链接，
+    通过限速的并发探测确认安装包存在后，经由 process_versions 合并进版本数据。
+    每批的明确结果（确认存在或 404/410）写入检查点文件，中断后再次运行会跳过这些候选；
+    无响应、429 或 5xx 等暂时性失败不记录，下次运行重新探测。
+    """
+
+    def __init__(
+        self,
+        scanner: CursorVersionScanner,
+        http_client: AsyncHttpClient,
+        checkpoint_file: Optional[str] = None,
+        max_concurrency: int = 10,
+        per_host: int = 4,
+        rate: Optional[float] = 5.0,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5,
+        probe_targets: Optional[Iterable[Tuple[str, str]]] = DEFAULT_PROBE_TARGETS,
+        probe_base_url: Optional[str] = None,
+        batch_size: int = 50,
+    ):
+        """初始化
+
+        Args:
+            scanner: 版本扫描器，用于生成下载链接并合并版本数据
+            http_client: 共享的异步HTTP客户端
+            checkpoint_file: 检查点文件路径，None 时不记录进度
+            max_concurrency: 全局同时进行的探测请求数上限
+            per_host: 同一主机同时进行的探测请求数上限
+            rate: 每秒最多发出的探测请求数，None 表示不限制
+            max_retries: 无响应、429 或 5xx 时的最大重试次数
+            retry_backoff: 首次重试前的等待时间（秒）
+            probe_targets: 需要确认存在的 (平台, 架构)，None 表示探测全部安装包
+            probe_base_url: 替换下载链接中的 https://downloads.cursor.com，用于向镜像或本地服务探测
+            batch_size: 每批探测的候选数，每批结束后保存数据和检查点
+        """
+        self.scanner = scanner
+        self.http_client = http_client
+        self.checkpoint_file = checkpoint_file
+        self.scheduler = FetchScheduler(max_concurrency, per_host=per_host, rate=rate)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.probe_targets = list(probe_targets) if probe_targets else None
+        self.probe_base_url = probe_base_url.rstrip("/") if probe_base_url else None
+        self.batch_size = max(1, batch_size)
+        self.checked: Dict[str, Dict[str, Any]] = (
+            load_json_file(checkpoint_file, {}).get("checked", {}) if checkpoint_file and os.path.exists(checkpoint_file) else {}
+        )
+
+    def build_entry(self, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        """按扫描器的链接模板生成版本条目"""
+        entry = {
+            "version": candidate["version"],
+            "date": candidate.get("date") or self.scanner._get_current_date(),
+            "build_id": candidate["build_id"],
+            "downloads": {},
+        }
+        self.scanner._ensure_complete_downloads(entry, candidate["version"], candidate["build_id"])
+        return entry
+
+    def pending(self, candidates: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """去掉已在数据中、已探测过或重复的候选"""
+        store = self.scanner.store
+        pending = []
+        seen = set()
+        for candidate in candidates:
+            key = candidate_key(candidate)
+            checked = self.checked.get(key)
+            if checked and probe_outcome(checked.get("statuses", [])) != "unknown":
+                continue
+            if key in seen or candidate["version"] in store:
+                continue
+            seen.add(key)
+            pending.append(candidate)
+        return pending
+
+    def _probe_url(self, url: str) -> str:
+        if self.probe_base_url and url.startswith(DOWNLOAD_BASE_URL):
+            return self.probe_base_url + url[len(DOWNLOAD_BASE_URL):]
+        return url
+
+    async def _probe(self, url: str) -> Optional[Any]:
+        response, _ = await probe_with_fallback(self.http_client, url, self.max_retries, self.retry_backoff)
+        return response
+
+    def _probe_urls(self, entry: Dict[str, Any]) -> List[str]:
+        downloads = entry["downloads"]
+        if self.probe_targets is None:
+            urls = [url for platform in downloads.values() for url in platform.values()]
+        else:
+            urls = [downloads[platform][arch] for platform, arch in self.probe_targets if arch in downloads.get(platform, {})]
+        return [self._probe_url(url) for url in urls]
+
+    async def _confirm_batch(self, batch: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """探测一批候选，返回 (确认存在的版本条目, 暂时无法确认的候选数)"""
+        candidates = {candidate_key(candidate): candidate for candidate in batch}
+        entries = {key: self.build_entry(candidate) for key, candidate in candidates.items()}
+        jobs = {}
+        hosts = {}
+        for key, entry in entries.items():
+            for url in self._probe_urls(entry):
+                jobs[(key, url)] = lambda url=url: self._probe(url)
+                hosts[(key, url)] = urlparse(url).netloc
+        responses = await self.scheduler.gather(jobs, hosts=hosts)
+
+        confirmed = []
+        unresolved = 0
+        for key, entry in entries.items():
+            results = [responses[(key, url)] for url in self._probe_urls(entry)]
+            statuses = [response.status_code if response is not None else None for response in results]
+            outcome = probe_outcome(statuses)
+            if outcome == "unknown":
+                # 无响应、429 或 5xx 不写入检查点，下次运行重新探测
+                logger.debug(f"暂时无法确认构建 {key}: {statuses}")
+                unresolved += 1
+                continue
+            self.checked[key] = {"ok": outcome == "confirmed", "statuses": statuses, "checked_at": get_current_timestamp()}
+            if outcome == "missing":
+                logger.debug(f"构建不存在 {key}: {statuses}")
+                continue
+
+            # 没有给出发布日期时，以安装包的 Last-Modified 作为发布日期
+            last_modified = results[0].headers.get("Last-Modified")
+            if last_modified and not candidates[key].get("date"):
+                try:
+                    entry["date"] = format_date(parsedate_to_datetime(last_modified))
+                except (TypeError, ValueError):
+                    pass
+            confirmed.append(entry)
+        return confirmed, unresolved
+
+    def _save_checkpoint(self) -> None:
+        if self.checkpoint_file:
+            save_json_file(self.checkpoint_file, {"checked": dict(sorted(self.checked.items()))})
+
+    async def run(self, candidates: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """探测并合并候选构建，返回统计报告"""
+        pending = self.pending(candidates)
+        logger.info(f"需要探测的候选构建: {len(pending)} 个")
+
+        report = {"probed": 0, "confirmed": 0, "unresolved": 0, "added": []}
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            confirmed, unresolved = await self._confirm_batch(batch)
+            report["probed"] += len(batch)
+            report["confirmed"] += len(confirmed)
+            report["unresolved"] += unresolved
+
+            if confirmed:
+                self.scanner.process_versions(confirmed)
+                report["added"].extend(entry["version"] for entry in self.scanner.added_versions)
+                # 先保存版本数据再写检查点，中断时已确认的构建不会丢失
+                if not self.scanner.persist():
+                    raise RuntimeError(f"保存数据失败: {self.scanner.data_file}")
+            self._save_checkpoint()
+            logger.info(f"已探测 {report['probed']}/{len(pending)} 个候选，确认 {report['confirmed']} 个")
+
+        return report
@@ -0,0 +1,192 @@
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.formatter import ReadmeFormatter
+from src.scanner import CursorVersionScanner
+from src.store import VersionStore
+from src.utils import build_download_urls, logger, save_json_file, sort_version_entries
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+# 每个主版本下的次版本数和修订号数，100k 条目约对应 50 个主版本
+_MINORS_PER_MAJOR = 50
+_PATCHES_PER_MINOR = 40
+# 合并阶段新增条目所占比例
+_NEW_ENTRY_RATIO = 0.01
+
+def generate_history(count: int, seed: int = 0) -> Dict[str, Any]:
+    """生成与 versions.json 结构和链接格式一致的合成历史数据（按版本号倒序）
+
+    相同的 count 和 seed 总是生成相同的数据，便于在不同提交之间比较。
+    """
+    rng = random.Random(seed)
+    start = date(2023, 1, 1)
+    versions = []
+    for position in range(count):
+        major, rest = divmod(position, _MINORS_PER_MAJOR * _PATCHES_PER_MINOR)
+        minor, patch = divmod(rest, _PATCHES_PER_MINOR)
+        version = f"{major}.{minor}.{patch}"
+        build_id = f"{rng.getrandbits(160):040x}"
+        downloads = build_download_urls(version, build_id)
+        if rng.random() < 0.05:
+            # 早期版本常缺少 ARM 安装包
+            del downloads["windows"]["arm64"]
+            del downloads["linux"]["arm64"]
+        versions.append({
+            "version": version,
+            "date": (start + timedelta(hours=position)).isoformat(),
+            "build_id": build_id,
+            "downloads": downloads,
+        })
+    versions.reverse()
+    return {"versions": versions, "last_updated": "2026-01-01 00:00:00"}
+
+def _stages(data: Dict[str, Any], work_dir: str, seed: int) -> Dict[str, Callable[[], Callable[[], Any]]]:
+    """各阶段的准备函数，返回只包含被测操作的可调用对象"""
+    versions = data["versions"]
+    data_file = os.path.join(work_dir, "versions.json")
+    save_json_file(data_file, data)
+
+    new_count = max(1, int(len(versions) * _NEW_ENTRY_RATIO))
+    existing_data = {"versions": versions[new_count:]}
+    incoming = versions[:new_count] + versions[new_count:new_count * 2]
+    shuffled = list(versions)
+    random.Random(seed).shuffle(shuffled)
+    output_file = os.path.join(work_dir, "output.json")
+
+    def process_versions() -> Callable[[], Any]:
+        scanner = CursorVersionScanner(data_file, index_file=None)
+        scanner.versions_data = existing_data
+        return lambda: scanner.process_versions(incoming)
+
+    def sort_entries() -> Callable[[], Any]:
+        return lambda: sort_version_entries(shuffled)
+
+    def save_json() -> Callable[[], Any]:
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        return lambda: save_json_file(output_file, data)
+
+    def load_versions() -> Callable[[], Any]:
+        scanner = CursorVersionScanner(data_file, index_file=None)
+        return scanner._load_versions_data
+
+    def generate_table() -> Callable[[], Any]:
+        formatter = ReadmeFormatter(data_file, store=VersionStore(data))
+        return formatter._generate_version_table
+
+    return {
+        "process_versions": process_versions,
+        "sort_version_entries": sort_entries,
+        "save_json_file": save_json,
+        "_load_versions_data": load_versions,
+        "_generate_version_table": generate_table,
+    }
+
+def _measure(setup: Callable[[], Callable[[], Any]], repeat: int) -> Dict[str, float]:
+    """取多次运行的最短耗时，峰值内存单独用 tracemalloc 测量一次，避免影响计时"""
+    timings = []
+    for _ in range(repeat):
+        operation = setup()
+        gc.collect()
+        started = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - started)
+
+    operation = setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": min(timings), "peak_kb": peak / 1024}
+
+def run_benchmarks(sizes: Iterable[int] = DEFAULT_SIZES, repeat: int = 3, seed: int = 0) -> Dict[str, Any]:
+    """在各规模的合成历史上测量每个阶段的耗时和峰值内存
+
+    Returns:
+        可直接保存为 JSON 的结果，results 按规模、阶段组织
+    """
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    previous_level = logger.level
+    logger.setLevel("WARNING")
+    try:
+        for size in sizes:
+            data = generate_history(size, seed)
+            with tempfile.TemporaryDirectory() as work_dir:
+                results[str(size)] = {
+                    name: _measure(setup, repeat)
+                    for name, setup in _stages(data, work_dir, seed).items()
+                }
+    finally:
+        logger.setLevel(previous_level)
+
+    return {
+        "python": platform.python_version(),
+        "platform": sys.platform,
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+    }
+
+def compare_results(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = 0.2,
+    min_seconds: float = 0.001,
+) -> List[Dict[str, Any]]:
+    """与基线结果比较，返回耗时或峰值内存超出 threshold 比例的阶段
+
+    Args:
+        current: 本次运行结果
+        baseline: 基线结果（如上一次提交保存的 JSON）
+        threshold: 允许的增长比例，0.2 表示增长 20% 以内不算回归
+        min_seconds: 两次耗时都低于该值时视为噪声，不比较耗时
+    """
+    regressions = []
+    for size, stages in current.get("results", {}).items():
+        for stage, metrics in stages.items():
+            base = baseline.get("results", {}).get(size, {}).get(stage)
+            if not base:
+                continue
+            for metric in ("seconds", "peak_kb"):
+                if metric == "seconds" and max(metrics[metric], base[metric]) < min_seconds:
+                    continue
+                if base[metric] and metrics[metric] > base[metric] * (1 + threshold):
+                    regressions.append({
+                        "size": int(size),
+                        "stage": stage,
+                        "metric": metric,
+                        "baseline": base[metric],
+                        "current": metrics[metric],
+                        "ratio": metrics[metric] / base[metric],
+                    })
+    return regressions
+
+def format_results(report: Dict[str, Any]) -> List[str]:
+    """把结果整理为便于阅读的表格行"""
+    lines = [f"{'规模':>8}  {'阶段':<26}{'耗时(ms)':>12}{'峰值内存(KB)':>16}"]
+    for size, stages in report["results"].items():
+        for stage, metrics in stages.items():
+            lines.append(f"{size:>8}  {stage:<26}{metrics['seconds'] * 1000:>12.2f}{metrics['peak_kb']:>16.1f}")
+    return lines
+
+def load_results(path: str) -> Optional[Dict[str, Any]]:
+    """读取保存的结果文件"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"读取基准测试结果失败: {path}, 错误: {e}")
+        return None
@@ -0,0 +1,169 @@
+import hashlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.http_client import AsyncHttpClient, probe_with_fallback, probed_size
+from src.scheduler import FetchScheduler
+from src.store import VersionStore
+from src.utils import logger
+
+def artifact_metadata(entry: Dict[str, Any], platform: str, arch: str) -> Dict[str, Any]:
+    """条目中某个安装包的元数据（size、etag、sha256），没有时返回空字典"""
+    return ((entry.get("artifacts") or {}).get(platform) or {}).get(arch) or {}
+
+class ArtifactEnricher:
+    """为版本条目补充安装包的大小、ETag 和可选的 SHA-256，结果写入条目的 artifacts 字段
+
+    artifacts 与 downloads 结构相同（平台 → 架构），已有元数据的安装包会被跳过，
+    因此中断后重新运行只会处理尚未完成的部分。
+    """
+
+    def __init__(
+        self,
+        http_client: AsyncHttpClient,
+        checksum: bool = False,
+        max_concurrency: int = 8,
+        per_host: int = 4,
+        chunk_size: int = 1024 * 1024,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5,
+    ):
+        """初始化
+
+        Args:
+            http_client: 共享的异步HTTP客户端
+            checksum: 是否下载安装包计算 SHA-256（按块流式计算，不保存文件）
+            max_concurrency: 全局同时进行的请求数上限
+            per_host: 同一主机同时进行的请求数上限
+            chunk_size: 计算校验和时每次读取的字节数
+            max_retries: 无响应、429 或 5xx 时的最大重试次数
+            retry_backoff: 首次重试前的等待时间（秒）
+        """
+        self.http_client = http_client
+        self.checksum = checksum
+        self.scheduler = FetchScheduler(max_concurrency, per_host=per_host)
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    def _is_complete(self, metadata: Dict[str, Any]) -> bool:
+        if "size" not in metadata:
+            return False
+        return not self.checksum or "sha256" in metadata
+
+    def pending_artifacts(self, store: VersionStore, entry: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+        """条目中尚缺元数据的安装包，返回 (平台, 架构, 链接)"""
+        return [
+            (platform, arch, url)
+            for platform, downloads in store.downloads(entry).items()
+            for arch, url in downloads.items()
+            if url and not self._is_complete(artifact_metadata(entry, platform, arch))
+        ]
+
+    def needs_enrichment(self, store: VersionStore, entry: Dict[str, Any]) -> bool:
+        return bool(self.pending_artifacts(store, entry))
+
+    async def _head(self, url: str) -> Optional[Dict[str, Any]]:
+        """获取安装包大小和 ETag"""
+        response, _ = await probe_with_fallback(self.http_client, url, self.max_retries, self.retry_backoff)
+        if response is None or not 200 <= response.status_code < 300:
+            logger.warning(f"获取安装包信息失败: {url}, 状态码: {response.status_code if response else '无响应'}")
+            return None
+
+        size = probed_size(response)
+        if size is None:
+            return None
+
+        metadata = {"size": size}
+        if response.headers.get("ETag"):
+            metadata["etag"] = response.headers["ETag"]
+        return metadata
+
+    async def _sha256(self, url: str) -> Optional[Tuple[str, int]]:
+        """流式下载安装包计算 SHA-256，返回 (摘要, 实际字节数)"""
+        digest = hashlib.sha256()
+        received = 0
+
+        def update(chunk: bytes) -> None:
+            nonlocal received
+            digest.update(chunk)
+            received += len(chunk)
+
+        response = await self.http_client.download(url, update, chunk_size=self.chunk_size)
+        if response is None or response.status_code != 200:
+            logger.warning(f"计算校验和失败: {url}")
+            return None
+        return digest.hexdigest(), received
+
+    async def _enrich_artifact(self, existing: Dict[str, Any], url: str) -> Optional[Dict[str, Any]]:
+        metadata = dict(existing)
+        if "size" not in metadata:
+            head = await self._head(url)
+            if head is None:
+                return None
+            metadata.update(head)
+
+        if self.checksum and "sha256" not in metadata:
+            result = await self._sha256(url)
+            if result is None:
+                return metadata if metadata != existing else None
+            sha256, received = result
+            if received != metadata["size"]:
+                logger.warning(f"安装包大小与 HEAD 结果不一致: {url}（{received} != {metadata['size']}）")
+                metadata["size"] = received
+            metadata["sha256"] = sha256
+        return metadata
+
+    async def enrich(
+        self,
+        store: VersionStore,
+        entries: Optional[Iterable[Dict[str, Any]]] = None,
+        checkpoint: Optional[Callable[[], Any]] = None,
+        checkpoint_every: int = 20,
+    ) -> int:
+        """为条目补充安装包元数据
+
+        Args:
+            store: 版本数据
+            entries: 需要处理的条目，None 表示全部条目；已有元数据的条目会被跳过
+            checkpoint: 每处理 checkpoint_every 个条目后调用（如保存数据文件），便于中断后继续
+            checkpoint_every: 两次 checkpoint 之间处理的条目数
+
+        Returns:
+            补充了元数据的条目数
+        """
+        pending = [entry for entry in (store if entries is None else entries) if self.needs_enrichment(store, entry)]
+        if not pending:
+            return 0
+        logger.info(f"需要补充安装包信息的版本: {len(pending)} 个")
+
+        enriched = 0
+        batch_size = max(1, checkpoint_every)
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            jobs = {}
+            hosts = {}
+            for position, entry in enumerate(batch):
+                for platform, arch, url in self.pending_artifacts(store, entry):
+                    key = (position, platform, arch)
+                    existing = artifact_metadata(entry, platform, arch)
+                    jobs[key] = lambda existing=existing, url=url: self._enrich_artifact(existing, url)
+                    hosts[key] = urlparse(url).netloc
+            results = await self.scheduler.gather(jobs, hosts=hosts)
+
+            touched = set()
+            for (position, platform, arch), metadata in results.items():
+                if not metadata:
+                    continue
+                entry = batch[position]
+                entry.setdefault("artifacts", {}).setdefault(platform, {})[arch] = metadata
+                touched.add(position)
+
+            if touched:
+                store.dirty = True
+                enriched += len(touched)
+                if checkpoint:
+                    checkpoint()
+
+        logger.info(f"已补充 {enriched} 个版本的安装包信息")
+        return enriched
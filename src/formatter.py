@@ -1,37 +1,68 @@
 import os
 import re
 import json
-from typing import Dict, List, Any, Optional
+from itertools import islice
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 import datetime
 
-from src.utils import load_json_file, logger, sort_version_entries
+from src.store import VersionStore
+from src.utils import atomic_write, ensure_dir_exists, load_json_file, logger, sort_version_entries
+from src.versioning import version_key
+
+# 版本表格的起止标记，更新时只需线性查找一次即可定位表格
+TABLE_START_MARKER = "<!-- VERSION_TABLE_START -->"
+TABLE_END_MARKER = "<!-- VERSION_TABLE_END -->"
+TABLE_HEADER = "| 版本号<br>Version | 发布日期<br>Release Date | macOS | Windows | Linux |"
+TABLE_SEPARATOR = "|--------|----------|-------|---------|-------|"
 
 class ReadmeFormatter:
     """README格式化工具，用于更新README中的版本表格"""
     
-    def __init__(self, data_file: str = "versions.json", readme_file: str = "README.md"):
+    def __init__(
+        self,
+        data_file: str = "versions.json",
+        readme_file: str = "README.md",
+        shard_dir: Optional[str] = None,
+        readme_limit: int = 30,
+        store: Optional[VersionStore] = None,
+    ):
         """初始化
         
         Args:
             data_file: 版本数据文件路径
             readme_file: README文件路径
+            shard_dir: 按主版本号分页输出的目录（如 docs/versions），None 时README包含全部版本
+            readme_limit: 分页输出时README中保留的最新版本数
+            store: 已加载的版本数据模型，提供时直接使用而不再读取 data_file
         """
         self.data_file = data_file
         self.readme_file = readme_file
-        self.versions_data = self._load_versions_data()
+        self.shard_dir = shard_dir
+        self.readme_limit = readme_limit
+        self.store = store if store is not None else VersionStore(self._load_versions_data())
+
+    @property
+    def versions_data(self) -> Dict:
+        """以 versions.json 结构返回当前数据的快照"""
+        return self.store.to_data()
     
     def _load_versions_data(self) -> Dict:
         """加载版本数据"""
         return load_json_file(self.data_file, {"versions": []})
     
-    def update_readme(self) -> bool:
-        """更新README文件中的版本表格和更新时间"""
+    def update_readme(self, new_entries: Optional[List[Dict]] = None) -> bool:
+        """更新README文件中的版本表格和更新时间
+
+        Args:
+            new_entries: 本次新增的版本条目；为空列表时表格保持不变，均比表格首行更新时只在表格顶部
+                插入这些行，为 None 或无法增量插入时重新生成整个表格
+        """
         try:
             with open(self.readme_file, 'r', encoding='utf-8') as f:
                 content = f.read()
                 
             # 更新最后更新时间
-            updated_at = self.versions_data.get("last_updated")
+            updated_at = self.store.meta.get("last_updated")
             if not updated_at:
                 updated_at = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
@@ -39,78 +70,226 @@ class ReadmeFormatter:
             time_pattern = r'Last Updated \| 最后更新时间:.*?(?:`[^`]*`|[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2})'
             new_timestamp = f"Last Updated | 最后更新时间:  `{updated_at}`"
             content = re.sub(time_pattern, new_timestamp, content, count=1)
-            
-            # 生成版本表格
-            version_table = self._generate_version_table()
-            
-            # 查找表格开始和结束的位置
-            table_pattern = r'\| 版本号(?:<br>|.*)Version \| 发布日期(?:<br>|.*)Release Date \| macOS \| Windows \| Linux \|\s*\|[-]+\|[-]+\|[-]+\|[-]+\|[-]+\|([\s\S]*?)(?=\s*##|\s*$)'
-            match = re.search(table_pattern, content)
-            
-            if match:
-                # 提取表头部分（包括分隔行）
-                table_header = content[match.start():match.start() + content[match.start():].find('\n') + 1]
-                table_separator = content[match.start() + len(table_header):match.start() + len(table_header) + content[match.start() + len(table_header):].find('\n') + 1]
-                
-                # 替换旧表格内容
-                new_table = f"{table_header}{table_separator}{version_table}"
-                content = content[:match.start()] + new_table + content[match.end():]
+
+            bounds = self._find_table_bounds(content)
+            if bounds is None:
+                content = self._wrap_legacy_table(content)
+                if content is None:
+                    logger.warning("无法在README中找到表格，未进行更新")
+                    return False
+                bounds = self._find_table_bounds(content)
+
+            if self.shard_dir:
+                # 分页模式下README只保留最新的若干版本，每次整体生成即可
+                latest_entries = list(islice(self.store, self.readme_limit))
+                content = self._splice_table(content, bounds, latest_entries, None, self._shard_links())
+                self._update_shards(new_entries)
             else:
-                logger.warning("无法在README中找到表格，未进行更新")
-                return False
+                content = self._splice_table(content, bounds, self.store, new_entries)
             
-            # 写入更新后的内容
-            with open(self.readme_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # 写入更新后的内容，内容未变化时跳过
+            atomic_write(self.readme_file, content.encode('utf-8'))
                 
             return True
             
         except Exception as e:
             logger.error(f"更新README时出错: {e}")
             return False
+
+    def _find_table_bounds(self, content: str) -> Optional[Tuple[int, int]]:
+        """定位标记注释之间的表格区域，返回表格起止位置"""
+        start = content.find(TABLE_START_MARKER)
+        if start == -1:
+            return None
+        start += len(TABLE_START_MARKER)
+        end = content.find(TABLE_END_MARKER, start)
+        if end == -1:
+            return None
+        return start, end
+
+    def _wrap_legacy_table(self, content: str) -> Optional[str]:
+        """为没有标记注释的旧README表格补上标记"""
+        table_pattern = r'\| 版本号(?:<br>|.*)Version \| 发布日期(?:<br>|.*)Release Date \| macOS \| Windows \| Linux \|\s*\|[-]+\|[-]+\|[-]+\|[-]+\|[-]+\|([\s\S]*?)(?=\s*##|\s*$)'
+        match = re.search(table_pattern, content)
+        if not match:
+            return None
+
+        logger.info("README表格缺少标记注释，已自动添加")
+        table = content[match.start():match.end()]
+        return (
+            f"{content[:match.start()]}{TABLE_START_MARKER}\n{table}\n\n"
+            f"{TABLE_END_MARKER}{content[match.end():]}"
+        )
+
+    def _splice_table(
+        self,
+        content: str,
+        bounds: Tuple[int, int],
+        entries: Iterable[Dict],
+        new_entries: Optional[List[Dict]],
+        footer: str = "",
+    ) -> str:
+        """把版本行写入标记之间的表格，能增量插入时只插入新增的行
+
+        Args:
+            content: 文档内容
+            bounds: 标记之间的表格区域
+            entries: 重新生成整个表格时使用的条目（按版本号倒序）
+            new_entries: 本次新增的条目，含义同 update_readme
+            footer: 表格之后、结束标记之前的附加内容
+        """
+        start, end = bounds
+        if new_entries is not None and not new_entries and content[start:end].strip():
+            return content
+
+        header_end = content.find('\n', start + 1)
+        separator_end = content.find('\n', header_end + 1)
+        if header_end == -1 or separator_end == -1 or separator_end > end:
+            table_header = f"\n{TABLE_HEADER}\n{TABLE_SEPARATOR}\n"
+            separator_end = start
+        else:
+            table_header = content[start:separator_end + 1]
+            separator_end += 1
+
+        first_row_end = content.find('\n', separator_end)
+        first_row = content[separator_end:first_row_end if first_row_end != -1 else end]
+        top_version = self._row_version(first_row) if separator_end < end else None
+
+        if new_entries and top_version and all(
+            version_key(entry.get("version", "0.0.0")) > version_key(top_version)
+            for entry in new_entries
+        ):
+            new_rows = "\n".join(
+                self._format_row(entry)
+                for entry in sort_version_entries(new_entries)
+            )
+            logger.debug(f"README表格增量插入 {len(new_entries)} 行")
+            return f"{content[:separator_end]}{new_rows}\n{content[separator_end:]}"
+
+        footer = f"{footer}\n\n" if footer else ""
+        return f"{content[:start]}{table_header}{self._generate_version_table(entries)}\n\n{footer}{content[end:]}"
+
+    def _row_version(self, row: str) -> Optional[str]:
+        """从表格行中取出版本号"""
+        cells = row.split('|')
+        if len(cells) < 3:
+            return None
+        return cells[1].strip() or None
     
-    def _generate_version_table(self) -> str:
+    def _generate_version_table(self, entries: Optional[Iterable[Dict]] = None) -> str:
         """生成版本表格"""
-        table_rows = []
+        if entries is None:
+            entries = self.store
+        return "\n".join(self._format_row(version_info) for version_info in entries)
+
+    def _major(self, version_info: Dict) -> str:
+        """版本号的主版本部分，用于分页"""
+        return str(version_info.get("version", "0")).split(".")[0] or "0"
+
+    def _shard_path(self, major: str) -> str:
+        return os.path.join(self.shard_dir, f"{major}.x.md")
+
+    def _shard_majors(self) -> List[str]:
+        """按从新到旧列出所有主版本"""
+        majors = []
+        for version_info in self.store:
+            major = self._major(version_info)
+            if major not in majors:
+                majors.append(major)
+        return majors
+
+    def _shard_links(self) -> str:
+        """README中指向各分页的链接"""
+        readme_dir = os.path.dirname(os.path.abspath(self.readme_file))
+        links = [
+            f"[{major}.x]({os.path.relpath(os.path.abspath(self._shard_path(major)), readme_dir).replace(os.sep, '/')})"
+            for major in self._shard_majors()
+        ]
+        return f"More versions | 更多版本: {' · '.join(links)}"
+
+    def _update_shards(self, new_entries: Optional[List[Dict]]) -> None:
+        """只重写包含新增条目的分页，未涉及的旧分页保持不动"""
+        if new_entries is None:
+            touched = self._shard_majors()
+        else:
+            touched = []
+            for version_info in new_entries:
+                major = self._major(version_info)
+                if major not in touched:
+                    touched.append(major)
+
+        for major in touched:
+            shard_new_entries = None
+            if new_entries is not None:
+                shard_new_entries = [item for item in new_entries if self._major(item) == major]
+            self._update_shard(major, shard_new_entries)
+
+    def _update_shard(self, major: str, new_entries: Optional[List[Dict]]) -> None:
+        """更新单个主版本的分页文件"""
+        shard_path = self._shard_path(major)
+        if os.path.exists(shard_path):
+            with open(shard_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        else:
+            new_entries = None
+            readme_link = os.path.relpath(
+                os.path.abspath(self.readme_file),
+                os.path.dirname(os.path.abspath(shard_path)),
+            ).replace(os.sep, '/')
+            content = (
+                f"# Cursor {major}.x Versions | Cursor {major}.x 版本\n\n"
+                f"[← README]({readme_link})\n\n"
+                f"{TABLE_START_MARKER}\n{TABLE_END_MARKER}\n"
+            )
+
+        bounds = self._find_table_bounds(content)
+        if bounds is None:
+            logger.warning(f"分页文件缺少表格标记，未进行更新: {shard_path}")
+            return
+
+        entries = [item for item in self.store if self._major(item) == major]
+        content = self._splice_table(content, bounds, entries, new_entries)
+
+        ensure_dir_exists(self.shard_dir)
+        if atomic_write(shard_path, content.encode('utf-8')):
+            logger.info(f"已更新分页: {shard_path}")
+
+    def _format_row(self, version_info: Dict) -> str:
+        """生成单个版本的表格行"""
+        version = version_info.get("version", "")
+        date = version_info.get("date", "")
         
-        for version_info in sort_version_entries(self.versions_data.get("versions", [])):
-            version = version_info.get("version", "")
-            date = version_info.get("date", "")
-            
-            # 处理下载链接
-            mac_links = []
-            win_links = []
-            linux_links = []
-            
-            # 处理各平台下载链接
-            for download_type, downloads in version_info.get("downloads", {}).items():
-                if download_type == "mac":
-                    for arch, url in downloads.items():
-                        if arch == "universal":
-                            mac_links.append(f"[Universal]({url})")
-                        elif arch == "x64":
-                            mac_links.append(f"[x64]({url})")
-                        elif arch == "arm64":
-                            mac_links.append(f"[ARM64]({url})")
-                elif download_type == "windows":
-                    for arch, url in downloads.items():
-                        if arch == "x64":
-                            win_links.append(f"[x64]({url})")
-                        elif arch == "arm64":
-                            win_links.append(f"[ARM64]({url})")
-                elif download_type == "linux":
-                    for arch, url in downloads.items():
-                        if arch == "x64":
-                            linux_links.append(f"[x64]({url})")
-                        elif arch == "arm64":
-                            linux_links.append(f"[ARM64]({url})")
-            
-            # 格式化列内容
-            mac_column = " ".join(mac_links) if mac_links else "暂无"
-            win_column = " ".join(win_links) if win_links else "暂无"
-            linux_column = " ".join(linux_links) if linux_links else "暂无"
-            
-            # 添加表格行
-            table_rows.append(f"| {version} | {date} | {mac_column} | {win_column} | {linux_column} |")
+        # 处理下载链接
+        mac_links = []
+        win_links = []
+        linux_links = []
+        
+        # 处理各平台下载链接
+        for download_type, downloads in self.store.downloads(version_info).items():
+            if download_type == "mac":
+                for arch, url in downloads.items():
+                    if arch == "universal":
+                        mac_links.append(f"[Universal]({url})")
+                    elif arch == "x64":
+                        mac_links.append(f"[x64]({url})")
+                    elif arch == "arm64":
+                        mac_links.append(f"[ARM64]({url})")
+            elif download_type == "windows":
+                for arch, url in downloads.items():
+                    if arch == "x64":
+                        win_links.append(f"[x64]({url})")
+                    elif arch == "arm64":
+                        win_links.append(f"[ARM64]({url})")
+            elif download_type == "linux":
+                for arch, url in downloads.items():
+                    if arch == "x64":
+                        linux_links.append(f"[x64]({url})")
+                    elif arch == "arm64":
+                        linux_links.append(f"[ARM64]({url})")
+        
+        # 格式化列内容
+        mac_column = " ".join(mac_links) if mac_links else "暂无"
+        win_column = " ".join(win_links) if win_links else "暂无"
+        linux_column = " ".join(linux_links) if linux_links else "暂无"
         
-        return "\n".join(table_rows) 
+        return f"| {version} | {date} | {mac_column} | {win_column} | {linux_column} |"
@@ -0,0 +1,240 @@
+import asyncio
+import json
+import re
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from multidict import CIMultiDict
+
+from src.utils import logger, DEFAULT_HEADERS
+
+if TYPE_CHECKING:
+    import aiohttp
+
+class HttpResponse:
+    """HTTP响应的简化封装，接口与 requests.Response 的常用部分保持一致"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CIMultiDict(headers)
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+class AsyncHttpClient:
+    """基于 aiohttp 的共享异步HTTP客户端，在整个扫描过程中复用连接"""
+
+    def __init__(
+        self,
+        connect_timeout: float = 5,
+        read_timeout: float = 10,
+        limit: int = 20,
+        limit_per_host: int = 10,
+        dns_cache_ttl: int = 300,
+        session: Optional["aiohttp.ClientSession"] = None,
+    ):
+        """初始化
+
+        Args:
+            connect_timeout: 建立连接的超时时间（秒）
+            read_timeout: 读取响应的超时时间（秒）
+            limit: 连接池总连接数上限
+            limit_per_host: 单个主机的连接数上限
+            dns_cache_ttl: DNS 缓存时间（秒）
+            session: 外部传入的会话（测试时可传入伪造对象），由调用方负责关闭
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self._session = session
+        self._owns_session = session is None
+
+    async def __aenter__(self) -> "AsyncHttpClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """按需创建会话，保持长连接并缓存 DNS 解析结果"""
+        if self._session is None:
+            # aiohttp 导入较慢，直到第一次发送请求时才加载
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=None,
+                sock_connect=self.connect_timeout,
+                sock_read=self.read_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers=DEFAULT_HEADERS,
+            )
+            self._owns_session = True
+        return self._session
+
+    async def get(self, url: str, headers: Dict = None) -> Optional[HttpResponse]:
+        """发送GET请求并读取完整响应"""
+        session = self._get_session()
+        try:
+            async with session.get(url, headers=headers) as response:
+                content = await response.read()
+                return HttpResponse(url, response.status, response.headers, content)
+        except Exception as e:
+            logger.error(f"请求失败: {url}, 错误: {e}")
+            return None
+
+    async def probe(self, url: str, method: str = "HEAD", headers: Dict = None) -> Optional[HttpResponse]:
+        """只获取状态码和响应头，不读取响应体（可用于 HEAD 或带 Range 的 GET）"""
+        session = self._get_session()
+        try:
+            async with session.request(method, url, headers=headers, allow_redirects=True) as response:
+                return HttpResponse(str(response.url), response.status, response.headers, b"")
+        except Exception as e:
+            logger.debug(f"{method} 请求失败: {url}, 错误: {e}")
+            return None
+
+    async def download(
+        self,
+        url: str,
+        sink: Callable[[bytes], Any],
+        headers: Dict = None,
+        chunk_size: int = 1024 * 1024,
+    ) -> Optional[HttpResponse]:
+        """以固定大小的块流式读取响应体并交给 sink 处理，内存占用与文件大小无关
+
+        Returns:
+            只含状态码和响应头的响应；请求失败或读取中断时返回 None
+        """
+        session = self._get_session()
+        try:
+            async with session.get(url, headers=headers) as response:
+                if 200 <= response.status < 300:
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        result = sink(chunk)
+                        if asyncio.iscoroutine(result):
+                            await result
+                return HttpResponse(str(response.url), response.status, response.headers, b"")
+        except Exception as e:
+            logger.error(f"下载失败: {url}, 错误: {e}")
+            return None
+
+    async def close(self) -> None:
+        """关闭自行创建的会话"""
+        if self._session is not None and self._owns_session:
+            await self._session.close()
+        self._session = None
+
+# HEAD 不被支持时改用只请求首字节的 GET
+HEAD_UNSUPPORTED = {403, 405, 501}
+# 明确表示资源已不存在的状态码，其余失败都可能是暂时性的
+GONE_STATUSES = {404, 410}
+
+def link_state(status: Optional[int]) -> str:
+    """按探测结果的状态码判断链接状态：ok（2xx/3xx）、dead（404/410），其余（无响应、429、5xx 等）为 unknown"""
+    if status is not None and 200 <= status < 400:
+        return "ok"
+    if status in GONE_STATUSES:
+        return "dead"
+    return "unknown"
+
+# Content-Range: bytes 0-0/12345 中的文件总大小
+_CONTENT_RANGE_TOTAL = re.compile(r"/(\d+)$")
+
+def probed_size(response: HttpResponse) -> Optional[int]:
+    """探测响应对应的文件大小：Range GET 的 206 取 Content-Range 中的总大小，否则取 Content-Length"""
+    total = _CONTENT_RANGE_TOTAL.search(response.headers.get("Content-Range", ""))
+    if response.status_code == 206 and total:
+        return int(total.group(1))
+    if response.headers.get("Content-Length"):
+        return int(response.headers["Content-Length"])
+    return None
+
+def should_retry(status: Optional[int]) -> bool:
+    """无响应、429 或 5xx 时值得重试"""
+    return status is None or status == 429 or status >= 500
+
+def retry_delay(response: Any, attempt: int, backoff: float, max_retry_after: float) -> float:
+    """重试前的等待时间，响应带 Retry-After 时以其为准（最长 max_retry_after 秒），否则按指数退避"""
+    headers = getattr(response, "headers", None) or {}
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), max_retry_after)
+        except ValueError:
+            pass
+    return backoff * (2 ** (attempt - 1))
+
+async def send_with_retries(
+    send: Callable[[], Awaitable[Any]],
+    max_retries: int,
+    backoff: float,
+    max_retry_after: float = 30,
+    label: str = "",
+) -> Tuple[Any, int]:
+    """发送请求，失败时按退避时间重试
+
+    Args:
+        send: 发送一次请求的函数，返回响应或 None
+        max_retries: 最大重试次数
+        backoff: 首次重试前的等待时间（秒），之后每次翻倍
+        max_retry_after: Retry-After 的最长等待时间（秒）
+        label: 日志中的请求标识
+
+    Returns:
+        (最后一次的响应, 重试次数)
+    """
+    retries = 0
+    while True:
+        response = await send()
+        status = response.status_code if response else None
+        if retries >= max_retries or not should_retry(status):
+            return response, retries
+        retries += 1
+        delay = retry_delay(response, retries, backoff, max_retry_after)
+        logger.debug(f"{label} 请求失败（{status or '无响应'}），{delay:.1f} 秒后第 {retries} 次重试")
+        await asyncio.sleep(delay)
+
+async def probe_with_fallback(
+    http_client: AsyncHttpClient,
+    url: str,
+    max_retries: int,
+    backoff: float,
+    max_retry_after: float = 30,
+) -> Tuple[Optional[HttpResponse], int]:
+    """先发 HEAD 确认链接，服务器不支持 HEAD 时改用 Range: bytes=0-0 的 GET，均按 send_with_retries 重试
+
+    Returns:
+        (最后一次的响应, 两次探测合计的重试次数)
+    """
+    response, retries = await send_with_retries(
+        lambda: http_client.probe(url),
+        max_retries,
+        backoff,
+        max_retry_after,
+        label=url,
+    )
+    if response is not None and response.status_code in HEAD_UNSUPPORTED:
+        response, extra = await send_with_retries(
+            lambda: http_client.probe(url, method="GET", headers={"Range": "bytes=0-0"}),
+            max_retries,
+            backoff,
+            max_retry_after,
+            label=url,
+        )
+        retries += extra
+    return response, retries
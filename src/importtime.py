@@ -0,0 +1,84 @@
+import re
+import subprocess
+import sys
+from typing import Dict, Iterable, List, Optional
+
+from src.utils import logger
+
+# 每小时检查路径（--check-only / --check-and-update 无新版本时）需要导入的模块
+CHECK_PATH_MODULES = ("main", "src.pipeline", "src.scanner", "src.http_client")
+# 检查路径不应加载的模块，出现即视为启动回归
+CHECK_PATH_EXCLUDED = ("requests", "bs4", "packaging", "src.formatter", "src.index", "src.watcher")
+# 检查路径的导入耗时预算（毫秒，不含解释器自身启动），aiohttp 在首次请求时才导入
+CHECK_PATH_BUDGET_MS = 150.0
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def parse_importtime(output: str) -> List[Dict]:
+    """解析 -X importtime 的输出，返回每个模块的自身耗时和累计耗时（微秒）"""
+    modules = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules.append({
+            "module": name,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(indent) - 1) // 2,
+        })
+    return modules
+
+def measure_import_time(modules: Iterable[str] = CHECK_PATH_MODULES, cwd: Optional[str] = None) -> Dict:
+    """在新的解释器中导入指定模块并统计耗时
+
+    Returns:
+        包含 total_ms（目标模块及其依赖的累计耗时，不含解释器启动）、modules（解析后的明细）、loaded（实际加载的模块集合）的字典
+    """
+    modules = list(modules)
+    code = "import sys\n" + "".join(f"import {name}\n" for name in modules) + "print('\\n'.join(sys.modules))"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    parsed = parse_importtime(completed.stderr)
+    # 解释器启动时导入的 site、encodings 等模块排在前面，从第一个目标模块开始统计
+    start = next(
+        (position for position, item in enumerate(parsed) if item["depth"] == 0 and item["module"] in modules),
+        len(parsed),
+    )
+    parsed = parsed[start:]
+    total_us = sum(item["cumulative_us"] for item in parsed if item["depth"] == 0)
+    return {
+        "total_ms": total_us / 1000,
+        "modules": parsed,
+        "loaded": set(completed.stdout.split()),
+    }
+
+def check_import_budget(
+    budget_ms: float = CHECK_PATH_BUDGET_MS,
+    modules: Iterable[str] = CHECK_PATH_MODULES,
+    excluded: Iterable[str] = CHECK_PATH_EXCLUDED,
+    top: int = 10,
+    cwd: Optional[str] = None,
+) -> bool:
+    """测量检查路径的导入耗时并输出报告，超出预算或加载了不应加载的模块时返回 False"""
+    result = measure_import_time(modules, cwd=cwd)
+    unexpected = sorted(name for name in excluded if name in result["loaded"])
+
+    logger.info(f"检查路径导入耗时: {result['total_ms']:.1f} ms（预算 {budget_ms:g} ms）")
+    logger.info("自身耗时最多的模块（自身 / 累计，毫秒）:")
+    slowest = sorted(result["modules"], key=lambda item: item["self_us"], reverse=True)[:top]
+    for item in slowest:
+        logger.info(f"  {item['self_us'] / 1000:8.1f} / {item['cumulative_us'] / 1000:8.1f}  {item['module']}")
+
+    if unexpected:
+        logger.error(f"检查路径加载了不应加载的模块: {', '.join(unexpected)}")
+    if result["total_ms"] > budget_ms:
+        logger.error("检查路径导入耗时超出预算")
+
+    return result["total_ms"] <= budget_ms and not unexpected
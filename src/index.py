@@ -0,0 +1,265 @@
+import bisect
+import io
+import json
+import mmap
+import os
+import re
+import struct
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.store import iter_entry_spans
+from src.utils import atomic_write, logger
+from src.versioning import version_key
+
+# 索引文件布局（大端序）：
+#   文件头:   magic(8) | 条目数 u32 | 构建哈希数 u32 | 数据文件大小 u64
+#   版本区:   按版本号升序的定长记录 version(32) | build_id(40) | 偏移 u64 | 长度 u32 | crc32 u32
+#   哈希区:   按 build_id 升序的定长记录 build_id(40) | 版本区下标 u32
+INDEX_MAGIC = b"CVIDX\x00\x00\x01"
+_HEADER = struct.Struct(">8sIIQ")
+_RECORD = struct.Struct(">32s40sQII")
+_BUILD_RECORD = struct.Struct(">40sI")
+
+_ARRAY_END = re.compile(rb'\s*\]')
+
+def _pad(value: Optional[str], size: int) -> bytes:
+    return (value or "").encode("ascii", errors="replace")[:size].ljust(size, b"\0")
+
+def _unpad(value: bytes) -> str:
+    return value.rstrip(b"\0").decode("ascii")
+
+def _iter_entry_spans(content: bytes) -> Iterator[Tuple[Dict[str, Any], int, int]]:
+    """文件内容已全部读入内存，一次解析完毕"""
+    return iter_entry_spans(io.BytesIO(content), chunk_size=len(content) + 1)
+
+def _make_record(entry: Dict[str, Any], content: bytes, offset: int, length: int) -> Tuple[str, str, int, int, int]:
+    crc = zlib.crc32(content[offset:offset + length])
+    return (entry.get("version", "0.0.0"), entry.get("build_id") or "", offset, length, crc)
+
+def _write_index(index_file: str, records: List[Tuple[str, str, int, int, int]], data_size: int) -> bool:
+    """按版本号排序写入索引文件，返回文件是否发生变化"""
+    records = sorted(records, key=lambda record: version_key(record[0]))
+    build_ids = sorted(
+        (_pad(record[1], 40), position)
+        for position, record in enumerate(records)
+        if record[1]
+    )
+
+    parts = [_HEADER.pack(INDEX_MAGIC, len(records), len(build_ids), data_size)]
+    parts.extend(
+        _RECORD.pack(_pad(version, 32), _pad(build_id, 40), offset, length, crc)
+        for version, build_id, offset, length, crc in records
+    )
+    parts.extend(_BUILD_RECORD.pack(build_id, position) for build_id, position in build_ids)
+    return atomic_write(index_file, b"".join(parts))
+
+def build_index(data_file: str, index_file: str) -> bool:
+    """完整扫描数据文件并重建索引，返回索引文件是否发生变化"""
+    with open(data_file, "rb") as f:
+        content = f.read()
+
+    records = [
+        _make_record(entry, content, offset, length)
+        for entry, offset, length in _iter_entry_spans(content)
+    ]
+    return _write_index(index_file, records, len(content))
+
+def update_index(data_file: str, index_file: str) -> bool:
+    """在数据文件新增条目后增量更新索引
+
+    只解析数据文件开头直到遇到第一条未变化的已索引条目，其后的条目按整体位移修正偏移，
+    并用 crc32 逐条校验；无法增量更新时回退为完整重建。返回索引文件是否发生变化。
+    """
+    index = VersionIndex.open(index_file, data_file, check_size=False)
+    if index is None:
+        return build_index(data_file, index_file)
+
+    with index:
+        old_records = index.records()
+
+    with open(data_file, "rb") as f:
+        content = f.read()
+
+    old_by_version = {record[0]: record for record in old_records}
+    head_records = []
+    anchor = None
+    for entry, offset, length in _iter_entry_spans(content):
+        record = _make_record(entry, content, offset, length)
+        old_record = old_by_version.get(record[0])
+        if old_record and old_record[3:] == record[3:]:
+            anchor = (old_record, record)
+            break
+        head_records.append(record)
+
+    if anchor is None:
+        return build_index(data_file, index_file)
+
+    old_anchor, new_anchor = anchor
+    delta = new_anchor[2] - old_anchor[2]
+    anchor_key = version_key(old_anchor[0])
+    tail_records = []
+    for version, build_id, offset, length, crc in old_records:
+        if version_key(version) > anchor_key:
+            continue
+        shifted = offset + delta
+        if zlib.crc32(content[shifted:shifted + length]) != crc:
+            logger.debug("索引增量更新校验失败，改为完整重建")
+            return build_index(data_file, index_file)
+        tail_records.append((version, build_id, shifted, length, crc))
+
+    # 比所有已索引版本都旧的新条目位于文件末尾，不会在开头被解析到；
+    # 复用的最后一条记录之后必须紧接数组结尾，否则改为完整重建
+    last_end = max(offset + length for _, _, offset, length, _ in tail_records)
+    if not _ARRAY_END.match(content, last_end):
+        logger.debug("数据文件末尾有未索引的条目，改为完整重建")
+        return build_index(data_file, index_file)
+
+    logger.debug(f"增量更新索引: 新增/变更 {len(head_records)} 条，复用 {len(tail_records)} 条")
+    return _write_index(index_file, head_records + tail_records, len(content))
+
+class VersionIndex:
+    """基于 mmap 的版本索引，二分查找版本号或构建哈希，只读取命中的条目"""
+
+    def __init__(self, index_file: str, data_file: str, index_map: mmap.mmap, count: int, build_count: int):
+        self.index_file = index_file
+        self.data_file = data_file
+        self._map = index_map
+        self._count = count
+        self._build_count = build_count
+        self._build_base = _HEADER.size + count * _RECORD.size
+
+    @classmethod
+    def open(cls, index_file: str, data_file: str, check_size: bool = True) -> Optional["VersionIndex"]:
+        """打开索引，索引缺失、损坏或与数据文件大小不符时返回 None"""
+        if not os.path.exists(index_file) or not os.path.exists(data_file):
+            return None
+
+        with open(index_file, "rb") as f:
+            try:
+                index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return None
+
+        if len(index_map) < _HEADER.size:
+            index_map.close()
+            return None
+
+        magic, count, build_count, data_size = _HEADER.unpack_from(index_map, 0)
+        expected_size = _HEADER.size + count * _RECORD.size + build_count * _BUILD_RECORD.size
+        if magic != INDEX_MAGIC or len(index_map) != expected_size:
+            logger.debug(f"索引文件格式不正确: {index_file}")
+            index_map.close()
+            return None
+
+        if check_size and os.path.getsize(data_file) != data_size:
+            logger.debug(f"索引与数据文件不一致: {index_file}")
+            index_map.close()
+            return None
+
+        return cls(index_file, data_file, index_map, count, build_count)
+
+    def __enter__(self) -> "VersionIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _record(self, position: int) -> Tuple[str, str, int, int, int]:
+        version, build_id, offset, length, crc = _RECORD.unpack_from(self._map, _HEADER.size + position * _RECORD.size)
+        return (_unpad(version), _unpad(build_id), offset, length, crc)
+
+    def _build_record(self, position: int) -> Tuple[bytes, int]:
+        return _BUILD_RECORD.unpack_from(self._map, self._build_base + position * _BUILD_RECORD.size)
+
+    def records(self) -> List[Tuple[str, str, int, int, int]]:
+        """按版本号升序返回所有索引记录"""
+        return [self._record(position) for position in range(self._count)]
+
+    def version_at(self, position: int) -> str:
+        """版本区第 position 条记录的版本号（升序）"""
+        return self._record(position)[0]
+
+    def version_keys(self) -> "_VersionKeyView":
+        """按版本号升序的排序键序列，可直接用 bisect 在 mmap 上二分"""
+        return _VersionKeyView(self)
+
+    def read_entry(self, position: int) -> Optional[Dict[str, Any]]:
+        """读取版本区第 position 条记录对应的数据条目，内容校验失败时返回 None"""
+        _, _, offset, length, crc = self._record(position)
+        with open(self.data_file, "rb") as f:
+            f.seek(offset)
+            content = f.read(length)
+        if zlib.crc32(content) != crc:
+            logger.warning(f"索引与数据文件不一致，请重建索引: {self.index_file}")
+            return None
+        return json.loads(content.decode("utf-8"))
+
+    def find_version_position(self, version: str) -> Optional[int]:
+        """二分查找版本号在版本区的位置"""
+        target = version_key(version)
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if version_key(self.version_at(middle)) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self.version_at(low) == version:
+            return low
+        return None
+
+    def find_version(self, version: str) -> Optional[Dict[str, Any]]:
+        """按版本号查找数据条目"""
+        position = self.find_version_position(version)
+        return None if position is None else self.read_entry(position)
+
+    def find_build_id_positions(self, prefix: str) -> List[int]:
+        """按构建哈希前缀查找，返回匹配记录在版本区的位置"""
+        needle = prefix.encode("ascii", errors="replace")
+        low = bisect.bisect_left(_BuildIdView(self), needle)
+        positions = []
+        while low < self._build_count:
+            build_id, position = self._build_record(low)
+            if not build_id.startswith(needle):
+                break
+            positions.append(position)
+            low += 1
+        return positions
+
+    def find_build_id(self, build_id: str) -> Optional[Dict[str, Any]]:
+        """按完整构建哈希查找数据条目"""
+        for position in self.find_build_id_positions(build_id):
+            if self._record(position)[1] == build_id:
+                return self.read_entry(position)
+        return None
+
+class _BuildIdView:
+    """把哈希区包装成只读序列，便于 bisect 直接在 mmap 上二分"""
+
+    def __init__(self, index: VersionIndex):
+        self._index = index
+
+    def __len__(self) -> int:
+        return self._index._build_count
+
+    def __getitem__(self, position: int) -> bytes:
+        return self._index._build_record(position)[0].rstrip(b"\0")
+
+class _VersionKeyView:
+    """把版本区包装成排序键的只读序列"""
+
+    def __init__(self, index: VersionIndex):
+        self._index = index
+
+    def __len__(self) -> int:
+        return self._index._count
+
+    def __getitem__(self, position: int) -> Any:
+        return version_key(self._index.version_at(position))
@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.http_client import AsyncHttpClient, link_state, probe_with_fallback
+from src.scheduler import FetchScheduler
+from src.store import VersionStore
+from src.utils import get_current_timestamp, load_json_file, logger, save_json_file
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def iter_download_links(store: VersionStore) -> List[Tuple[Dict[str, Any], str, str, str]]:
+    """列出所有下载链接，返回 (条目, 平台, 架构, 链接)"""
+    links = []
+    for entry in store:
+        for platform, downloads in store.downloads(entry).items():
+            for arch, url in downloads.items():
+                if url:
+                    links.append((entry, platform, arch, url))
+    return links
+
+class LinkChecker:
+    """并发检查历史数据中所有下载链接是否仍然可用，结果按有效期缓存"""
+
+    def __init__(
+        self,
+        http_client: AsyncHttpClient,
+        cache_file: Optional[str] = None,
+        ttl: timedelta = timedelta(days=7),
+        max_concurrency: int = 20,
+        per_host: int = 6,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5,
+        timeout: Optional[float] = None,
+    ):
+        """初始化
+
+        Args:
+            http_client: 共享的异步HTTP客户端
+            cache_file: 检查结果缓存文件路径，None 时不缓存
+            ttl: 缓存有效期，过期的链接才会重新检查
+            max_concurrency: 全局同时进行的请求数上限
+            per_host: 同一主机同时进行的请求数上限
+            max_retries: 无响应、429 或 5xx 时的最大重试次数
+            retry_backoff: 首次重试前的等待时间（秒）
+            timeout: 整次检查的超时时间（秒），None 表示不限制
+        """
+        self.http_client = http_client
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.scheduler = FetchScheduler(max_concurrency, per_host=per_host)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self.cache: Dict[str, Dict[str, Any]] = load_json_file(cache_file, {}).get("links", {}) if cache_file else {}
+
+    def _is_fresh(self, cached: Optional[Dict[str, Any]], now: datetime) -> bool:
+        if not cached or not cached.get("checked_at") or link_state(cached.get("status")) == "unknown":
+            return False
+        try:
+            checked_at = datetime.strptime(cached["checked_at"], TIMESTAMP_FORMAT)
+        except ValueError:
+            return False
+        return now - checked_at < self.ttl
+
+    async def check_url(self, url: str) -> Dict[str, Any]:
+        """检查单个链接，先发 HEAD，服务器不支持时改用 Range: bytes=0-0 的 GET
+
+        state 为 ok、dead（404/410）或 unknown（重试后仍无响应、429 或 5xx），unknown 不写入缓存
+        """
+        response, retries = await probe_with_fallback(self.http_client, url, self.max_retries, self.retry_backoff)
+        status = response.status_code if response is not None else None
+        state = link_state(status)
+        return {
+            "status": status,
+            "state": state,
+            "ok": state == "ok",
+            "checked_at": get_current_timestamp(),
+            "retries": retries,
+        }
+
+    async def check(self, store: VersionStore, force: bool = False) -> Dict[str, Any]:
+        """检查所有过期或未检查过的链接，返回检查报告
+
+        Args:
+            store: 版本数据
+            force: 忽略缓存，重新检查全部链接
+        """
+        links = iter_download_links(store)
+        now = datetime.now()
+        stale = sorted({
+            url for _, _, _, url in links
+            if force or not self._is_fresh(self.cache.get(url), now)
+        })
+        logger.info(f"共 {len(links)} 个下载链接，需要检查 {len(stale)} 个")
+
+        jobs = {url: (lambda url=url: self.check_url(url)) for url in stale}
+        hosts = {url: urlparse(url).netloc for url in stale}
+        results = await self.scheduler.gather(jobs, timeout=self.timeout, hosts=hosts)
+
+        for url, result in results.items():
+            if result is None or result["state"] == "unknown":
+                # 超时取消或暂时性失败的链接不写入缓存，下次继续检查
+                continue
+            self.cache[url] = {key: result[key] for key in ("status", "ok", "checked_at")}
+        self._save_cache()
+
+        return self._build_report(links, results)
+
+    def _build_report(self, links: List[Tuple[Dict[str, Any], str, str, str]], results: Dict[str, Any]) -> Dict[str, Any]:
+        statuses: Dict[str, int] = {}
+        dead = []
+        unknown = []
+        for entry, platform, arch, url in links:
+            cached = self.cache.get(url)
+            if not cached or link_state(cached.get("status")) == "unknown":
+                result = results.get(url)
+                unknown.append({
+                    "version": entry.get("version"),
+                    "platform": platform,
+                    "arch": arch,
+                    "url": url,
+                    "status": result["status"] if result else None,
+                })
+                continue
+            status = str(cached["status"])
+            statuses[status] = statuses.get(status, 0) + 1
+            if link_state(cached["status"]) == "dead":
+                dead.append({
+                    "version": entry.get("version"),
+                    "platform": platform,
+                    "arch": arch,
+                    "url": url,
+                    "status": cached.get("status"),
+                    "checked_at": cached.get("checked_at"),
+                })
+
+        return {
+            "checked_at": get_current_timestamp(),
+            "total": len(links),
+            "checked": sum(1 for result in results.values() if result is not None),
+            "retries": sum(result["retries"] for result in results.values() if result is not None),
+            "unchecked": len(unknown),
+            "statuses": statuses,
+            "dead": dead,
+            "unknown": unknown,
+        }
+
+    def _save_cache(self) -> None:
+        if self.cache_file:
+            save_json_file(self.cache_file, {"links": dict(sorted(self.cache.items()))})
+
+def mark_dead_links(store: VersionStore, dead: List[Dict[str, Any]], unknown: Optional[List[Dict[str, Any]]] = None) -> int:
+    """在版本条目中记录失效链接（dead_links: ["平台/架构", ...]），恢复可用的链接会被移除
+
+    Args:
+        store: 版本数据
+        dead: 检查报告中的失效链接
+        unknown: 本次没有得到明确结果的链接，保留其原有标记
+
+    Returns:
+        发生变化的条目数
+    """
+    dead_by_version: Dict[str, set] = {}
+    for item in dead:
+        dead_by_version.setdefault(item["version"], set()).add(f"{item['platform']}/{item['arch']}")
+    unknown_by_version: Dict[str, set] = {}
+    for item in unknown or []:
+        unknown_by_version.setdefault(item["version"], set()).add(f"{item['platform']}/{item['arch']}")
+
+    changed = 0
+    for entry in store:
+        version = entry.get("version")
+        kept = set(entry.get("dead_links", [])) & unknown_by_version.get(version, set())
+        marked = sorted(dead_by_version.get(version, set()) | kept)
+        if marked == entry.get("dead_links", []):
+            continue
+        if marked:
+            entry["dead_links"] = marked
+        else:
+            entry.pop("dead_links", None)
+        changed += 1
+
+    if changed:
+        store.dirty = True
+    return changed
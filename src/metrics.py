@@ -0,0 +1,154 @@
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.utils import atomic_write, logger
+
+# Prometheus 指标名前缀
+METRIC_PREFIX = "cursor_scanner"
+
+class RunMetrics:
+    """记录一次运行中各阶段耗时和每个请求的延迟、状态码、重试次数与传输字节数"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """清空已记录的数据，开始新一轮统计"""
+        self.started_at = time.time()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.requests: List[Dict[str, Any]] = []
+        self.result: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """统计代码块耗时，同名阶段多次执行时累加"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stage = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+            stage["seconds"] += elapsed
+            stage["calls"] += 1
+            logger.debug(f"阶段 {name} 耗时 {elapsed * 1000:.1f} ms")
+
+    def record_request(
+        self,
+        key: str,
+        url: str,
+        status: Optional[int],
+        seconds: float,
+        size: int = 0,
+        retries: int = 0,
+    ) -> None:
+        """记录一次请求（含重试）的结果
+
+        Args:
+            key: 请求标识，如 "latest:linux-x64"
+            url: 请求地址
+            status: 最终状态码，没有响应时为 None
+            seconds: 包含重试在内的总耗时
+            size: 最终响应的字节数
+            retries: 重试次数
+        """
+        self.requests.append({
+            "key": key,
+            "url": url,
+            "status": status,
+            "seconds": seconds,
+            "bytes": size,
+            "retries": retries,
+        })
+
+    def summary(self) -> Dict[str, Any]:
+        """汇总请求数、状态码分布、重试次数和传输字节数"""
+        statuses: Dict[str, int] = {}
+        for request in self.requests:
+            status = str(request["status"] or "error")
+            statuses[status] = statuses.get(status, 0) + 1
+        latencies = sorted(request["seconds"] for request in self.requests)
+        return {
+            "requests": len(self.requests),
+            "statuses": statuses,
+            "retries": sum(request["retries"] for request in self.requests),
+            "bytes": sum(request["bytes"] for request in self.requests),
+            "max_latency": latencies[-1] if latencies else 0.0,
+        }
+
+    def to_report(self) -> Dict[str, Any]:
+        """以 JSON 运行报告的结构返回"""
+        return {
+            "started_at": datetime.fromtimestamp(self.started_at).strftime("%Y-%m-%d %H:%M:%S"),
+            "duration": time.time() - self.started_at,
+            "result": self.result,
+            "stages": self.stages,
+            "summary": self.summary(),
+            "requests": self.requests,
+        }
+
+    def write_report(self, file_path: str) -> bool:
+        """保存 JSON 运行报告"""
+        content = json.dumps(self.to_report(), ensure_ascii=False, indent=2).encode("utf-8")
+        try:
+            atomic_write(file_path, content)
+            return True
+        except OSError as e:
+            logger.error(f"保存运行报告失败: {file_path}, 错误: {e}")
+            return False
+
+    def prometheus_lines(self) -> List[str]:
+        """按 Prometheus 文本格式输出指标，供 node_exporter textfile collector 读取"""
+        lines = [
+            f"# HELP {METRIC_PREFIX}_stage_duration_seconds Duration of each scanner stage.",
+            f"# TYPE {METRIC_PREFIX}_stage_duration_seconds gauge",
+        ]
+        for name, stage in self.stages.items():
+            lines.append(f'{METRIC_PREFIX}_stage_duration_seconds{{stage="{name}"}} {stage["seconds"]:.6f}')
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_request_duration_seconds Latency of the last request per endpoint.",
+            f"# TYPE {METRIC_PREFIX}_request_duration_seconds gauge",
+        ]
+        # 同一请求标识只保留最后一次，避免输出重复的时间序列
+        latest = {request["key"]: request for request in self.requests}
+        for request in latest.values():
+            lines.append(
+                f'{METRIC_PREFIX}_request_duration_seconds{{key="{request["key"]}",status="{request["status"] or "error"}"}} '
+                f'{request["seconds"]:.6f}'
+            )
+
+        summary = self.summary()
+        lines += [
+            f"# HELP {METRIC_PREFIX}_requests_total Requests sent in the last run by status code.",
+            f"# TYPE {METRIC_PREFIX}_requests_total gauge",
+        ]
+        for status, count in sorted(summary["statuses"].items()):
+            lines.append(f'{METRIC_PREFIX}_requests_total{{status="{status}"}} {count}')
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_request_retries_total Retries in the last run.",
+            f"# TYPE {METRIC_PREFIX}_request_retries_total gauge",
+            f"{METRIC_PREFIX}_request_retries_total {summary['retries']}",
+            f"# HELP {METRIC_PREFIX}_response_bytes_total Response bytes received in the last run.",
+            f"# TYPE {METRIC_PREFIX}_response_bytes_total gauge",
+            f"{METRIC_PREFIX}_response_bytes_total {summary['bytes']}",
+            f"# HELP {METRIC_PREFIX}_last_run_success Whether the last run succeeded.",
+            f"# TYPE {METRIC_PREFIX}_last_run_success gauge",
+            f"{METRIC_PREFIX}_last_run_success {1 if self.result.get('success') else 0}",
+            f"# HELP {METRIC_PREFIX}_last_run_timestamp_seconds Start time of the last run.",
+            f"# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge",
+            f"{METRIC_PREFIX}_last_run_timestamp_seconds {self.started_at:.0f}",
+        ]
+        return lines
+
+    def write_prometheus(self, file_path: str) -> bool:
+        """原子写入 Prometheus textfile，避免采集到写了一半的文件"""
+        try:
+            atomic_write(file_path, ("\n".join(self.prometheus_lines()) + "\n").encode("utf-8"))
+            return True
+        except OSError as e:
+            logger.error(f"保存 Prometheus 指标失败: {file_path}, 错误: {e}")
+            return False
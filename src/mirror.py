@@ -0,0 +1,370 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import unquote, urlparse
+
+from src.enricher import artifact_metadata
+from src.http_client import AsyncHttpClient, probe_with_fallback, probed_size, retry_delay, should_retry
+from src.scheduler import FetchScheduler
+from src.store import VersionStore
+from src.utils import atomic_write, ensure_dir_exists, logger
+
+# 每次从响应中读取并写入磁盘的字节数，决定单个请求的内存占用
+STREAM_BUFFER = 64 * 1024
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+class BandwidthLimiter:
+    """令牌桶限速，consume 在超出速率时等待"""
+
+    def __init__(self, bytes_per_second: float, burst: Optional[float] = None):
+        """初始化
+
+        Args:
+            bytes_per_second: 平均速率上限（字节/秒）
+            burst: 允许的突发字节数，默认为一秒的流量
+        """
+        self.rate = bytes_per_second
+        self.capacity = burst or bytes_per_second
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def consume(self, size: int) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= size
+            if self._tokens < 0:
+                wait = -self._tokens / self.rate
+                await asyncio.sleep(wait)
+                self._updated = time.monotonic()
+                self._tokens = 0
+
+class _ChunkError(Exception):
+    """分块下载失败，可重试"""
+
+    def __init__(self, message: str, response: Any = None):
+        super().__init__(message)
+        self.response = response
+
+class ArtifactMirror:
+    """把选定平台的安装包镜像到本地目录，按 build_id 组织并去重
+
+    大文件按 HTTP Range 拆分为多个分块并行下载，逐块流式写入磁盘；
+    已完成的分块记录在 .part.json 中，中断后再次运行只下载缺失的分块。
+    """
+
+    def __init__(
+        self,
+        http_client: AsyncHttpClient,
+        dest_dir: str,
+        max_concurrency: int = 8,
+        per_host: int = 4,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        bandwidth: Optional[float] = None,
+        per_host_bandwidth: Optional[float] = None,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        verify: bool = True,
+    ):
+        """初始化
+
+        Args:
+            http_client: 共享的异步HTTP客户端
+            dest_dir: 镜像目录，文件保存为 <dest_dir>/<build_id>/<平台>/<架构>/<文件名>
+            max_concurrency: 全局同时进行的请求（分块）数上限
+            per_host: 同一主机同时进行的请求数上限
+            chunk_size: 每个 Range 分块的字节数
+            bandwidth: 全局带宽上限（字节/秒），None 表示不限制
+            per_host_bandwidth: 单个主机的带宽上限（字节/秒）
+            max_retries: 单个分块失败时的最大重试次数
+            retry_backoff: 首次重试前的等待时间（秒）
+            verify: 下载完成后是否校验已记录的大小和 SHA-256
+        """
+        self.http_client = http_client
+        self.dest_dir = dest_dir
+        self.scheduler = FetchScheduler(max_concurrency, per_host=per_host)
+        self.max_concurrency = max(1, max_concurrency)
+        self.chunk_size = max(1, chunk_size)
+        self.bandwidth = BandwidthLimiter(bandwidth) if bandwidth else None
+        self.per_host_bandwidth = per_host_bandwidth
+        self._host_limiters: Dict[str, BandwidthLimiter] = {}
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.verify = verify
+
+    def select(
+        self,
+        store: VersionStore,
+        platforms: Optional[Iterable[str]] = None,
+        archs: Optional[Iterable[str]] = None,
+        versions: Optional[Iterable[str]] = None,
+        latest: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """按平台、架构和版本选出需要镜像的安装包，相同链接或相同 build_id/平台/架构只保留一次
+
+        Args:
+            store: 版本数据
+            platforms: 平台（mac/windows/linux），None 表示全部
+            archs: 架构（x64/arm64/universal），None 表示全部
+            versions: 指定版本号，None 表示全部
+            latest: 只镜像最新的若干个版本
+        """
+        platforms = set(platforms) if platforms else None
+        archs = set(archs) if archs else None
+        versions = set(versions) if versions else None
+
+        items = []
+        seen = set()
+        selected_versions = 0
+        for entry in store:
+            if versions and entry.get("version") not in versions:
+                continue
+            if latest is not None and selected_versions >= latest:
+                break
+            selected_versions += 1
+
+            for platform, downloads in store.downloads(entry).items():
+                if platforms and platform not in platforms:
+                    continue
+                for arch, url in downloads.items():
+                    if not url or (archs and arch not in archs):
+                        continue
+                    key = (entry.get("build_id"), platform, arch)
+                    if url in seen or key in seen:
+                        continue
+                    seen.update((url, key))
+                    metadata = artifact_metadata(entry, platform, arch)
+                    items.append({
+                        "version": entry.get("version"),
+                        "build_id": entry.get("build_id") or entry.get("version"),
+                        "platform": platform,
+                        "arch": arch,
+                        "url": url,
+                        "size": metadata.get("size"),
+                        "sha256": metadata.get("sha256"),
+                    })
+        return items
+
+    def target_path(self, item: Dict[str, Any]) -> str:
+        filename = os.path.basename(unquote(urlparse(item["url"]).path)) or "download"
+        return os.path.join(self.dest_dir, item["build_id"], item["platform"], item["arch"], filename)
+
+    async def mirror(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """下载所有安装包，返回统计报告"""
+        report = {"downloaded": 0, "skipped": 0, "failed": [], "bytes": 0}
+        file_slots = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(item: Dict[str, Any]) -> None:
+            async with file_slots:
+                try:
+                    status, size = await self._mirror_item(item)
+                except Exception as e:
+                    logger.error(f"镜像失败: {item['url']}, 错误: {e}")
+                    report["failed"].append({"url": item["url"], "error": str(e)})
+                    return
+                report[status] += 1
+                report["bytes"] += size
+
+        await asyncio.gather(*(run(item) for item in items))
+        logger.info(
+            f"镜像完成: 下载 {report['downloaded']} 个，跳过 {report['skipped']} 个，"
+            f"失败 {len(report['failed'])} 个，共 {report['bytes']} 字节"
+        )
+        return report
+
+    async def _mirror_item(self, item: Dict[str, Any]) -> tuple:
+        """镜像单个安装包，返回 ("downloaded" | "skipped", 本次下载的字节数)"""
+        path = self.target_path(item)
+        if os.path.exists(path) and self._verify_file(path, item, quiet=True):
+            logger.debug(f"已存在，跳过: {path}")
+            return "skipped", 0
+
+        ensure_dir_exists(os.path.dirname(path))
+        host = urlparse(item["url"]).netloc
+        size, accepts_ranges, etag = await self._probe(item, host)
+
+        part_path = f"{path}.part"
+        if size and accepts_ranges:
+            received = await self._download_chunks(item["url"], host, part_path, size, etag)
+        else:
+            received = await self._download_whole(item["url"], host, part_path)
+
+        if not self._verify_file(part_path, dict(item, size=item.get("size") or size)):
+            os.remove(part_path)
+            self._remove_state(part_path)
+            raise ValueError("校验失败")
+
+        os.replace(part_path, path)
+        self._remove_state(part_path)
+        logger.info(f"已镜像 {item['version']} {item['platform']}/{item['arch']}: {path}")
+        return "downloaded", received
+
+    async def _probe(self, item: Dict[str, Any], host: str) -> tuple:
+        """获取文件大小、是否支持 Range 以及 ETag，服务器不支持 HEAD 时改用 Range GET 探测"""
+        response, _ = await self.scheduler.run(
+            lambda: probe_with_fallback(self.http_client, item["url"], self.max_retries, self.retry_backoff),
+            host,
+        )
+        if response is None or not 200 <= response.status_code < 300:
+            return item.get("size"), False, None
+        size = probed_size(response) or item.get("size")
+        # Range GET 返回 206 本身就说明支持分块下载
+        accepts_ranges = response.status_code == 206 or response.headers.get("Accept-Ranges", "").lower() == "bytes"
+        return size, accepts_ranges, response.headers.get("ETag")
+
+    def _state_path(self, part_path: str) -> str:
+        return f"{part_path}.json"
+
+    def _load_state(self, part_path: str, size: int, etag: Optional[str]) -> List[int]:
+        """读取已完成的分块，文件大小、ETag 或分块大小变化时重新下载"""
+        if not os.path.exists(part_path):
+            return []
+        try:
+            with open(self._state_path(part_path), "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return []
+        if state.get("size") != size or state.get("etag") != etag or state.get("chunk_size") != self.chunk_size:
+            return []
+        return list(state.get("done", []))
+
+    def _save_state(self, part_path: str, size: int, etag: Optional[str], done: List[int]) -> None:
+        state = {"size": size, "etag": etag, "chunk_size": self.chunk_size, "done": sorted(done)}
+        atomic_write(self._state_path(part_path), json.dumps(state).encode("utf-8"))
+
+    def _remove_state(self, part_path: str) -> None:
+        if os.path.exists(self._state_path(part_path)):
+            os.remove(self._state_path(part_path))
+
+    async def _download_chunks(self, url: str, host: str, part_path: str, size: int, etag: Optional[str]) -> int:
+        """按 Range 分块并行下载到 .part 文件，已完成的分块不会重复下载"""
+        done = self._load_state(part_path, size, etag)
+        if done:
+            logger.info(f"继续下载 {url}: 已完成 {len(done)} 个分块")
+        else:
+            # 预先分配完整大小，各分块直接写入自己的位置
+            with open(part_path, "wb") as f:
+                f.truncate(size)
+            self._save_state(part_path, size, etag, done)
+
+        chunk_count = (size + self.chunk_size - 1) // self.chunk_size
+        pending = sorted(set(range(chunk_count)) - set(done))
+        received = 0
+
+        async def fetch(index: int) -> None:
+            nonlocal received
+            start = index * self.chunk_size
+            end = min(start + self.chunk_size, size) - 1
+            await self._fetch_range(url, host, part_path, start, end)
+            received += end - start + 1
+            done.append(index)
+            self._save_state(part_path, size, etag, done)
+
+        await asyncio.gather(*(fetch(index) for index in pending))
+        return received
+
+    async def _fetch_range(self, url: str, host: str, part_path: str, start: int, end: int) -> None:
+        """下载一个分块并写入文件对应位置，失败时重试"""
+        attempt = 0
+        while True:
+            try:
+                await self.scheduler.run(lambda: self._write_range(url, host, part_path, start, end), host)
+                return
+            except _ChunkError as e:
+                status = e.response.status_code if e.response is not None else None
+                if attempt >= self.max_retries or not should_retry(status):
+                    raise
+                attempt += 1
+                delay = retry_delay(e.response, attempt, self.retry_backoff, 30)
+                logger.debug(f"分块 {start}-{end} 下载失败（{e}），{delay:.1f} 秒后重试")
+                await asyncio.sleep(delay)
+
+    async def _write_range(self, url: str, host: str, part_path: str, start: int, end: int) -> None:
+        expected = end - start + 1
+        written = 0
+        with open(part_path, "r+b") as f:
+            f.seek(start)
+
+            async def sink(data: bytes) -> None:
+                nonlocal written
+                if written + len(data) > expected:
+                    raise ValueError("服务器返回的数据超出请求范围")
+                await self._throttle(host, len(data))
+                f.write(data)
+                written += len(data)
+
+            response = await self.http_client.download(
+                url,
+                sink,
+                headers={"Range": f"bytes={start}-{end}"},
+                chunk_size=STREAM_BUFFER,
+            )
+
+        if response is None:
+            raise _ChunkError("无响应或读取中断")
+        if response.status_code != 206:
+            raise _ChunkError(f"状态码 {response.status_code}", response)
+        if written != expected:
+            raise _ChunkError(f"分块不完整（{written}/{expected}）", response)
+
+    async def _download_whole(self, url: str, host: str, part_path: str) -> int:
+        """服务器不支持 Range 时整体流式下载"""
+        written = 0
+
+        async def download() -> Any:
+            nonlocal written
+            written = 0
+            with open(part_path, "wb") as f:
+                async def sink(data: bytes) -> None:
+                    nonlocal written
+                    await self._throttle(host, len(data))
+                    f.write(data)
+                    written += len(data)
+
+                return await self.http_client.download(url, sink, chunk_size=STREAM_BUFFER)
+
+        attempt = 0
+        while True:
+            response = await self.scheduler.run(download, host)
+            status = response.status_code if response is not None else None
+            if status == 200:
+                return written
+            if attempt >= self.max_retries or not should_retry(status):
+                raise ValueError(f"下载失败，状态码: {status or '无响应'}")
+            attempt += 1
+            await asyncio.sleep(retry_delay(response, attempt, self.retry_backoff, 30))
+
+    async def _throttle(self, host: str, size: int) -> None:
+        if self.bandwidth:
+            await self.bandwidth.consume(size)
+        if self.per_host_bandwidth:
+            if host not in self._host_limiters:
+                self._host_limiters[host] = BandwidthLimiter(self.per_host_bandwidth)
+            await self._host_limiters[host].consume(size)
+
+    def _verify_file(self, path: str, item: Dict[str, Any], quiet: bool = False) -> bool:
+        """校验已记录的大小和 SHA-256，没有记录时只要文件存在即视为有效"""
+        if not self.verify:
+            return True
+        actual_size = os.path.getsize(path)
+        if item.get("size") is not None and actual_size != item["size"]:
+            if not quiet:
+                logger.error(f"文件大小不一致: {path}（{actual_size} != {item['size']}）")
+            return False
+        if item.get("sha256"):
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            if digest.hexdigest() != item["sha256"]:
+                if not quiet:
+                    logger.error(f"SHA-256 不一致: {path}")
+                return False
+        return True
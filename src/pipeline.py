@@ -0,0 +1,118 @@
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from src.utils import logger
+
+if TYPE_CHECKING:
+    from src.enricher import ArtifactEnricher
+    from src.scanner import CursorVersionScanner
+
+class VersionPipeline:
+    """在同一份内存数据上依次执行 加载 → 获取 → 合并 → 保存 → 生成README
+
+    各阶段没有变化时直接结束：没有新版本不合并，数据未变化不写文件，文件未变化不更新README。
+    """
+
+    def __init__(
+        self,
+        scanner: "CursorVersionScanner",
+        readme_file: Optional[str] = None,
+        shard_dir: Optional[str] = None,
+        readme_limit: int = 30,
+        enricher: Optional["ArtifactEnricher"] = None,
+    ):
+        """初始化
+
+        Args:
+            scanner: 版本扫描器，其 store 即整个流程共享的数据模型
+            readme_file: README文件路径，为 None 时不更新README
+            shard_dir: 按主版本号分页输出的目录
+            readme_limit: 分页输出时README中保留的最新版本数
+            enricher: 保存前为新增版本补充安装包元数据，None 时跳过该阶段
+        """
+        self.scanner = scanner
+        self.readme_file = readme_file
+        self.shard_dir = shard_dir
+        self.readme_limit = readme_limit
+        self.enricher = enricher
+
+    async def run(self, probe: bool = True) -> Dict[str, Any]:
+        """执行一次完整流程
+
+        Args:
+            probe: 是否先请求代表平台探测新版本
+
+        Returns:
+            包含 success、new_version、version、data_changed、readme_updated 的结果字典
+        """
+        # 每次运行单独统计，常驻模式下指标不会无限累积
+        metrics = self.scanner.metrics
+        metrics.reset()
+        result = await self._run_stages(probe)
+        metrics.result = result
+        return result
+
+    async def _run_stages(self, probe: bool) -> Dict[str, Any]:
+        result = {
+            "success": True,
+            "new_version": False,
+            "version": None,
+            "data_changed": False,
+            "readme_updated": False,
+        }
+
+        # 获取
+        fetched = await self.scanner.fetch_changes(probe=probe)
+        result["success"] = fetched["success"]
+        result["version"] = fetched["version"]
+        if not fetched["success"] or not fetched["changed"]:
+            logger.info("没有新版本")
+            return result
+
+        # 合并
+        self.scanner.process_versions(fetched["changed"])
+
+        # 补充安装包信息（只处理本次新增和重新发布的版本）
+        changed_entries = self.scanner.added_versions + self.scanner.updated_versions
+        if self.enricher and changed_entries:
+            store = self.scanner.store
+            entries = [store.get(item.get("version")) for item in changed_entries]
+            with self.scanner.metrics.stage("enrich"):
+                await self.enricher.enrich(store, [entry for entry in entries if entry])
+
+        # 保存
+        if not self.scanner.persist():
+            logger.error("保存版本数据失败")
+            result["success"] = False
+            return result
+
+        result["data_changed"] = result["new_version"] = self.scanner.data_changed
+        if not self.scanner.data_changed:
+            logger.info("版本数据没有变化，跳过README更新")
+            return result
+
+        # 生成README
+        if self.readme_file:
+            result["readme_updated"] = self.render()
+            result["success"] = result["readme_updated"]
+
+        return result
+
+    def render(self) -> bool:
+        """用内存中的数据模型更新README，只插入本次新增的版本"""
+        # 只有数据变化时才需要生成README，检查路径不加载格式化模块
+        from src.formatter import ReadmeFormatter
+
+        formatter = ReadmeFormatter(
+            self.scanner.data_file,
+            self.readme_file,
+            shard_dir=self.shard_dir,
+            readme_limit=self.readme_limit,
+            store=self.scanner.store,
+        )
+        with self.scanner.metrics.stage("update_readme"):
+            # 已有版本的下载链接变化时无法只插入新行，重新生成整个表格
+            new_entries = None if self.scanner.updated_versions else self.scanner.added_versions
+            success = formatter.update_readme(new_entries=new_entries)
+        if not success:
+            logger.error("更新README失败")
+        return success
@@ -0,0 +1,287 @@
+import bisect
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.store import COMPACT_FORMAT, VersionStore, expand_downloads
+from src.utils import PLATFORM_ORDER, logger
+from src.versioning import version_key
+
+PLATFORM_ALIASES = {"darwin": "mac", "macos": "mac", "win32": "windows", "win": "windows"}
+ARCH_ALIASES = {"x86_64": "x64", "amd64": "x64", "aarch64": "arm64"}
+
+_FORMAT_HEADER = re.compile(rb'^\s*\{\s*"format"\s*:\s*(\d+)')
+
+# 排序键的边界：(排序键, 是否包含边界)，None 表示不限
+Bound = Optional[Tuple[Any, bool]]
+
+def normalize_target(platform: Optional[str], arch: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """统一平台和架构名称，platform 可以写成 linux-arm64、darwin-universal 等接口格式"""
+    if platform and "-" in platform and not arch:
+        platform, arch = platform.split("-", 1)
+    if platform:
+        platform = PLATFORM_ALIASES.get(platform.lower(), platform.lower())
+    if arch:
+        arch = ARCH_ALIASES.get(arch.lower(), arch.lower())
+    return platform, arch
+
+def parse_specifier(text: str) -> Any:
+    """解析 PEP 440 版本范围，单独的版本号视为 ==版本号"""
+    # packaging 只有在需要按范围查询时才加载
+    from packaging.specifiers import SpecifierSet
+
+    text = text.strip()
+    if text[:1].isdigit():
+        text = f"=={text}"
+    return SpecifierSet(text)
+
+def _next_prefix(prefix: str) -> str:
+    """2.1 → 2.2，用于计算 ==2.1.* 的上界"""
+    parts = prefix.split(".")
+    parts[-1] = str(int(parts[-1]) + 1)
+    return ".".join(parts)
+
+def _prefix_bounds(prefix: str) -> Tuple[Bound, Bound]:
+    """==前缀.* 覆盖的区间：从 前缀.dev0 到下一前缀的 .dev0（不含）"""
+    return (version_key(f"{prefix}.dev0"), True), (version_key(f"{_next_prefix(prefix)}.dev0"), False)
+
+def _tighter(current: Bound, candidate: Bound, lower: bool) -> Bound:
+    """取两个边界中更严格的一个"""
+    if current is None:
+        return candidate
+    if candidate is None:
+        return current
+    if current[0] == candidate[0]:
+        return (current[0], current[1] and candidate[1])
+    if (candidate[0] > current[0]) == lower:
+        return candidate
+    return current
+
+def specifier_bounds(specifier: Any) -> Tuple[Bound, Bound]:
+    """由版本范围推导排序键的上下界，用于二分缩小候选区间
+
+    边界只保证覆盖所有可能匹配的版本，区间内的版本仍会逐个用 specifier 判断，
+    因此 !=、=== 以及带 epoch 的写法不参与缩小范围也不影响结果。
+    """
+    from packaging.version import Version
+
+    lower: Bound = None
+    upper: Bound = None
+    for spec in specifier:
+        operator, version = spec.operator, spec.version
+        if "!" in version or "+" in version:
+            continue
+
+        spec_lower: Bound = None
+        spec_upper: Bound = None
+        if operator == "==" and version.endswith(".*"):
+            spec_lower, spec_upper = _prefix_bounds(version[:-2])
+        elif operator == "==":
+            spec_lower = spec_upper = (version_key(version), True)
+        elif operator == "~=":
+            release = Version(version).release
+            spec_lower = (version_key(version), True)
+            spec_upper = _prefix_bounds(".".join(str(part) for part in release[:-1]))[1]
+        elif operator in (">=", ">"):
+            spec_lower = (version_key(version), operator == ">=")
+        elif operator in ("<=", "<"):
+            spec_upper = (version_key(version), operator == "<=")
+
+        lower = _tighter(lower, spec_lower, lower=True)
+        upper = _tighter(upper, spec_upper, lower=False)
+    return lower, upper
+
+def resolve_range(keys: Sequence[Any], lower: Bound = None, upper: Bound = None) -> range:
+    """在升序排序键上二分查找落在边界内的下标区间"""
+    start = 0
+    if lower is not None:
+        start = (bisect.bisect_left if lower[1] else bisect.bisect_right)(keys, lower[0])
+    end = len(keys)
+    if upper is not None:
+        end = (bisect.bisect_right if upper[1] else bisect.bisect_left)(keys, upper[0])
+    return range(start, max(start, end))
+
+class _StoreSource:
+    """完整加载数据文件的查询来源，索引不可用时使用"""
+
+    def __init__(self, store: VersionStore):
+        self.store = store
+        self.keys = store.sorted_keys()
+        self._build_ids: Optional[List[Tuple[str, int]]] = None
+
+    def version(self, position: int) -> str:
+        return self.store.entry_at(position).get("version", "")
+
+    def entry(self, position: int) -> Optional[Dict[str, Any]]:
+        return self.store.entry_at(position)
+
+    def downloads(self, entry: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+        return self.store.downloads(entry)
+
+    def build_id_positions(self, prefix: str) -> List[int]:
+        if self._build_ids is None:
+            self._build_ids = sorted(
+                (self.store.entry_at(position).get("build_id") or "", position)
+                for position in range(len(self.store))
+            )
+        start = bisect.bisect_left(self._build_ids, (prefix, -1))
+        positions = []
+        for build_id, position in self._build_ids[start:]:
+            if not build_id.startswith(prefix):
+                break
+            positions.append(position)
+        return positions
+
+    def close(self) -> None:
+        pass
+
+class _IndexSource:
+    """基于版本索引的查询来源，只读取命中的条目"""
+
+    def __init__(self, index: Any, compact: bool):
+        self.index = index
+        self.compact = compact
+        self.keys = index.version_keys()
+
+    def version(self, position: int) -> str:
+        return self.index.version_at(position)
+
+    def entry(self, position: int) -> Optional[Dict[str, Any]]:
+        return self.index.read_entry(position)
+
+    def downloads(self, entry: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+        return expand_downloads(entry) if self.compact else entry.get("downloads", {})
+
+    def build_id_positions(self, prefix: str) -> List[int]:
+        return self.index.find_build_id_positions(prefix)
+
+    def close(self) -> None:
+        self.index.close()
+
+def _is_compact(data_file: str) -> bool:
+    """紧凑格式在文件开头标明格式版本，只读取文件头判断"""
+    with open(data_file, "rb") as f:
+        match = _FORMAT_HEADER.match(f.read(64))
+    return bool(match) and int(match.group(1)) == COMPACT_FORMAT
+
+class VersionQuery:
+    """按平台、架构、版本范围、构建哈希前缀和日期查询版本数据
+
+    版本索引可用时直接在 mmap 上的升序排序键中二分查找，只读取命中的条目；
+    索引缺失或与数据文件不一致时回退为加载完整数据。
+    """
+
+    def __init__(self, data_file: str, index_file: Optional[str] = None):
+        """初始化
+
+        Args:
+            data_file: 版本数据文件路径
+            index_file: 版本索引文件路径，None 时总是加载完整数据
+        """
+        self.data_file = data_file
+        self.source = None
+        if index_file:
+            from src.index import VersionIndex
+
+            index = VersionIndex.open(index_file, data_file)
+            if index is not None:
+                self.source = _IndexSource(index, _is_compact(data_file))
+            else:
+                logger.debug(f"版本索引不可用，加载完整数据: {index_file}")
+        if self.source is None:
+            self.source = _StoreSource(VersionStore.load(data_file))
+
+    def __enter__(self) -> "VersionQuery":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.source.close()
+
+    def _positions(self, specifier: Any, build_id: Optional[str]) -> Iterable[int]:
+        """候选条目的下标，按版本号从新到旧"""
+        if specifier is not None:
+            candidates = resolve_range(self.source.keys, *specifier_bounds(specifier))
+        else:
+            candidates = range(len(self.source.keys))
+        if build_id:
+            return sorted((position for position in self.source.build_id_positions(build_id) if position in candidates), reverse=True)
+        return reversed(candidates)
+
+    def find(
+        self,
+        platform: Optional[str] = None,
+        arch: Optional[str] = None,
+        specifier: Any = None,
+        build_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = None,
+        prereleases: Optional[bool] = None,
+    ) -> List[Dict[str, Any]]:
+        """按条件查询，结果按版本号从新到旧排列
+
+        Args:
+            platform: 平台（mac/windows/linux，也可写成 linux-arm64）
+            arch: 架构（universal/x64/arm64）
+            specifier: parse_specifier 返回的版本范围
+            build_id: 构建哈希前缀
+            since: 最早发布日期（YYYY-MM-DD，包含）
+            until: 最晚发布日期（YYYY-MM-DD，包含）
+            limit: 最多返回的条目数
+            prereleases: 是否包含预发布版本，None 时遵循版本范围的默认规则
+
+        Returns:
+            条目列表，downloads 只包含匹配平台和架构的可用链接
+        """
+        platform, arch = normalize_target(platform, arch)
+        results = []
+        for position in self._positions(specifier, build_id):
+            if specifier is not None and not self._matches(specifier, self.source.version(position), prereleases):
+                continue
+            entry = self.source.entry(position)
+            if entry is None:
+                continue
+            date = entry.get("date") or ""
+            if since and date < since or until and date > until:
+                continue
+
+            downloads = self._select_downloads(entry, platform, arch)
+            if (platform or arch) and not downloads:
+                continue
+            results.append({
+                "version": entry.get("version"),
+                "date": entry.get("date"),
+                "build_id": entry.get("build_id"),
+                "downloads": downloads,
+            })
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def _matches(self, specifier: Any, version: str, prereleases: Optional[bool]) -> bool:
+        try:
+            return specifier.contains(version, prereleases=prereleases)
+        except ValueError:
+            return False
+
+    def _select_downloads(self, entry: Dict[str, Any], platform: Optional[str], arch: Optional[str]) -> Dict[str, Dict[str, str]]:
+        """筛选平台和架构，跳过已标记失效的链接"""
+        dead = set(entry.get("dead_links", []))
+        selected = {}
+        for platform_name, urls in self.source.downloads(entry).items():
+            if platform and platform_name != platform:
+                continue
+            urls = {
+                arch_name: url
+                for arch_name, url in urls.items()
+                if url and (not arch or arch_name == arch) and f"{platform_name}/{arch_name}" not in dead
+            }
+            if urls:
+                selected[platform_name] = urls
+        return {name: selected[name] for name in PLATFORM_ORDER if name in selected}
+
+def result_urls(results: List[Dict[str, Any]]) -> List[str]:
+    """按结果顺序展开下载链接"""
+    return [url for result in results for urls in result["downloads"].values() for url in urls.values()]
@@ -4,11 +4,17 @@ from datetime import datetime
 import json
 import os
 import re
+import time
+from src.http_client import send_with_retries
+from src.metrics import RunMetrics
+from src.scheduler import FetchScheduler
+from src.store import VersionStore, find_version_entry
 from src.utils import logger, save_json_file
 
 from src.utils import (
     load_json_file, 
     async_make_request,
+    build_download_urls,
     compare_versions,
     format_date, 
     get_current_timestamp,
@@ -18,7 +24,12 @@ from src.utils import (
 
 class CursorVersionScanner:
     
-    API_ENDPOINT = "https://www.cursor.com/api/download?platform={platform}&releaseTrack=latest"
+    API_BASE_URL = "https://www.cursor.com"
+    API_PATH = "/api/download?platform={platform}&releaseTrack={track}"
+    API_ENDPOINT = API_BASE_URL + API_PATH
+    DEFAULT_TRACKS = ["latest"]
+    # 服务器要求的重试等待时间上限（秒），避免一次检查被拖得过久
+    MAX_RETRY_AFTER = 30
     
     PLATFORMS = {
         "win32": {
@@ -41,10 +52,81 @@ class CursorVersionScanner:
         }
     }
     
-    def __init__(self, data_file: str):
+    def __init__(
+        self,
+        data_file: str,
+        max_concurrency: int = 7,
+        fetch_timeout: Optional[float] = 60,
+        http_client: Any = None,
+        state_file: Optional[str] = None,
+        probe_platform: Optional[str] = "linux-x64",
+        tracks: Optional[List[str]] = None,
+        index_file: Optional[str] = None,
+        metrics: Optional[RunMetrics] = None,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5,
+        api_base_url: Optional[str] = None,
+    ):
+        """初始化
+
+        Args:
+            data_file: 版本数据文件路径
+            max_concurrency: 所有发布通道和平台共享的同时请求数上限
+            fetch_timeout: 获取所有平台的整体超时时间（秒），None 表示不限制
+            http_client: 共享的异步HTTP客户端（如 AsyncHttpClient），None 时每次请求临时建立连接
+            state_file: 记录各平台 ETag/Last-Modified 的状态文件路径，None 时不发送条件请求
+            probe_platform: 检查新版本时先请求的代表平台，None 时直接请求全部平台
+            tracks: 需要扫描的发布通道（releaseTrack），默认只扫描 latest
+            index_file: 版本索引文件路径，保存数据后增量更新，None 时不维护索引
+            metrics: 记录各阶段耗时和请求延迟的运行指标，None 时创建新的实例
+            max_retries: 请求失败（无响应、429 或 5xx）时的最大重试次数
+            retry_backoff: 首次重试前的等待时间（秒），之后每次翻倍；429 响应优先使用 Retry-After
+            api_base_url: 下载接口的基础地址（如本地模拟服务 http://127.0.0.1:8000），None 时使用官方地址
+        """
         self.data_file = data_file
-        self.versions_data = self._load_versions_data()
+        self.http_client = http_client
+        self.state_file = state_file
+        self.index_file = index_file
+        self.probe_platform = probe_platform
+        self.fetch_state = self._load_fetch_state()
+        # 最近一次保存是否实际改动了数据文件，以及本次运行新增和重新发布（构建哈希变化）的版本
+        self.data_changed = False
+        self.added_versions: List[Dict] = []
+        self.updated_versions: List[Dict] = []
+        self._fetch_state_dirty = False
+        self.max_concurrency = max_concurrency
+        self.fetch_timeout = fetch_timeout
+        self.tracks = list(tracks) if tracks else list(self.DEFAULT_TRACKS)
+        self.scheduler = FetchScheduler(max_concurrency)
+        self.metrics = metrics or RunMetrics()
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+        if api_base_url:
+            self.API_ENDPOINT = api_base_url.rstrip("/") + self.API_PATH
+        # 完整历史按需加载，只做检查时逐条读取数据文件即可
+        self._store: Optional[VersionStore] = None
         
+    @property
+    def store(self) -> VersionStore:
+        """版本数据模型，首次访问时加载数据文件"""
+        if self._store is None:
+            with self.metrics.stage("load_versions"):
+                self._store = VersionStore(self._load_versions_data())
+        return self._store
+
+    @store.setter
+    def store(self, store: VersionStore) -> None:
+        self._store = store
+
+    @property
+    def versions_data(self) -> Dict:
+        """以 versions.json 结构返回当前数据的快照"""
+        return self.store.to_data()
+
+    @versions_data.setter
+    def versions_data(self, data: Dict) -> None:
+        self._store = VersionStore(data)
+
     def _get_current_date(self) -> str:
         return datetime.now().strftime("%Y-%m-%d")
         
@@ -72,87 +154,227 @@ class CursorVersionScanner:
             logger.info(f"版本数据文件不存在，将创建新文件: {self.data_file}")
             return {"versions": []}
 
+    def _load_fetch_state(self) -> Dict[str, Dict[str, Any]]:
+        """加载各平台上次请求的校验信息"""
+        if not self.state_file:
+            return {}
+
+        state = load_json_file(self.state_file, {})
+        if not isinstance(state, dict) or not isinstance(state.get("platforms"), dict):
+            return {}
+        return state["platforms"]
+
+    def _save_fetch_state(self) -> None:
+        """保存各平台的校验信息，供下次发送条件请求"""
+        if not self.state_file or not self._fetch_state_dirty:
+            return
+
+        if save_json_file(self.state_file, {"platforms": self.fetch_state}):
+            self._fetch_state_dirty = False
+        else:
+            logger.warning(f"保存请求状态失败: {self.state_file}")
+
     async def check_new_version(self) -> bool:
         """检查是否有新版本"""
         logger.info("检查是否有新版本")
 
-        new_versions = await self._fetch_all_platforms()
+        fetched = await self.fetch_changes()
+        return bool(fetched["changed"])
 
-        if not new_versions:
-            logger.warning("未获取到版本信息")
+    async def _probe_releases(self) -> Optional[List[Dict[str, str]]]:
+        """每个发布通道只请求一个代表平台，获取其版本号和构建哈希"""
+        if not self.probe_platform:
+            return None
+
+        jobs = {
+            track: (lambda track=track: self._fetch_latest_download_info(self.probe_platform, track))
+            for track in self.tracks
+        }
+        with self.metrics.stage("probe_releases"):
+            results = await self.scheduler.gather(jobs, timeout=self.fetch_timeout)
+        self._save_fetch_state()
+
+        releases = []
+        for track, download in results.items():
+            if not download or not download.get("release"):
+                logger.warning(f"探测平台 {self.probe_platform} ({track}) 失败，回退为请求全部平台")
+                return None
+            releases.append(dict(download["release"], track=track))
+
+        return releases
+
+    def _probe_matches_history(self, release: Dict[str, str]) -> bool:
+        """判断探测结果是否与已记录的版本、构建哈希及发布通道一致"""
+        existing = self._find_existing_version(release.get("version"))
+        if existing is None:
+            logger.info(f"探测平台发现新版本: {release.get('version')}")
             return False
 
-        new_version = new_versions[0]
-        existing_versions = self.versions_data.get("versions", [])
+        existing_build_id = existing.get("build_id")
+        if existing_build_id and existing_build_id != release.get("build_id"):
+            logger.info(f"版本 {release.get('version')} 的构建哈希与历史记录不一致，将请求全部平台")
+            return False
 
-        for existing in existing_versions:
-            if existing.get("version") == new_version.get("version"):
-                logger.debug(f"版本 {new_version.get('version')} 已存在")
-                return False
+        if release.get("track") and release["track"] not in self._entry_tracks(existing):
+            logger.info(f"版本 {release.get('version')} 出现在新的发布通道: {release['track']}")
+            return False
 
-        logger.info(f"发现新版本: {new_version.get('version')}")
         return True
 
-    async def update_versions(self) -> bool:
-        """更新版本数据"""
-        logger.info("开始更新版本数据")
+    def _find_existing_version(self, version: Optional[str]) -> Optional[Dict]:
+        """查找已记录的同版本条目，尚未加载完整历史时只读取数据文件开头"""
+        if self._store is None and version:
+            try:
+                return find_version_entry(self.data_file, version)
+            except (ValueError, OSError) as e:
+                logger.warning(f"逐条读取版本数据失败，改为完整加载: {e}")
+        return self.store.get(version)
+
+    def _entry_tracks(self, entry: Dict) -> List[str]:
+        """获取条目记录的发布通道，旧数据均来自 latest"""
+        return entry.get("tracks") or list(self.DEFAULT_TRACKS)
+
+    def _is_new_version(self, new_version: Dict) -> bool:
+        """判断获取到的版本（或其所在的发布通道、重新发布的构建）是否尚未记录"""
+        existing = self._find_existing_version(new_version.get("version"))
+        if existing is None:
+            logger.info(f"发现新版本: {new_version.get('version')}")
+            return True
+
+        if new_version.get("build_id") and new_version["build_id"] != existing.get("build_id"):
+            logger.info(f"版本 {new_version.get('version')} 的构建哈希已变化: {new_version['build_id']}")
+            return True
+
+        new_tracks = set(new_version.get("tracks", [])) - set(self._entry_tracks(existing))
+        if new_tracks:
+            logger.info(f"版本 {new_version.get('version')} 出现在新的发布通道: {', '.join(sorted(new_tracks))}")
+            return True
+
+        logger.debug(f"版本 {new_version.get('version')} 已存在")
+        return False
+
+    async def fetch_changes(self, probe: bool = True) -> Dict[str, Any]:
+        """获取最新版本信息并找出尚未记录的版本
+
+        Args:
+            probe: 是否先请求代表平台，探测结果与历史一致时不再请求全部平台
+
+        Returns:
+            包含 success、versions（获取到的版本）、changed（新版本或出现在新通道的版本）、version 的结果字典
+        """
+        if probe:
+            probe_releases = await self._probe_releases()
+            if probe_releases and all(self._probe_matches_history(release) for release in probe_releases):
+                logger.debug(f"探测平台 {self.probe_platform} 未发现新版本")
+                return {"success": True, "versions": [], "changed": [], "version": probe_releases[0].get("version")}
 
-        logger.info("开始获取最新版本信息")
         new_versions = await self._fetch_all_platforms()
 
         if not new_versions:
-            logger.warning("未获取到新版本信息")
-            return False
+            logger.warning("未获取到版本信息")
+            return {"success": False, "versions": [], "changed": [], "version": None}
 
-        versions = self.process_versions(new_versions)
+        changed_versions = [item for item in new_versions if self._is_new_version(item)]
+        return {
+            "success": True,
+            "versions": new_versions,
+            "changed": changed_versions,
+            "version": (changed_versions or new_versions)[0].get("version"),
+        }
 
-        self.versions_data["versions"] = versions
-        self.versions_data["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def persist(self) -> bool:
+        """保存内存中的版本数据，没有变化时不写入"""
+        if not self.store.dirty:
+            logger.info("版本数据没有变化，跳过保存")
+            self.data_changed = False
+            return True
 
-        if save_json_file(self.data_file, self.versions_data):
+        self.store.meta["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        with self.metrics.stage("save_json_file"):
+            result = save_json_file(self.data_file, self.store.to_data())
+        if result:
+            self.store.dirty = False
+            self.data_changed = result.changed
+            with self.metrics.stage("update_index"):
+                self._update_index()
             logger.info(f"已成功保存数据到: {self.data_file}")
-            logger.info(f"成功更新版本数据，共 {len(versions)} 个版本")
+            logger.info(f"成功更新版本数据，共 {len(self.store)} 个版本")
             return True
         else:
             logger.error(f"保存数据失败: {self.data_file}")
             return False
         
+    def _update_index(self) -> None:
+        """数据文件变化后同步更新版本索引"""
+        if not self.index_file:
+            return
+
+        from src.index import update_index
+
+        try:
+            if update_index(self.data_file, self.index_file):
+                logger.info(f"已更新版本索引: {self.index_file}")
+        except Exception as e:
+            logger.warning(f"更新版本索引失败: {self.index_file}, 错误: {e}")
+
     async def _fetch_all_platforms(self) -> List[Dict]:
-        """获取所有平台的下载URL"""
+        """获取所有发布通道、所有平台的下载URL，同一版本合并记录其所在通道"""
+        platforms = self._iter_platforms()
+        jobs = {
+            (track, platform): (lambda track=track, platform=platform: self._fetch_latest_download_info(platform, track))
+            for track in self.tracks
+            for platform in platforms
+        }
+        with self.metrics.stage("fetch_all_platforms"):
+            results = await self.scheduler.gather(jobs, timeout=self.fetch_timeout)
+        self._save_fetch_state()
+
+        version_infos = {}
+        for track in self.tracks:
+            version_info = self._build_version_info(
+                {platform: results.get((track, platform)) for platform in platforms}
+            )
+            if not version_info:
+                continue
+
+            existing = version_infos.get(version_info["version"])
+            if existing:
+                existing["tracks"].append(track)
+            else:
+                version_info["tracks"] = [track]
+                version_infos[version_info["version"]] = version_info
+
+        return sort_version_entries(list(version_infos.values()))
+
+    def _build_version_info(self, results: Dict[str, Optional[Dict[str, Any]]]) -> Optional[Dict]:
+        """将单个发布通道各平台的请求结果合并为一条版本信息"""
         downloads = {}
         win_urls = {}
         mac_urls = {}
         linux_urls = {}
         release_candidates = []
-        
-        # 获取Windows平台下载链接
-        for platform in self.PLATFORMS["win32"]["platforms"]:
-            download = await self._fetch_latest_download_info(platform)
-            if download:
+
+        # 按 PLATFORMS 顺序合并结果，保证版本选择与平台顺序不受完成先后影响
+        for platform in self._iter_platforms():
+            download = results.get(platform)
+            if not download:
+                continue
+
+            if platform in self.PLATFORMS["win32"]["platforms"]:
                 arch = "x64" if "x64" in platform else "arm64"
                 win_urls[arch] = download["url"]
-                if download["release"]:
-                    release_candidates.append(download["release"])
-        
-        # 获取Mac平台下载链接
-        for platform, display_name in zip(
-            self.PLATFORMS["mac"]["platforms"],
-            self.PLATFORMS["mac"]["display_names"]
-        ):
-            download = await self._fetch_latest_download_info(platform)
-            if download:
+            elif platform in self.PLATFORMS["mac"]["platforms"]:
+                display_name = self.PLATFORMS["mac"]["display_names"][
+                    self.PLATFORMS["mac"]["platforms"].index(platform)
+                ]
                 mac_urls[display_name] = download["url"]
-                if download["release"]:
-                    release_candidates.append(download["release"])
-        
-        # 获取Linux平台下载链接
-        for platform in self.PLATFORMS["linux"]["platforms"]:
-            download = await self._fetch_latest_download_info(platform)
-            if download:
+            else:
                 arch = "x64" if "x64" in platform else "arm64"
                 linux_urls[arch] = download["url"]
-                if download["release"]:
-                    release_candidates.append(download["release"])
+
+            if download["release"]:
+                release_candidates.append(download["release"])
         
         if win_urls:
             downloads["windows"] = win_urls
@@ -163,7 +385,7 @@ class CursorVersionScanner:
             
         if not release_candidates:
             logger.error("无法从下载链接中提取版本号或commit_hash")
-            return []
+            return None
 
         latest_release = release_candidates[0]
         for candidate in release_candidates[1:]:
@@ -184,7 +406,15 @@ class CursorVersionScanner:
         # 确保所有平台都有完整的下载链接
         self._ensure_complete_downloads(version_info, version, commit_hash)
         
-        return [version_info]
+        return version_info
+
+    def _iter_platforms(self) -> List[str]:
+        """按 Windows、Mac、Linux 顺序列出所有待请求的平台"""
+        return [
+            platform
+            for group in ("win32", "mac", "linux")
+            for platform in self.PLATFORMS[group]["platforms"]
+        ]
 
     def _extract_release_from_response(self, data: Dict[str, Any], download_url: str) -> Optional[Dict[str, str]]:
         """优先使用 API 元数据提取版本信息，URL 解析只作为兜底"""
@@ -228,22 +458,8 @@ class CursorVersionScanner:
         """确保所有平台都有完整的下载链接"""
         downloads = version_info.setdefault("downloads", {})
 
-        mac_downloads = {
-            display_name: f"https://downloads.cursor.com/production/{commit_hash}/darwin/{display_name}/Cursor-darwin-{display_name}.dmg"
-            for display_name in self.PLATFORMS["mac"]["display_names"]
-        }
-        win_downloads = {
-            "x64": f"https://downloads.cursor.com/production/{commit_hash}/win32/x64/system-setup/CursorSetup-x64-{version}.exe",
-            "arm64": f"https://downloads.cursor.com/production/{commit_hash}/win32/arm64/system-setup/CursorSetup-arm64-{version}.exe"
-        }
-        linux_downloads = {
-            "x64": f"https://downloads.cursor.com/production/{commit_hash}/linux/x64/Cursor-{version}-x86_64.AppImage",
-            "arm64": f"https://downloads.cursor.com/production/{commit_hash}/linux/arm64/Cursor-{version}-aarch64.AppImage"
-        }
-
-        downloads["mac"] = self._merge_downloads(downloads.get("mac", {}), mac_downloads, version, commit_hash)
-        downloads["windows"] = self._merge_downloads(downloads.get("windows", {}), win_downloads, version, commit_hash)
-        downloads["linux"] = self._merge_downloads(downloads.get("linux", {}), linux_downloads, version, commit_hash)
+        for platform, expected in build_download_urls(version, commit_hash).items():
+            downloads[platform] = self._merge_downloads(downloads.get(platform, {}), expected, version, commit_hash)
                 
         # 按mac, windows, linux顺序重新排序平台
         if "downloads" in version_info:
@@ -277,8 +493,8 @@ class CursorVersionScanner:
 
         return True
     
-    async def _fetch_latest_download_info(self, platform: str) -> Optional[Dict[str, Any]]:
-        """获取指定平台的最新下载链接和版本元数据"""
+    async def _fetch_latest_download_info(self, platform: str, track: str = "latest") -> Optional[Dict[str, Any]]:
+        """获取指定发布通道、指定平台的最新下载链接和版本元数据"""
         # 处理特殊系统版本URL
         api_platform = platform
         is_system_version = False
@@ -287,11 +503,23 @@ class CursorVersionScanner:
             api_platform = platform.replace('-system', '')
             is_system_version = True
         
-        url = self.API_ENDPOINT.format(platform=api_platform)
+        url = self.API_ENDPOINT.format(platform=api_platform, track=track)
+        state_key = f"{track}:{platform}"
         logger.debug(f"尝试获取 {platform} 平台下载URL: {url}")
+
+        cached = self.fetch_state.get(state_key) if self.state_file else None
+        headers = self._conditional_headers(cached)
         
         try:
-            response = await async_make_request(url)
+            response = await self._request_with_retries(url, headers, state_key)
+            if response and response.status_code == 304 and cached:
+                # 内容未变化，直接复用上次解析的结果
+                logger.debug(f"{platform} 平台下载信息未变化")
+                return {
+                    "url": cached["url"],
+                    "release": cached.get("release"),
+                }
+
             if not response or response.status_code != 200:
                 logger.warning(f"获取 {platform} 平台下载URL失败: {response.status_code if response else 'No response'}")
                 return None
@@ -310,6 +538,7 @@ class CursorVersionScanner:
                     return None
 
                 release = self._extract_release_from_response(data, download_url)
+                self._remember_fetch_state(state_key, response, download_url, release)
                     
                 logger.debug(f"成功获取 {platform} 平台下载URL: {download_url}")
                 return {
@@ -325,31 +554,76 @@ class CursorVersionScanner:
             logger.error(f"获取 {platform} 平台下载URL时出错: {e}")
             return None
     
+    async def _request_with_retries(self, url: str, headers: Optional[Dict[str, str]], key: str) -> Optional[Any]:
+        """发送请求，无响应、429 或 5xx 时按退避时间重试，并记录延迟、状态码、重试次数和字节数"""
+        started = time.perf_counter()
+        response, retries = await send_with_retries(
+            lambda: async_make_request(url, headers=headers, client=self.http_client),
+            self.max_retries,
+            self.retry_backoff,
+            self.MAX_RETRY_AFTER,
+            label=key,
+        )
+        status = response.status_code if response else None
+        size = len(getattr(response, "content", b"") or b"") if response else 0
+        self.metrics.record_request(key, url, status, time.perf_counter() - started, size, retries)
+        return response
+
+    def _conditional_headers(self, cached: Optional[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+        """根据上次响应的校验信息构建条件请求头"""
+        if not cached or not cached.get("url"):
+            return None
+
+        headers = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        return headers or None
+
+    def _remember_fetch_state(self, state_key: str, response: Any, download_url: str, release: Optional[Dict[str, str]]) -> None:
+        """记录发布通道/平台响应的 ETag/Last-Modified 和解析结果"""
+        if not self.state_file:
+            return
+
+        response_headers = getattr(response, "headers", None) or {}
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not etag and not last_modified:
+            if self.fetch_state.pop(state_key, None) is not None:
+                self._fetch_state_dirty = True
+            return
+
+        entry = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "url": download_url,
+            "release": release,
+        }
+        if self.fetch_state.get(state_key) != entry:
+            self.fetch_state[state_key] = entry
+            self._fetch_state_dirty = True
+
     def process_versions(self, new_versions: List[Dict]) -> List[Dict]:
         """处理版本信息，合并新旧版本"""
+        self.added_versions = []
+        self.updated_versions = []
         if not new_versions:
             return []
-            
-        # 获取现有版本
-        existing_versions = self.versions_data.get("versions", [])
-        
-        # 合并版本
-        merged_versions = []
-        for new_version in new_versions:
-            # 确保平台顺序一致
-            if "downloads" in new_version:
-                new_version["downloads"] = order_downloads(new_version["downloads"])
-                
-            # 检查是否已存在相同版本
-            version_exists = False
-            for existing in existing_versions:
-                if existing.get("version") == new_version.get("version"):
-                    version_exists = True
-                    break
-                    
-            if not version_exists:
-                merged_versions.append(new_version)
-                
-        # 合并新旧版本
-        all_versions = existing_versions + merged_versions
-        return sort_version_entries(all_versions)
+
+        store = self.store
+        with self.metrics.stage("process_versions"):
+            for new_version in new_versions:
+                # 检查是否已存在相同版本，已存在时合并发布通道，构建哈希变化时改用新构建
+                existing = store.get(new_version.get("version"))
+                if existing is None:
+                    if store.insert(new_version):
+                        self.added_versions.append(new_version)
+                    continue
+                if store.replace_build(existing, new_version):
+                    logger.info(f"版本 {new_version.get('version')} 重新发布，构建哈希更新为 {existing['build_id']}")
+                    self.updated_versions.append(existing)
+                if new_version.get("tracks"):
+                    store.add_tracks(existing, new_version["tracks"], self.DEFAULT_TRACKS)
+
+            return store.versions()
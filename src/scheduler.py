@@ -0,0 +1,103 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from src.utils import logger
+
+class FetchScheduler:
+    """共享的异步请求调度器，所有请求共用一个全局并发上限，并可限制单个主机的并发数和全局请求速率"""
+
+    def __init__(self, max_concurrency: int = 7, per_host: Optional[int] = None, rate: Optional[float] = None):
+        """初始化
+
+        Args:
+            max_concurrency: 全局同时进行的请求数上限
+            per_host: 同一主机同时进行的请求数上限，None 表示只受全局上限约束
+            rate: 每秒最多开始的请求数，None 表示不限制
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host = max(1, per_host) if per_host else None
+        self.rate = rate if rate and rate > 0 else None
+        self._next_start = 0.0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind_loop(self) -> None:
+        """按事件循环创建信号量，避免跨 asyncio.run 复用导致的绑定错误"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._host_semaphores = {}
+            self._loop = loop
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        self._bind_loop()
+        return self._semaphore
+
+    def _get_host_semaphore(self, host: Optional[str]) -> Optional[asyncio.Semaphore]:
+        if not self.per_host or not host:
+            return None
+        self._bind_loop()
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self._host_semaphores[host]
+
+    async def _wait_for_rate(self) -> None:
+        """按固定间隔依次分配开始时间，使请求速率不超过 rate"""
+        if not self.rate:
+            return
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + 1.0 / self.rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def run(self, job: Callable[[], Awaitable[Any]], host: Optional[str] = None) -> Any:
+        """在全局（及主机）并发上限和速率限制内执行单个任务"""
+        host_semaphore = self._get_host_semaphore(host)
+        if host_semaphore is None:
+            async with self._get_semaphore():
+                await self._wait_for_rate()
+                return await job()
+        # 先占用主机名额再占用全局名额，避免等待同一主机的任务占满全局并发
+        async with host_semaphore:
+            async with self._get_semaphore():
+                await self._wait_for_rate()
+                return await job()
+
+    async def gather(
+        self,
+        jobs: Dict[Hashable, Callable[[], Awaitable[Any]]],
+        timeout: Optional[float] = None,
+        hosts: Optional[Dict[Hashable, str]] = None,
+    ) -> Dict[Hashable, Any]:
+        """并发执行一组任务，超时或出错的任务结果为 None，返回顺序与传入顺序一致
+
+        Args:
+            jobs: 任务标识到任务函数的映射
+            timeout: 整体超时时间（秒）
+            hosts: 任务标识到请求主机的映射，用于按主机限制并发
+        """
+        hosts = hosts or {}
+        tasks = {key: asyncio.ensure_future(self.run(job, hosts.get(key))) for key, job in jobs.items()}
+        if not tasks:
+            return {}
+
+        done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(f"请求超时，{len(pending)} 个请求已取消")
+
+        results = {}
+        for key, task in tasks.items():
+            if task in done and not task.cancelled() and task.exception() is None:
+                results[key] = task.result()
+            else:
+                if task in done and not task.cancelled():
+                    logger.error(f"请求 {key} 时出错: {task.exception()}")
+                results[key] = None
+        return results
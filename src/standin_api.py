@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, Dict, Optional, Union
+
+from aiohttp import web
+
+from src.utils import build_download_urls, load_json_file, logger
+
+# API 平台名与 versions.json 下载链接位置的对应关系
+PLATFORM_DOWNLOADS = {
+    "win32-x64": ("windows", "x64"),
+    "win32-arm64": ("windows", "arm64"),
+    "darwin-universal": ("mac", "universal"),
+    "darwin-x64": ("mac", "x64"),
+    "darwin-arm64": ("mac", "arm64"),
+    "linux-x64": ("linux", "x64"),
+    "linux-arm64": ("linux", "arm64"),
+}
+
+PerPlatform = Union[float, Dict[str, float]]
+
+_RANGE_HEADER = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def fixtures_from_release(version: str, build_id: str, tracks=("latest",)) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """按标准下载链接模板生成各发布通道、各平台的接口响应"""
+    downloads = build_download_urls(version, build_id)
+    responses = {
+        platform: {
+            "downloadUrl": downloads[group][arch],
+            "version": version,
+            "commitSha": build_id,
+        }
+        for platform, (group, arch) in PLATFORM_DOWNLOADS.items()
+    }
+    return {track: dict(responses) for track in tracks}
+
+def load_fixtures(file_path: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """读取录制的接口响应，格式为 {发布通道: {平台: 响应}}"""
+    return load_json_file(file_path, {})
+
+class StandInDownloadApi:
+    """模拟 Cursor 下载接口 /api/download?platform=…&releaseTrack=… 的本地服务
+
+    响应来自录制的 fixtures，可按平台配置延迟和错误率，超出速率限制时返回 429 + Retry-After，
+    并支持 ETag/If-None-Match 条件请求，供集成测试和压测在离线环境下运行完整的获取流程。
+    通过 add_artifact 注册的安装包以 /production/... 路径提供，支持 HEAD 和 Range 请求。
+    """
+
+    def __init__(
+        self,
+        fixtures: Dict[str, Dict[str, Dict[str, Any]]],
+        latency: PerPlatform = 0.0,
+        error_rate: PerPlatform = 0.0,
+        rate_limit: Optional[int] = None,
+        rate_window: float = 1.0,
+        retry_after: int = 1,
+        etag: bool = True,
+        seed: Optional[int] = None,
+    ):
+        """初始化
+
+        Args:
+            fixtures: 各发布通道、各平台的响应内容
+            latency: 响应前等待的秒数，可按平台分别配置（字典中 "*" 为默认值）
+            error_rate: 返回 500 的概率，可按平台分别配置
+            rate_limit: 每个时间窗口允许的请求数，超出时返回 429，None 表示不限制
+            rate_window: 速率限制的时间窗口（秒）
+            retry_after: 429 响应中 Retry-After 的秒数
+            etag: 是否返回 ETag 并处理 If-None-Match
+            seed: 错误注入的随机种子，便于复现
+        """
+        self.fixtures = fixtures
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.retry_after = retry_after
+        self.etag = etag
+        self.rng = random.Random(seed)
+        # 每个请求的记录：平台、发布通道、状态码
+        self.requests = []
+        self._window_started = 0.0
+        self._window_count = 0
+        self.artifacts: Dict[str, bytes] = {}
+        # 每个安装包请求的记录：方法、路径、Range、状态码
+        self.artifact_requests = []
+        self.allow_head = True
+        # 安装包路径 → 还需返回 503 的次数，用于模拟暂时性故障
+        self.artifact_failures: Dict[str, int] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url: Optional[str] = None
+
+    def add_artifact(self, path: str, content: bytes) -> None:
+        """注册一个安装包，path 形如 /production/<build_id>/linux/x64/Cursor-1.0.0-x86_64.AppImage"""
+        self.artifacts[path] = content
+
+    def artifact_url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def _for_platform(self, value: PerPlatform, platform: str) -> float:
+        if isinstance(value, dict):
+            return value.get(platform, value.get("*", 0.0))
+        return value
+
+    def _rate_limited(self) -> bool:
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        if now - self._window_started >= self.rate_window:
+            self._window_started = now
+            self._window_count = 0
+        self._window_count += 1
+        return self._window_count > self.rate_limit
+
+    async def handle_download(self, request: web.Request) -> web.Response:
+        platform = request.query.get("platform", "")
+        track = request.query.get("releaseTrack", "latest")
+        response = await self._respond(request, platform, track)
+        self.requests.append({"platform": platform, "track": track, "status": response.status})
+        return response
+
+    async def _respond(self, request: web.Request, platform: str, track: str) -> web.Response:
+        if self._rate_limited():
+            return web.json_response(
+                {"error": "Too Many Requests"},
+                status=429,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        delay = self._for_platform(self.latency, platform)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.rng.random() < self._for_platform(self.error_rate, platform):
+            return web.json_response({"error": "Internal Server Error"}, status=500)
+
+        payload = self.fixtures.get(track, {}).get(platform)
+        if payload is None:
+            return web.json_response({"error": "Not Found"}, status=404)
+
+        body = json.dumps(payload, sort_keys=True).encode("utf-8")
+        headers = {}
+        if self.etag:
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            headers["ETag"] = etag
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304, headers=headers)
+
+        return web.Response(body=body, content_type="application/json", headers=headers)
+
+    async def handle_artifact(self, request: web.Request) -> web.StreamResponse:
+        response = self._respond_artifact(request)
+        self.artifact_requests.append({
+            "method": request.method,
+            "path": request.path,
+            "range": request.headers.get("Range"),
+            "status": response.status,
+        })
+        return response
+
+    def _respond_artifact(self, request: web.Request) -> web.Response:
+        if self._rate_limited():
+            return web.Response(status=429, headers={"Retry-After": str(self.retry_after)})
+        if request.method == "HEAD" and not self.allow_head:
+            return web.Response(status=405)
+        if self.artifact_failures.get(request.path):
+            self.artifact_failures[request.path] -= 1
+            return web.Response(status=503)
+
+        content = self.artifacts.get(request.path)
+        if content is None:
+            return web.Response(status=404)
+
+        headers = {
+            "Accept-Ranges": "bytes",
+            "ETag": f'"{hashlib.sha1(content).hexdigest()}"',
+        }
+        match = _RANGE_HEADER.match(request.headers.get("Range", ""))
+        if not match or not any(match.groups()):
+            return web.Response(body=content, headers=headers, content_type="application/octet-stream")
+
+        start, end = match.groups()
+        if start:
+            start = int(start)
+            end = min(int(end), len(content) - 1) if end else len(content) - 1
+        else:
+            start = max(len(content) - int(end), 0)
+            end = len(content) - 1
+        if start >= len(content) or start > end:
+            return web.Response(status=416, headers={"Content-Range": f"bytes */{len(content)}"})
+
+        headers["Content-Range"] = f"bytes {start}-{end}/{len(content)}"
+        return web.Response(
+            status=206,
+            body=content[start:end + 1],
+            headers=headers,
+            content_type="application/octet-stream",
+        )
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/api/download", self.handle_download)
+        app.router.add_get("/production/{tail:.*}", self.handle_artifact)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """启动服务并返回基础地址（如 http://127.0.0.1:54321），port 为 0 时自动分配端口"""
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_host, bound_port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{bound_host}:{bound_port}"
+        logger.info(f"本地下载接口已启动: {self.base_url}/api/download")
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "StandInDownloadApi":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
@@ -0,0 +1,300 @@
+import bisect
+import json
+import os
+import re
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from src.utils import PLATFORM_ORDER, build_download_urls, load_json_file, logger, order_downloads
+from src.versioning import version_key
+
+# 紧凑格式：只保存与模板不同的下载链接，完整链接按需由 version 和 build_id 生成
+COMPACT_FORMAT = 2
+
+def _expected_downloads(entry: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    """条目对应的标准下载链接，缺少构建哈希时无法推导"""
+    if not entry.get("build_id") or not entry.get("version"):
+        return {}
+    return build_download_urls(entry["version"], entry["build_id"])
+
+def compact_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """把完整条目转换为紧凑格式，downloads 只保留与模板不同的链接（None 表示缺失）"""
+    compacted = {key: value for key, value in entry.items() if key != "downloads"}
+    actual = entry.get("downloads") or {}
+    expected = _expected_downloads(entry)
+
+    overrides = {}
+    for platform in PLATFORM_ORDER:
+        actual_urls = actual.get(platform) or {}
+        expected_urls = expected.get(platform, {})
+        diff = {}
+        for arch, url in expected_urls.items():
+            if actual_urls.get(arch) != url:
+                diff[arch] = actual_urls.get(arch)
+        for arch, url in actual_urls.items():
+            if arch not in expected_urls:
+                diff[arch] = url
+        if diff:
+            overrides[platform] = diff
+
+    if overrides:
+        compacted["downloads"] = overrides
+    return compacted
+
+def expand_downloads(entry: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    """由紧凑条目生成完整的下载链接"""
+    expected = _expected_downloads(entry)
+    overrides = entry.get("downloads") or {}
+
+    downloads = {}
+    for platform in PLATFORM_ORDER:
+        urls = dict(expected.get(platform, {}))
+        for arch, url in (overrides.get(platform) or {}).items():
+            if url is None:
+                urls.pop(arch, None)
+            else:
+                urls[arch] = url
+        if urls:
+            downloads[platform] = urls
+    return downloads
+
+def expand_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """把紧凑条目转换为完整条目"""
+    expanded = {key: value for key, value in entry.items() if key != "downloads"}
+    expanded["downloads"] = expand_downloads(entry)
+    return expanded
+
+_VERSIONS_ARRAY = re.compile(r'"versions"\s*:\s*\[')
+_ENTRY_SEPARATOR = re.compile(r'[\s,]*')
+
+def _read_more(f: BinaryIO, chunk_size: int, file_name: str) -> str:
+    chunk = f.read(chunk_size)
+    if not chunk:
+        raise ValueError(f"版本数据文件不完整: {file_name}")
+    return chunk.decode("latin-1")
+
+def iter_entry_spans(f: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[Tuple[Dict[str, Any], int, int]]:
+    """逐条解析数据文件 versions 数组中的条目，返回 (条目, 字节偏移, 字节长度)
+
+    按 latin-1 解码使字符位置与字节位置一一对应；JSON 的结构字符均为 ASCII，
+    条目中含非 ASCII 字符时再按 UTF-8 重新解析该条目。调用方可随时停止，不必读取整个文件。
+    """
+    file_name = getattr(f, "name", "<stream>")
+    decoder = json.JSONDecoder()
+    buffer = ""
+    # buffer[0] 在文件中的字节偏移
+    base = 0
+    while True:
+        match = _VERSIONS_ARRAY.search(buffer)
+        if match:
+            position = match.end()
+            break
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        buffer += chunk.decode("latin-1")
+
+    while True:
+        position = _ENTRY_SEPARATOR.match(buffer, position).end()
+        if position < len(buffer) and buffer[position] == "]":
+            return
+
+        try:
+            if position >= len(buffer):
+                raise json.JSONDecodeError("", buffer, position)
+            entry, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            buffer = buffer[position:] + _read_more(f, chunk_size, file_name)
+            base += position
+            position = 0
+            continue
+
+        text = buffer[position:end]
+        if not text.isascii():
+            entry = json.loads(text.encode("latin-1").decode("utf-8"))
+        yield entry, base + position, end - position
+        position = end
+
+def iter_version_entries(file_path: str, chunk_size: int = 64 * 1024) -> Iterator[Dict[str, Any]]:
+    """逐条读取 versions.json 中的版本条目，调用方可随时停止，不必解析整个文件"""
+    if not os.path.exists(file_path):
+        return
+
+    with open(file_path, "rb") as f:
+        for entry, _, _ in iter_entry_spans(f, chunk_size):
+            yield entry
+
+def find_version_entry(file_path: str, version: str) -> Optional[Dict[str, Any]]:
+    """在按版本号倒序保存的数据文件中查找版本，读到更旧的版本即停止"""
+    target = version_key(version)
+    for entry in iter_version_entries(file_path):
+        key = version_key(entry.get("version", "0.0.0"))
+        if key == target and entry.get("version") == version:
+            return entry
+        if key < target:
+            return None
+    return None
+
+class VersionStore:
+    """版本数据的内存模型，按版本号和构建哈希建立索引并保持有序"""
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        """初始化
+
+        Args:
+            data: versions.json 格式的数据，versions 之外的字段（如 last_updated）原样保留
+        """
+        data = dict(data or {})
+        versions = data.pop("versions", None) or []
+        self.compact = data.pop("format", None) == COMPACT_FORMAT
+        self.meta: Dict[str, Any] = data
+        # 按版本号升序保存，对外按降序迭代
+        self._entries: List[Dict[str, Any]] = []
+        self._keys: List[Any] = []
+        self._by_version: Dict[str, Dict[str, Any]] = {}
+        self._by_build_id: Dict[str, Dict[str, Any]] = {}
+        # 加载后是否有条目被新增或修改
+        self.dirty = False
+
+        for entry in sorted(versions, key=lambda item: version_key(item.get("version", "0.0.0"))):
+            self._append_sorted(entry)
+
+    @classmethod
+    def load(cls, file_path: str) -> "VersionStore":
+        """从数据文件加载，文件不存在或格式不正确时返回空数据"""
+        data = load_json_file(file_path, {"versions": []})
+        if not isinstance(data, dict):
+            logger.warning(f"版本数据格式不正确: {file_path}")
+            data = {"versions": []}
+        return cls(data)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """按版本号从新到旧迭代"""
+        return reversed(self._entries)
+
+    def __contains__(self, version: str) -> bool:
+        return version in self._by_version
+
+    def _append_sorted(self, entry: Dict[str, Any]) -> None:
+        """追加一个已知不小于现有条目的版本（用于初始化）"""
+        version = entry.get("version", "0.0.0")
+        if version in self._by_version:
+            logger.debug(f"忽略重复版本: {version}")
+            return
+        self._entries.append(entry)
+        self._keys.append(version_key(version))
+        self._index(entry)
+
+    def _index(self, entry: Dict[str, Any]) -> None:
+        self._by_version[entry.get("version", "0.0.0")] = entry
+        if entry.get("build_id"):
+            self._by_build_id[entry["build_id"]] = entry
+
+    def get(self, version: Optional[str]) -> Optional[Dict[str, Any]]:
+        """按版本号查找条目"""
+        return self._by_version.get(version)
+
+    def get_by_build_id(self, build_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """按构建哈希查找条目"""
+        return self._by_build_id.get(build_id)
+
+    def sorted_keys(self) -> List[Any]:
+        """按版本号升序的排序键，下标与 entry_at 一致"""
+        return self._keys
+
+    def entry_at(self, position: int) -> Dict[str, Any]:
+        """按版本号升序的第 position 个条目"""
+        return self._entries[position]
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """返回版本号最大的条目"""
+        return self._entries[-1] if self._entries else None
+
+    def insert(self, entry: Dict[str, Any]) -> bool:
+        """按版本号二分插入新条目，版本已存在时返回 False"""
+        version = entry.get("version", "0.0.0")
+        if version in self._by_version:
+            return False
+
+        if self.compact:
+            entry = compact_entry(entry)
+        elif "downloads" in entry:
+            entry["downloads"] = order_downloads(entry["downloads"])
+
+        key = version_key(version)
+        position = bisect.bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._entries.insert(position, entry)
+        self._index(entry)
+        self.dirty = True
+        return True
+
+    def add_tracks(self, entry: Dict[str, Any], tracks: List[str], default: List[str]) -> bool:
+        """为已有条目追加发布通道，未记录通道的旧条目视为 default，返回是否有变化"""
+        current = entry.get("tracks") or list(default)
+        merged = list(current)
+        for track in tracks:
+            if track not in merged:
+                merged.append(track)
+        if merged == current:
+            return False
+        entry["tracks"] = merged
+        self.dirty = True
+        return True
+
+    def replace_build(self, entry: Dict[str, Any], new_entry: Dict[str, Any]) -> bool:
+        """同一版本重新发布时改用新的构建哈希和下载链接，返回是否有变化
+
+        旧构建的安装包元数据和失效标记不再适用，一并清除。
+        """
+        build_id = new_entry.get("build_id")
+        if not build_id or build_id == entry.get("build_id"):
+            return False
+
+        if self._by_build_id.get(entry.get("build_id")) is entry:
+            del self._by_build_id[entry["build_id"]]
+        entry["build_id"] = build_id
+        entry["downloads"] = order_downloads(new_entry.get("downloads") or {})
+        for key in ("artifacts", "dead_links"):
+            entry.pop(key, None)
+        if self.compact:
+            # 紧凑格式只保留与新模板不同的链接
+            overrides = compact_entry(entry).get("downloads")
+            entry.pop("downloads")
+            if overrides:
+                entry["downloads"] = overrides
+        self._by_build_id[build_id] = entry
+        self.dirty = True
+        return True
+
+    def downloads(self, entry: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+        """返回条目的完整下载链接，紧凑格式下按需生成"""
+        if self.compact:
+            return expand_downloads(entry)
+        return entry.get("downloads", {})
+
+    def set_compact(self, compact: bool) -> None:
+        """在紧凑格式与完整格式之间转换所有条目"""
+        if compact == self.compact:
+            return
+        convert = compact_entry if compact else expand_entry
+        self._entries = [convert(entry) for entry in self._entries]
+        self._by_version = {}
+        self._by_build_id = {}
+        for entry in self._entries:
+            self._index(entry)
+        self.compact = compact
+        self.dirty = True
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """按版本号从新到旧返回所有条目"""
+        return list(reversed(self._entries))
+
+    def to_data(self) -> Dict[str, Any]:
+        """转换为 versions.json 的数据结构，紧凑格式会在开头标明格式版本"""
+        data = {"format": COMPACT_FORMAT} if self.compact else {}
+        data["versions"] = self.versions()
+        data.update(self.meta)
+        return data
@@ -1,12 +1,16 @@
 import os
 import json
+import hashlib
 import logging
-import requests
-import asyncio
-from functools import cmp_to_key
-from typing import Dict, Any, Optional, List
+import tempfile
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, NamedTuple
 from datetime import datetime
 
+from src.versioning import version_key
+
+if TYPE_CHECKING:
+    import requests
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -15,6 +19,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger('cursor-scanner')
 PLATFORM_ORDER = ("mac", "windows", "linux")
+DOWNLOAD_BASE_URL = "https://downloads.cursor.com"
+DEFAULT_HEADERS = {
+    'User-Agent': 'Cursor-Version-Scanner',
+    'Cache-Control': 'no-cache',
+}
 
 def ensure_dir_exists(directory: str) -> None:
     """确保目录存在，不存在则创建"""
@@ -41,25 +50,81 @@ def load_json_file(file_path: str, default_value: Any = None) -> Any:
         logger.error(f"读取JSON文件失败: {file_path}, 错误: {e}")
         return default_value
 
-def save_json_file(file_path: str, data: Dict) -> bool:
-    """保存JSON数据到文件"""
+class SaveResult(NamedTuple):
+    """保存结果：success 表示是否保存成功，changed 表示文件内容是否发生了变化"""
+    success: bool
+    changed: bool
+
+    def __bool__(self) -> bool:
+        return self.success
+
+def _file_digest(file_path: str) -> Optional[str]:
+    """计算文件内容的 SHA-256，文件不存在时返回 None"""
+    if not os.path.exists(file_path):
+        return None
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def atomic_write(file_path: str, content: bytes) -> bool:
+    """原子写入文件（临时文件 + fsync + rename），内容与现有文件一致时跳过，返回是否写入"""
+    if os.path.exists(file_path) and os.path.getsize(file_path) == len(content):
+        if _file_digest(file_path) == hashlib.sha256(content).hexdigest():
+            return False
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+
+        mode = os.stat(file_path).st_mode & 0o777 if os.path.exists(file_path) else 0o644
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    # 同步目录项，确保 rename 在断电后依然生效
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return True
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+    return True
+
+def save_json_file(file_path: str, data: Dict) -> SaveResult:
+    """保存JSON数据到文件，内容未变化时不写入"""
     try:
         if "versions" in data:
             data["versions"] = sort_version_entries(data["versions"])
-                    
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        return True
+
+        content = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        changed = atomic_write(file_path, content)
+        if not changed:
+            logger.debug(f"文件内容未变化，跳过写入: {file_path}")
+        return SaveResult(True, changed)
     except Exception as e:
         logger.error(f"保存JSON文件失败: {e}")
-        return False
+        return SaveResult(False, False)
 
-def make_request(url: str, headers: Dict = None, timeout: int = 10) -> Optional[requests.Response]:
+def make_request(url: str, headers: Dict = None, timeout: int = 10) -> Optional["requests.Response"]:
     """发送HTTP请求并返回响应"""
-    default_headers = {
-        'User-Agent': 'Cursor-Version-Scanner',
-        'Cache-Control': 'no-cache',
-    }
+    # requests 及其依赖导入较慢，只在同步请求时加载
+    import requests
+
+    default_headers = dict(DEFAULT_HEADERS)
     
     if headers:
         default_headers.update(headers)
@@ -71,10 +136,18 @@ def make_request(url: str, headers: Dict = None, timeout: int = 10) -> Optional[
         logger.error(f"请求失败: {url}, 错误: {e}")
         return None
 
-async def async_make_request(url: str, headers: Dict = None, timeout: int = 10) -> Optional[requests.Response]:
-    """异步发送HTTP请求并返回响应"""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, lambda: make_request(url, headers, timeout))
+async def async_make_request(url: str, headers: Dict = None, timeout: int = 10, client: Any = None) -> Optional[Any]:
+    """异步发送HTTP请求并返回响应
+
+    传入 client 时复用其连接池，否则临时创建一个仅用于本次请求的客户端
+    """
+    if client is not None:
+        return await client.get(url, headers=headers)
+
+    from src.http_client import AsyncHttpClient
+
+    async with AsyncHttpClient(read_timeout=timeout) as temp_client:
+        return await temp_client.get(url, headers=headers)
 
 def format_date(date_str: Any) -> str:
     """格式化日期字符串为YYYY-MM-DD格式"""
@@ -97,33 +170,9 @@ def format_date(date_str: Any) -> str:
 
 def compare_versions(version1: str, version2: str) -> int:
     """比较两个版本号"""
-    try:
-        v1_parts = [int(part) for part in version1.split('.')]
-        v2_parts = [int(part) for part in version2.split('.')]
-        
-        # 确保两个版本号有相同的部分数
-        while len(v1_parts) < len(v2_parts):
-            v1_parts.append(0)
-        while len(v2_parts) < len(v1_parts):
-            v2_parts.append(0)
-            
-        # 比较每个部分
-        for i in range(len(v1_parts)):
-            if v1_parts[i] > v2_parts[i]:
-                return 1
-            elif v1_parts[i] < v2_parts[i]:
-                return -1
-                
-        return 0
-    except Exception as e:
-        logger.error(f"版本比较失败: {version1} vs {version2}, 错误: {e}")
-        # 回退到字符串比较
-        if version1 > version2:
-            return 1
-        elif version1 < version2:
-            return -1
-        else:
-            return 0
+    left = version_key(version1)
+    right = version_key(version2)
+    return (left > right) - (left < right)
 
 def order_downloads(downloads: Dict[str, Any]) -> Dict[str, Any]:
     """按统一的平台顺序整理下载链接"""
@@ -136,6 +185,24 @@ def order_downloads(downloads: Dict[str, Any]) -> Dict[str, Any]:
             ordered_downloads[platform] = downloads[platform]
     return ordered_downloads
 
+def build_download_urls(version: str, build_id: str) -> Dict[str, Dict[str, str]]:
+    """根据版本号和构建哈希生成各平台的标准下载链接"""
+    base_url = f"{DOWNLOAD_BASE_URL}/production/{build_id}"
+    return {
+        "mac": {
+            arch: f"{base_url}/darwin/{arch}/Cursor-darwin-{arch}.dmg"
+            for arch in ("universal", "x64", "arm64")
+        },
+        "windows": {
+            "x64": f"{base_url}/win32/x64/system-setup/CursorSetup-x64-{version}.exe",
+            "arm64": f"{base_url}/win32/arm64/system-setup/CursorSetup-arm64-{version}.exe",
+        },
+        "linux": {
+            "x64": f"{base_url}/linux/x64/Cursor-{version}-x86_64.AppImage",
+            "arm64": f"{base_url}/linux/arm64/Cursor-{version}-aarch64.AppImage",
+        },
+    }
+
 def sort_version_entries(versions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """按语义版本号倒序整理版本列表，并规范平台顺序"""
     normalized_versions = []
@@ -147,12 +214,7 @@ def sort_version_entries(versions: List[Dict[str, Any]]) -> List[Dict[str, Any]]
         normalized_versions.append(normalized_version)
 
     normalized_versions.sort(
-        key=cmp_to_key(
-            lambda left, right: compare_versions(
-                left.get("version", "0.0.0"),
-                right.get("version", "0.0.0"),
-            )
-        ),
+        key=lambda item: version_key(item.get("version", "0.0.0")),
         reverse=True,
     )
     return normalized_versions
@@ -0,0 +1,74 @@
+import re
+from functools import lru_cache
+from typing import Any, Tuple
+
+_NUMERIC_VERSION = re.compile(r"^\d+(?:\.\d+)*$")
+_PRE_RELEASE_RANK = {"a": 0, "b": 1, "rc": 2}
+
+# 各部分的取值保证同一位置上的类型一致，元组可以直接比较
+_FINAL_RELEASE = (3, 0)
+_NO_POST = (-1,)
+_NO_DEV = (1, 0)
+
+class ParsedVersion:
+    """解析后的版本号，key 为可直接比较的元组排序键"""
+
+    __slots__ = ("raw", "key")
+
+    def __init__(self, raw: str, key: Tuple[Any, ...]):
+        self.raw = raw
+        self.key = key
+
+    def __repr__(self) -> str:
+        return f"ParsedVersion({self.raw!r})"
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ParsedVersion) and self.key == other.key
+
+    def __lt__(self, other: "ParsedVersion") -> bool:
+        return self.key < other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+def _strip_trailing_zeros(release: Tuple[int, ...]) -> Tuple[int, ...]:
+    """1.0 与 1.0.0 视为同一版本"""
+    end = len(release)
+    while end > 1 and release[end - 1] == 0:
+        end -= 1
+    return release[:end]
+
+@lru_cache(maxsize=None)
+def parse_version(raw: str) -> ParsedVersion:
+    """解析版本号并按字符串缓存结果，预发布后缀按 PEP 440 规则排序"""
+    text = (raw or "").strip()
+
+    if _NUMERIC_VERSION.match(text):
+        release = _strip_trailing_zeros(tuple(int(part) for part in text.split(".")))
+        return ParsedVersion(raw, (1, (0,) + release, _FINAL_RELEASE, _NO_POST, _NO_DEV, ""))
+
+    # 纯数字版本走快速路径，只有带后缀的版本才需要加载 packaging
+    from packaging.version import InvalidVersion, Version
+
+    try:
+        parsed = Version(text)
+    except InvalidVersion:
+        # 无法解析的版本排在所有合法版本之后（倒序时在末尾），同类之间按字符串比较
+        return ParsedVersion(raw, (0, (), _FINAL_RELEASE, _NO_POST, _NO_DEV, text))
+
+    if parsed.pre is not None:
+        pre = (1, _PRE_RELEASE_RANK[parsed.pre[0]], parsed.pre[1])
+    elif parsed.dev is not None and parsed.post is None:
+        # 1.0.dev1 早于 1.0a1
+        pre = (0, 0)
+    else:
+        pre = _FINAL_RELEASE
+
+    post = _NO_POST if parsed.post is None else (parsed.post,)
+    dev = _NO_DEV if parsed.dev is None else (0, parsed.dev)
+    release = _strip_trailing_zeros(parsed.release)
+    return ParsedVersion(raw, (1, (parsed.epoch,) + release, pre, post, dev, ""))
+
+def version_key(raw: str) -> Tuple[Any, ...]:
+    """返回版本号的元组排序键"""
+    return parse_version(raw).key
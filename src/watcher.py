@@ -0,0 +1,109 @@
+import asyncio
+import random
+import signal
+from typing import Any, Callable, Dict, Optional
+
+from src.pipeline import VersionPipeline
+from src.utils import logger
+
+class VersionWatcher:
+    """常驻进程，复用同一个扫描器、数据模型和HTTP连接按自适应间隔轮询新版本
+
+    检测到新版本后缩短到最小间隔，之后每次没有变化时按倍数退避直到最大间隔，每次等待附加随机抖动。
+    """
+
+    def __init__(
+        self,
+        pipeline: VersionPipeline,
+        min_interval: float = 300,
+        max_interval: float = 3600,
+        backoff: float = 2.0,
+        jitter: float = 0.1,
+        rng: Optional[random.Random] = None,
+        on_poll: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        """初始化
+
+        Args:
+            pipeline: 每次轮询执行的版本处理流程
+            min_interval: 检测到新版本后的轮询间隔（秒）
+            max_interval: 长时间没有新版本时的最大轮询间隔（秒）
+            backoff: 没有新版本时间隔的增长倍数
+            jitter: 随机抖动占间隔的比例，如 0.1 表示 ±10%
+            rng: 随机数生成器，便于测试时固定抖动
+            on_poll: 每次轮询结束后调用，参数为本次结果（如输出运行指标）
+        """
+        self.pipeline = pipeline
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.backoff = backoff
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self.on_poll = on_poll
+        self.interval = min_interval
+        self.polls = 0
+        self._stop = asyncio.Event()
+
+    def stop(self) -> None:
+        """请求停止轮询，当前轮询结束后退出"""
+        if not self._stop.is_set():
+            logger.info("收到停止信号，正在退出监视模式")
+        self._stop.set()
+
+    def next_interval(self, result: Dict[str, Any]) -> float:
+        """根据本次结果计算下一次轮询的基础间隔"""
+        if result.get("new_version"):
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return self.interval
+
+    def _with_jitter(self, interval: float) -> float:
+        if not self.jitter:
+            return interval
+        return max(0.0, interval * (1 + self.rng.uniform(-self.jitter, self.jitter)))
+
+    def install_signal_handlers(self) -> None:
+        """收到 SIGTERM/SIGINT 时平稳退出"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                # Windows 等平台不支持在事件循环中注册信号处理
+                pass
+
+    async def run(self, max_polls: Optional[int] = None) -> None:
+        """持续轮询直到收到停止信号
+
+        Args:
+            max_polls: 最多轮询次数，None 表示不限制
+        """
+        logger.info(f"进入监视模式，轮询间隔 {self.min_interval:g}~{self.max_interval:g} 秒")
+
+        while not self._stop.is_set():
+            try:
+                result = await self.pipeline.run(probe=True)
+            except Exception as e:
+                logger.error(f"轮询时出错: {e}")
+                result = {"success": False, "new_version": False}
+
+            self.polls += 1
+            if self.on_poll:
+                self.on_poll(result)
+            if result.get("new_version"):
+                logger.info(f"检测到新版本: {result.get('version')}")
+            elif not result.get("success"):
+                logger.warning("本次轮询失败，稍后重试")
+
+            if max_polls is not None and self.polls >= max_polls:
+                break
+
+            delay = self._with_jitter(self.next_interval(result))
+            logger.debug(f"{delay:.0f} 秒后再次检查")
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+        logger.info(f"监视模式已退出，共轮询 {self.polls} 次")
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from src.backfill import HistoryBackfill, load_candidates
+from src.http_client import AsyncHttpClient
+from src.scanner import CursorVersionScanner
+from src.scheduler import FetchScheduler
+from src.standin_api import StandInDownloadApi
+from src.utils import build_download_urls, save_json_file
+
+EXISTING_BUILD = "d1893fd7f5de2b705e0c040fb710b08f6afd4239"
+RELEASED_BUILD = "68fbec5aed9da587d1c6a64172792f505bafa252"
+MISSING_BUILD = "a1f686545fd0ce8917bbd2449f733551a9bce420"
+
+
+class HistoryBackfillTests(unittest.TestCase):
+    def test_backfill_confirms_candidates_merges_once_and_resumes_from_checkpoint(self) -> None:
+        api = StandInDownloadApi({})
+        for platform, arch in (("linux", "x64"), ("windows", "x64")):
+            url = build_download_urls("2.6.17", RELEASED_BUILD)[platform][arch]
+            api.add_artifact(url.split("downloads.cursor.com", 1)[1], b"installer")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_file = Path(temp_dir) / "versions.json"
+            checkpoint_file = Path(temp_dir) / "versions.backfill.json"
+            save_json_file(str(data_file), {"versions": [
+                {"version": "2.6.18", "date": "2025-01-02", "build_id": EXISTING_BUILD, "downloads": build_download_urls("2.6.18", EXISTING_BUILD)},
+            ]})
+            candidates_file = Path(temp_dir) / "candidates.txt"
+            candidates_file.write_text(
+                "# 版本号 构建哈希 [日期]\n"
+                f"2.6.17 {RELEASED_BUILD} 2025-01-01\n"
+                f"https://downloads.cursor.com/production/{RELEASED_BUILD}/linux/x64/Cursor-2.6.17-x86_64.AppImage\n"
+                f"2.6.16,{MISSING_BUILD}\n"
+                f"2.6.18 {EXISTING_BUILD}\n",
+                encoding="utf-8",
+            )
+
+            async def run() -> list:
+                reports = []
+                async with api, AsyncHttpClient() as client:
+                    for _ in range(2):
+                        scanner = CursorVersionScanner(str(data_file), index_file=None)
+                        candidates = load_candidates(str(candidates_file), scanner)
+                        backfill = HistoryBackfill(
+                            scanner,
+                            client,
+                            checkpoint_file=str(checkpoint_file),
+                            rate=None,
+                            retry_backoff=0,
+                            probe_base_url=api.base_url,
+                        )
+                        reports.append(await backfill.run(candidates))
+                return reports
+
+            first, second = asyncio.run(run())
+            data = json.loads(data_file.read_text(encoding="utf-8"))
+            checkpoint = json.loads(checkpoint_file.read_text(encoding="utf-8"))
+
+        self.assertEqual(first, {"probed": 2, "confirmed": 1, "unresolved": 0, "added": ["2.6.17"]})
+        self.assertEqual(second, {"probed": 0, "confirmed": 0, "unresolved": 0, "added": []})
+        self.assertEqual(len(api.artifact_requests), 4)
+        self.assertEqual([entry["version"] for entry in data["versions"]], ["2.6.18", "2.6.17"])
+        backfilled = data["versions"][1]
+        self.assertEqual((backfilled["date"], backfilled["build_id"]), ("2025-01-01", RELEASED_BUILD))
+        self.assertEqual(backfilled["downloads"], build_download_urls("2.6.17", RELEASED_BUILD))
+        self.assertEqual(
+            {key: value["ok"] for key, value in checkpoint["checked"].items()},
+            {f"2.6.17:{RELEASED_BUILD}": True, f"2.6.16:{MISSING_BUILD}": False},
+        )
+
+    def test_transient_failure_is_not_checkpointed_and_retried_next_run(self) -> None:
+        api = StandInDownloadApi({})
+        paths = []
+        for platform, arch in (("linux", "x64"), ("windows", "x64")):
+            url = build_download_urls("2.6.17", RELEASED_BUILD)[platform][arch]
+            paths.append(url.split("downloads.cursor.com", 1)[1])
+            api.add_artifact(paths[-1], b"installer")
+        api.artifact_failures[paths[0]] = 1
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_file = Path(temp_dir) / "versions.json"
+            checkpoint_file = Path(temp_dir) / "versions.backfill.json"
+            save_json_file(str(data_file), {"versions": [
+                {"version": "2.6.18", "date": "2025-01-02", "build_id": EXISTING_BUILD, "downloads": build_download_urls("2.6.18", EXISTING_BUILD)},
+            ]})
+            candidates = [{"version": "2.6.17", "build_id": RELEASED_BUILD, "date": "2025-01-01"}]
+
+            async def run() -> list:
+                reports = []
+                async with api, AsyncHttpClient() as client:
+                    for _ in range(2):
+                        scanner = CursorVersionScanner(str(data_file), index_file=None)
+                        backfill = HistoryBackfill(
+                            scanner,
+                            client,
+                            checkpoint_file=str(checkpoint_file),
+                            rate=None,
+                            max_retries=0,
+                            probe_base_url=api.base_url,
+                        )
+                        reports.append(await backfill.run(candidates))
+                        if not reports[-1]["added"]:
+                            self.assertEqual(json.loads(checkpoint_file.read_text(encoding="utf-8")), {"checked": {}})
+                return reports
+
+            first, second = asyncio.run(run())
+            data = json.loads(data_file.read_text(encoding="utf-8"))
+
+        self.assertEqual(first, {"probed": 1, "confirmed": 0, "unresolved": 1, "added": []})
+        self.assertEqual(second, {"probed": 1, "confirmed": 1, "unresolved": 0, "added": ["2.6.17"]})
+        self.assertEqual([entry["version"] for entry in data["versions"]], ["2.6.18", "2.6.17"])
+
+    def test_scheduler_spaces_request_starts_to_rate(self) -> None:
+        scheduler = FetchScheduler(max_concurrency=10, rate=50)
+        starts = []
+
+        async def job() -> None:
+            starts.append(time.monotonic())
+
+        async def run() -> None:
+            await scheduler.gather({index: job for index in range(6)})
+
+        asyncio.run(run())
+        self.assertGreaterEqual(max(starts) - min(starts), 5 / 50 * 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
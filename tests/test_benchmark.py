@@ -0,0 +1,38 @@
+import unittest
+
+from src.benchmark import compare_results, generate_history, run_benchmarks
+from src.utils import build_download_urls, sort_version_entries
+
+
+class BenchmarkTests(unittest.TestCase):
+    def test_generated_history_is_sorted_reproducible_and_uses_real_url_shapes(self) -> None:
+        data = generate_history(2500, seed=7)
+        versions = data["versions"]
+
+        self.assertEqual(data, generate_history(2500, seed=7))
+        self.assertEqual(len({item["version"] for item in versions}), 2500)
+        self.assertEqual([item["version"] for item in versions], [item["version"] for item in sort_version_entries(versions)])
+        expected = build_download_urls(versions[0]["version"], versions[0]["build_id"])
+        for platform, downloads in versions[0]["downloads"].items():
+            for arch, url in downloads.items():
+                self.assertEqual(url, expected[platform][arch])
+
+    def test_run_and_compare_results(self) -> None:
+        report = run_benchmarks([50], repeat=1)
+
+        stages = report["results"]["50"]
+        self.assertEqual(
+            sorted(stages),
+            ["_generate_version_table", "_load_versions_data", "process_versions", "save_json_file", "sort_version_entries"],
+        )
+        self.assertTrue(all(metrics["peak_kb"] > 0 for metrics in stages.values()))
+        self.assertEqual(compare_results(report, report), [])
+
+        slower = {"results": {"50": {"save_json_file": {"seconds": 1.0, "peak_kb": 10.0}}}}
+        baseline = {"results": {"50": {"save_json_file": {"seconds": 0.5, "peak_kb": 10.0}}}}
+        regressions = compare_results(slower, baseline, threshold=0.2)
+        self.assertEqual([(item["stage"], item["metric"]) for item in regressions], [("save_json_file", "seconds")])
+
+
+if __name__ == "__main__":
+    unittest.main()
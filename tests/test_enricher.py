@@ -0,0 +1,92 @@
+import asyncio
+import hashlib
+import unittest
+
+from src.enricher import ArtifactEnricher, artifact_metadata
+from src.http_client import AsyncHttpClient
+from src.standin_api import StandInDownloadApi
+from src.store import VersionStore
+
+BUILD_ID = "68fbec5aed9da587d1c6a64172792f505bafa252"
+
+
+class ArtifactEnricherTests(unittest.TestCase):
+    def test_enrich_records_size_etag_and_streamed_checksum_and_resumes(self) -> None:
+        api = StandInDownloadApi({})
+        contents = {
+            "x64": bytes(range(256)) * 300,
+            "arm64": b"arm" * 5000,
+        }
+
+        async def run() -> VersionStore:
+            async with api, AsyncHttpClient() as client:
+                downloads = {}
+                for arch, content in contents.items():
+                    path = f"/production/{BUILD_ID}/linux/{arch}/Cursor-2.6.18-{arch}.AppImage"
+                    api.add_artifact(path, content)
+                    downloads[arch] = api.artifact_url(path)
+                store = VersionStore({"versions": [{
+                    "version": "2.6.18",
+                    "date": "2025-01-01",
+                    "build_id": BUILD_ID,
+                    "downloads": {"linux": downloads},
+                    # 上次运行中断前已取得大小，只需补算校验和
+                    "artifacts": {"linux": {"arm64": {"size": len(contents["arm64"]), "etag": '"old"'}}},
+                }]})
+
+                enricher = ArtifactEnricher(client, checksum=True, chunk_size=1000, retry_backoff=0)
+                checkpoints = []
+                self.assertEqual(await enricher.enrich(store, checkpoint=lambda: checkpoints.append(1)), 1)
+                self.assertEqual(checkpoints, [1])
+
+                requests_before = len(api.artifact_requests)
+                self.assertEqual(await enricher.enrich(store), 0)
+                self.assertEqual(len(api.artifact_requests), requests_before)
+                return store
+
+        store = asyncio.run(run())
+        entry = store.get("2.6.18")
+
+        x64 = artifact_metadata(entry, "linux", "x64")
+        self.assertEqual(x64["size"], len(contents["x64"]))
+        self.assertEqual(x64["sha256"], hashlib.sha256(contents["x64"]).hexdigest())
+        self.assertEqual(x64["etag"], f'"{hashlib.sha1(contents["x64"]).hexdigest()}"')
+        arm64 = artifact_metadata(entry, "linux", "arm64")
+        self.assertEqual(arm64, {"size": len(contents["arm64"]), "etag": '"old"', "sha256": hashlib.sha256(contents["arm64"]).hexdigest()})
+        self.assertEqual(
+            sorted((request["method"], request["path"].split("/")[4]) for request in api.artifact_requests),
+            [("GET", "arm64"), ("GET", "x64"), ("HEAD", "x64")],
+        )
+        self.assertTrue(store.dirty)
+
+
+    def test_enrich_treats_checkpoint_every_below_one_as_one(self) -> None:
+        api = StandInDownloadApi({})
+
+        async def run() -> tuple:
+            async with api, AsyncHttpClient() as client:
+                versions = []
+                for version in ("2.6.16", "2.6.17", "2.6.18"):
+                    path = f"/production/{BUILD_ID}/linux/x64/Cursor-{version}-x86_64.AppImage"
+                    api.add_artifact(path, version.encode())
+                    versions.append({
+                        "version": version,
+                        "date": "2025-01-01",
+                        "build_id": BUILD_ID,
+                        "downloads": {"linux": {"x64": api.artifact_url(path)}},
+                    })
+                store = VersionStore({"versions": versions})
+
+                checkpoints = []
+                enricher = ArtifactEnricher(client, retry_backoff=0)
+                enriched = await enricher.enrich(store, checkpoint=lambda: checkpoints.append(1), checkpoint_every=0)
+                return enriched, checkpoints
+
+        enriched, checkpoints = asyncio.run(run())
+
+        self.assertEqual(enriched, 3)
+        self.assertEqual(checkpoints, [1, 1, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
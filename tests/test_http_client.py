@@ -0,0 +1,146 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.http_client import AsyncHttpClient, HttpResponse
+from src.scanner import CursorVersionScanner
+
+
+class FakeSessionResponse:
+    def __init__(self, status: int, body: bytes):
+        self.status = status
+        self.headers = {"Content-Type": "application/json"}
+        self._body = body
+
+    async def __aenter__(self) -> "FakeSessionResponse":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
+
+    async def read(self) -> bytes:
+        return self._body
+
+
+class FakeSession:
+    def __init__(self, body: bytes):
+        self.body = body
+        self.requested = []
+        self.closed = False
+
+    def get(self, url: str, headers=None) -> FakeSessionResponse:
+        self.requested.append(url)
+        return FakeSessionResponse(200, self.body)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class AsyncHttpClientTests(unittest.TestCase):
+    def test_injected_session_is_used_and_not_closed(self) -> None:
+        session = FakeSession(b'{"version": "2.6.18"}')
+
+        async def run() -> HttpResponse:
+            async with AsyncHttpClient(session=session) as client:
+                return await client.get("https://www.cursor.com/api/download?platform=linux-x64")
+
+        response = asyncio.run(run())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"version": "2.6.18"})
+        self.assertEqual(len(session.requested), 1)
+        self.assertFalse(session.closed)
+
+    def test_requests_reuse_pooled_connection(self) -> None:
+        peers = []
+
+        async def handler(request: web.Request) -> web.Response:
+            peers.append(request.transport.get_extra_info("peername"))
+            return web.json_response({"downloadUrl": "https://example.com/file"})
+
+        async def run() -> None:
+            app = web.Application()
+            app.router.add_get("/api/download", handler)
+            async with TestServer(app) as server:
+                async with AsyncHttpClient() as client:
+                    for _ in range(3):
+                        response = await client.get(str(server.make_url("/api/download")))
+                        self.assertEqual(response.status_code, 200)
+
+        asyncio.run(run())
+
+        self.assertEqual(len(peers), 3)
+        self.assertEqual(len(set(peers)), 1)
+
+    def test_scanner_sends_requests_through_injected_client(self) -> None:
+        build_id = "68fbec5aed9da587d1c6a64172792f505bafa252"
+
+        class FakeClient:
+            def __init__(self):
+                self.urls = []
+
+            async def get(self, url: str, headers=None) -> HttpResponse:
+                self.urls.append(url)
+                body = (
+                    '{"downloadUrl": "https://mirror.example.com/latest.bin", '
+                    f'"version": "2.6.18", "commitSha": "{build_id}"}}'
+                ).encode()
+                return HttpResponse(url, 200, {}, body)
+
+        client = FakeClient()
+        scanner = CursorVersionScanner("missing.json", http_client=client)
+
+        result = asyncio.run(scanner._fetch_all_platforms())
+
+        self.assertEqual(len(client.urls), 7)
+        self.assertEqual(result[0]["build_id"], build_id)
+
+    def test_scanner_sends_conditional_requests_with_saved_validators(self) -> None:
+        build_id = "68fbec5aed9da587d1c6a64172792f505bafa252"
+        statuses = []
+
+        async def handler(request: web.Request) -> web.Response:
+            platform = request.query["platform"]
+            etag = f'"{platform}-{build_id}"'
+            if request.headers.get("If-None-Match") == etag:
+                statuses.append(304)
+                return web.Response(status=304, headers={"ETag": etag})
+            statuses.append(200)
+            return web.json_response(
+                {
+                    "downloadUrl": f"https://downloads.cursor.com/production/{build_id}/{platform}/Cursor-2.6.18.bin",
+                    "version": "2.6.18",
+                    "commitSha": build_id,
+                },
+                headers={"ETag": etag},
+            )
+
+        async def run(state_file: str) -> list:
+            app = web.Application()
+            app.router.add_get("/api/download", handler)
+            async with TestServer(app) as server:
+                async with AsyncHttpClient() as client:
+                    results = []
+                    for _ in range(2):
+                        scanner = CursorVersionScanner("missing.json", http_client=client, state_file=state_file)
+                        scanner.API_ENDPOINT = str(server.make_url("/api/download")) + "?platform={platform}&releaseTrack=latest"
+                        results.append(await scanner._fetch_all_platforms())
+                    return results
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_file = Path(temp_dir) / "versions.state.json"
+            first, second = asyncio.run(run(str(state_file)))
+            state = json.loads(state_file.read_text(encoding="utf-8"))
+
+        self.assertEqual(statuses, [200] * 7 + [304] * 7)
+        self.assertEqual(first, second)
+        self.assertEqual(state["platforms"]["latest:linux-x64"]["release"]["build_id"], build_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from pathlib import Path
+
+from src.importtime import CHECK_PATH_EXCLUDED, measure_import_time, parse_importtime
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class ImportTimeTests(unittest.TestCase):
+    def test_check_path_does_not_import_heavy_modules(self) -> None:
+        result = measure_import_time(cwd=str(ROOT))
+
+        self.assertIn("src.scanner", result["loaded"])
+        self.assertEqual(sorted(name for name in CHECK_PATH_EXCLUDED if name in result["loaded"]), [])
+        self.assertNotIn("aiohttp", result["loaded"])
+        self.assertEqual(result["modules"][0]["module"], "main")
+
+    def test_parse_importtime_reads_nesting(self) -> None:
+        output = "\n".join(
+            [
+                "import time: self [us] | cumulative | imported package",
+                "import time:       120 |        120 |     src.versioning",
+                "import time:       300 |        420 |   src.utils",
+                "import time:        50 |        470 | main",
+            ]
+        )
+
+        self.assertEqual(
+            [(item["module"], item["depth"], item["cumulative_us"]) for item in parse_importtime(output)],
+            [("src.versioning", 2, 120), ("src.utils", 1, 420), ("main", 0, 470)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.index import VersionIndex, build_index, update_index
+from src.store import VersionStore
+from src.utils import save_json_file
+
+DATA_FILE = Path(__file__).resolve().parent.parent / "versions.json"
+
+
+class VersionIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_file = Path(self.temp_dir.name) / "versions.json"
+        self.index_file = Path(self.temp_dir.name) / "versions.idx"
+        shutil.copy(DATA_FILE, self.data_file)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_lookup_by_version_and_build_id(self) -> None:
+        data = json.loads(self.data_file.read_text(encoding="utf-8"))
+        build_index(str(self.data_file), str(self.index_file))
+
+        with VersionIndex.open(str(self.index_file), str(self.data_file)) as index:
+            self.assertEqual(len(index), len(data["versions"]))
+            for entry in data["versions"][::37]:
+                self.assertEqual(index.find_version(entry["version"]), entry)
+                if entry.get("build_id"):
+                    self.assertEqual(index.find_build_id(entry["build_id"]), entry)
+            self.assertIsNone(index.find_version("99.0.0"))
+            self.assertEqual(
+                [index.version_at(position) for position in index.find_build_id_positions("a1f68654")],
+                ["3.15.6"],
+            )
+
+    def test_incremental_update_matches_full_rebuild(self) -> None:
+        build_index(str(self.data_file), str(self.index_file))
+        store = VersionStore.load(str(self.data_file))
+        store.insert({"version": "3.16.0", "date": "2026-09-01", "build_id": "f" * 40, "downloads": {}})
+        store.insert({"version": "3.15.7", "date": "2026-09-01", "build_id": "e" * 40, "downloads": {}})
+        save_json_file(str(self.data_file), store.to_data())
+
+        self.assertIsNone(VersionIndex.open(str(self.index_file), str(self.data_file)))
+
+        update_index(str(self.data_file), str(self.index_file))
+        incremental = self.index_file.read_bytes()
+        build_index(str(self.data_file), str(self.index_file))
+
+        self.assertEqual(incremental, self.index_file.read_bytes())
+        with VersionIndex.open(str(self.index_file), str(self.data_file)) as index:
+            self.assertEqual(index.find_build_id("e" * 40)["version"], "3.15.7")
+
+    def test_incremental_update_indexes_entry_older_than_all_others(self) -> None:
+        build_index(str(self.data_file), str(self.index_file))
+        store = VersionStore.load(str(self.data_file))
+        store.insert({"version": "0.0.1", "date": "2023-01-01", "build_id": "c" * 40, "downloads": {}})
+        save_json_file(str(self.data_file), store.to_data())
+
+        update_index(str(self.data_file), str(self.index_file))
+        incremental = self.index_file.read_bytes()
+        build_index(str(self.data_file), str(self.index_file))
+
+        self.assertEqual(incremental, self.index_file.read_bytes())
+        with VersionIndex.open(str(self.index_file), str(self.data_file)) as index:
+            self.assertEqual(len(index), len(store))
+            self.assertEqual(index.find_version("0.0.1")["build_id"], "c" * 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
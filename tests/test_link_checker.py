@@ -0,0 +1,95 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from datetime import timedelta
+from pathlib import Path
+
+from src.http_client import AsyncHttpClient, HttpResponse
+from src.link_checker import LinkChecker, mark_dead_links
+from src.standin_api import StandInDownloadApi
+from src.store import VersionStore
+
+
+def make_entry(api: StandInDownloadApi, version: str, live: bool) -> dict:
+    build_id = version.replace(".", "") * 8
+    paths = {
+        "x64": f"/production/{build_id}/linux/x64/Cursor-{version}-x86_64.AppImage",
+        "arm64": f"/production/{build_id}/linux/arm64/Cursor-{version}-aarch64.AppImage",
+    }
+    api.add_artifact(paths["x64"], b"x" * 64)
+    if live:
+        api.add_artifact(paths["arm64"], b"a" * 64)
+    return {
+        "version": version,
+        "date": "2025-01-01",
+        "build_id": build_id,
+        "downloads": {"linux": {arch: api.artifact_url(path) for arch, path in paths.items()}},
+    }
+
+
+class LinkCheckerTests(unittest.TestCase):
+    def test_checks_links_caches_results_and_marks_dead_links(self) -> None:
+        api = StandInDownloadApi({})
+        api.allow_head = False
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file = str(Path(temp_dir) / "versions.links.json")
+
+            async def run() -> tuple:
+                async with api, AsyncHttpClient() as client:
+                    store = VersionStore({"versions": [make_entry(api, "2.6.18", True), make_entry(api, "2.6.17", False)]})
+                    checker = LinkChecker(client, cache_file=cache_file, per_host=2, retry_backoff=0)
+                    first = await checker.check(store)
+                    second = await LinkChecker(client, cache_file=cache_file).check(store)
+                    expired = await LinkChecker(client, cache_file=cache_file, ttl=timedelta(0)).check(store)
+                    return store, first, second, expired
+
+            store, first, second, expired = asyncio.run(run())
+            cache = json.loads(Path(cache_file).read_text(encoding="utf-8"))["links"]
+
+        self.assertEqual((first["total"], first["checked"], second["checked"], expired["checked"]), (4, 4, 0, 4))
+        self.assertEqual([(item["version"], item["arch"], item["status"]) for item in first["dead"]], [("2.6.17", "arm64", 404)])
+        self.assertEqual(second["dead"], first["dead"])
+        self.assertEqual(first["statuses"], {"206": 3, "404": 1})
+        self.assertEqual(len(cache), 4)
+        # HEAD 返回 405 后改用只请求首字节的 GET
+        self.assertEqual({request["method"] for request in api.artifact_requests}, {"HEAD", "GET"})
+        self.assertTrue(all(request["range"] == "bytes=0-0" for request in api.artifact_requests if request["method"] == "GET"))
+
+        self.assertEqual(mark_dead_links(store, first["dead"]), 1)
+        self.assertEqual(store.get("2.6.17")["dead_links"], ["linux/arm64"])
+        self.assertTrue(store.dirty)
+        self.assertEqual(mark_dead_links(store, []), 1)
+        self.assertNotIn("dead_links", store.get("2.6.17"))
+
+    def test_transient_failures_are_unknown_not_cached_and_keep_marks(self) -> None:
+        class UnavailableClient:
+            async def probe(self, url: str, method: str = "HEAD", headers=None) -> HttpResponse:
+                return HttpResponse(url, 503, {}, b"")
+
+        entry = {
+            "version": "2.6.17",
+            "date": "2025-01-01",
+            "build_id": "a" * 40,
+            "downloads": {"linux": {"x64": "https://example.invalid/x64", "arm64": "https://example.invalid/arm64"}},
+            "dead_links": ["linux/arm64"],
+        }
+        store = VersionStore({"versions": [entry]})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file = str(Path(temp_dir) / "versions.links.json")
+            checker = LinkChecker(UnavailableClient(), cache_file=cache_file, max_retries=1, retry_backoff=0)
+            report = asyncio.run(checker.check(store))
+            cache = json.loads(Path(cache_file).read_text(encoding="utf-8"))["links"]
+
+        self.assertEqual(report["dead"], [])
+        self.assertEqual([(item["arch"], item["status"]) for item in report["unknown"]], [("x64", 503), ("arm64", 503)])
+        self.assertEqual(cache, {})
+        # 暂时性失败既不新增也不清除失效标记
+        self.assertEqual(mark_dead_links(store, report["dead"], report["unknown"]), 0)
+        self.assertEqual(store.get("2.6.17")["dead_links"], ["linux/arm64"])
+
+
+if __name__ == "__main__":
+    unittest.main()
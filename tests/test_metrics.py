@@ -0,0 +1,69 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.http_client import HttpResponse
+from src.metrics import RunMetrics
+from src.pipeline import VersionPipeline
+from src.scanner import CursorVersionScanner
+
+BUILD_ID = "d1893fd7f5de2b705e0c040fb710b08f6afd4239"
+
+
+class RunMetricsTests(unittest.TestCase):
+    def test_retries_are_counted_and_honour_retry_after(self) -> None:
+        scanner = CursorVersionScanner("missing.json", retry_backoff=0)
+        scanner.MAX_RETRY_AFTER = 0
+        body = json.dumps({"downloadUrl": f"https://downloads.cursor.com/production/{BUILD_ID}/linux/x64/Cursor-1.5.8-x86_64.AppImage"}).encode()
+        responses = [
+            HttpResponse("u", 429, {"Retry-After": "5"}, b""),
+            None,
+            HttpResponse("u", 200, {}, body),
+        ]
+        delays = []
+
+        async def fake_request(url: str, headers=None, timeout: int = 10, client=None):
+            return responses.pop(0)
+
+        async def fake_sleep(delay: float) -> None:
+            delays.append(delay)
+
+        with patch("src.scanner.async_make_request", side_effect=fake_request), patch("src.http_client.asyncio.sleep", side_effect=fake_sleep):
+            info = asyncio.run(scanner._fetch_latest_download_info("linux-x64"))
+
+        self.assertEqual(info["release"], {"version": "1.5.8", "build_id": BUILD_ID})
+        self.assertEqual(delays, [0, 0])
+        [request] = scanner.metrics.requests
+        self.assertEqual((request["key"], request["status"], request["retries"], request["bytes"]), ("latest:linux-x64", 200, 2, len(body)))
+
+    def test_pipeline_run_writes_json_report_and_prometheus_textfile(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_file = Path(temp_dir) / "versions.json"
+            scanner = CursorVersionScanner(str(data_file), probe_platform=None, index_file=None)
+
+            async def fake_fetch_all() -> list:
+                scanner.metrics.record_request("latest:linux-x64", "u", 200, 0.25, 120)
+                return [{"version": "2.6.18", "date": "2025-01-01", "build_id": BUILD_ID, "downloads": {}}]
+
+            scanner._fetch_all_platforms = fake_fetch_all
+            asyncio.run(VersionPipeline(scanner).run())
+
+            metrics: RunMetrics = scanner.metrics
+            self.assertTrue(metrics.write_report(str(Path(temp_dir) / "report.json")))
+            self.assertTrue(metrics.write_prometheus(str(Path(temp_dir) / "scanner.prom")))
+
+            report = json.loads((Path(temp_dir) / "report.json").read_text(encoding="utf-8"))
+            self.assertTrue(report["result"]["new_version"])
+            self.assertLessEqual({"load_versions", "process_versions", "save_json_file"}, set(report["stages"]))
+            self.assertEqual(report["summary"]["bytes"], 120)
+            prometheus = (Path(temp_dir) / "scanner.prom").read_text(encoding="utf-8")
+            self.assertIn('cursor_scanner_stage_duration_seconds{stage="save_json_file"}', prometheus)
+            self.assertIn('cursor_scanner_request_duration_seconds{key="latest:linux-x64",status="200"} 0.250000', prometheus)
+            self.assertIn("cursor_scanner_last_run_success 1", prometheus)
+
+
+if __name__ == "__main__":
+    unittest.main()
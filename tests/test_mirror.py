@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+
+from src.http_client import AsyncHttpClient
+from src.mirror import ArtifactMirror
+from src.standin_api import StandInDownloadApi
+from src.store import VersionStore
+
+BUILD_ID = "68fbec5aed9da587d1c6a64172792f505bafa252"
+
+
+class ArtifactMirrorTests(unittest.TestCase):
+    def test_mirror_resumes_missing_chunks_dedupes_and_verifies(self) -> None:
+        api = StandInDownloadApi({})
+        content = bytes(range(256)) * 14
+        path = f"/production/{BUILD_ID}/linux/x64/Cursor-2.6.18-x86_64.AppImage"
+        api.add_artifact(path, content)
+        etag = f'"{hashlib.sha1(content).hexdigest()}"'
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            async def run() -> list:
+                async with api, AsyncHttpClient() as client:
+                    url = api.artifact_url(path)
+                    entry = {
+                        "build_id": BUILD_ID,
+                        "downloads": {"linux": {"x64": url}, "mac": {"arm64": api.artifact_url("/production/missing.dmg")}},
+                        "artifacts": {"linux": {"x64": {"size": len(content), "sha256": hashlib.sha256(content).hexdigest()}}},
+                    }
+                    # 两个版本指向同一个安装包，只下载一次
+                    store = VersionStore({"versions": [
+                        dict(entry, version="2.6.17", date="2025-01-01"),
+                        dict(entry, version="2.6.18", date="2025-01-02"),
+                    ]})
+                    mirror = ArtifactMirror(client, temp_dir, chunk_size=1000, retry_backoff=0)
+                    items = mirror.select(store, platforms=["linux"])
+                    self.assertEqual([(item["version"], item["arch"]) for item in items], [("2.6.18", "x64")])
+
+                    # 模拟上次中断：前两个分块已完成
+                    target = mirror.target_path(items[0])
+                    os.makedirs(os.path.dirname(target))
+                    with open(f"{target}.part", "wb") as f:
+                        f.write(content[:2000] + b"\0" * (len(content) - 2000))
+                    with open(f"{target}.part.json", "w", encoding="utf-8") as f:
+                        json.dump({"size": len(content), "etag": etag, "chunk_size": 1000, "done": [0, 1]}, f)
+
+                    reports = [await mirror.mirror(items)]
+                    reports.append(await mirror.mirror(items))
+                    return reports
+
+            first, second = asyncio.run(run())
+            target = os.path.join(temp_dir, BUILD_ID, "linux", "x64", "Cursor-2.6.18-x86_64.AppImage")
+            with open(target, "rb") as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(os.listdir(os.path.dirname(target)), ["Cursor-2.6.18-x86_64.AppImage"])
+
+        self.assertEqual((first["downloaded"], first["bytes"], first["failed"]), (1, len(content) - 2000, []))
+        self.assertEqual((second["downloaded"], second["skipped"]), (0, 1))
+        self.assertEqual(
+            sorted(request["range"] for request in api.artifact_requests if request["method"] == "GET"),
+            ["bytes=2000-2999", "bytes=3000-3583"],
+        )
+
+    def test_mirror_probes_with_range_get_without_head_resumes_and_rejects_bad_checksum(self) -> None:
+        api = StandInDownloadApi({})
+        api.allow_head = False
+        content = b"cursor" * 1000
+        good = f"/production/{BUILD_ID}/windows/x64/CursorUserSetup-x64-2.6.18.exe"
+        bad = f"/production/{BUILD_ID}/windows/arm64/CursorUserSetup-arm64-2.6.18.exe"
+        api.add_artifact(good, content)
+        api.add_artifact(bad, content)
+        etag = f'"{hashlib.sha1(content).hexdigest()}"'
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            async def run() -> dict:
+                async with api, AsyncHttpClient() as client:
+                    store = VersionStore({"versions": [{
+                        "version": "2.6.18",
+                        "date": "2025-01-02",
+                        "build_id": BUILD_ID,
+                        "downloads": {"windows": {"x64": api.artifact_url(good), "arm64": api.artifact_url(bad)}},
+                        "artifacts": {"windows": {"arm64": {"sha256": "0" * 64}}},
+                    }]})
+                    mirror = ArtifactMirror(client, temp_dir, chunk_size=2000, bandwidth=10 * 1024 * 1024, retry_backoff=0)
+                    items = mirror.select(store)
+
+                    # 模拟上次中断：x64 的前两个分块已完成
+                    target = mirror.target_path(next(item for item in items if item["arch"] == "x64"))
+                    os.makedirs(os.path.dirname(target))
+                    with open(f"{target}.part", "wb") as f:
+                        f.write(content[:4000] + b"\0" * (len(content) - 4000))
+                    with open(f"{target}.part.json", "w", encoding="utf-8") as f:
+                        json.dump({"size": len(content), "etag": etag, "chunk_size": 2000, "done": [0, 1]}, f)
+
+                    return await mirror.mirror(items)
+
+            report = asyncio.run(run())
+            with open(os.path.join(temp_dir, BUILD_ID, "windows", "x64", os.path.basename(good)), "rb") as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(os.listdir(os.path.join(temp_dir, BUILD_ID, "windows", "arm64")), [])
+
+        self.assertEqual((report["downloaded"], report["bytes"]), (1, len(content) - 4000))
+        self.assertEqual([item["url"].endswith(bad) for item in report["failed"]], [True])
+        good_requests = [request for request in api.artifact_requests if request["path"] == good]
+        self.assertEqual(
+            [(request["method"], request["range"], request["status"]) for request in good_requests],
+            [("HEAD", None, 405), ("GET", "bytes=0-0", 206), ("GET", "bytes=4000-5999", 206)],
+        )
+        self.assertFalse(any(request["method"] == "GET" and not request["range"] for request in api.artifact_requests))
+
+if __name__ == "__main__":
+    unittest.main()
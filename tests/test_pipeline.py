@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.pipeline import VersionPipeline
+from src.scanner import CursorVersionScanner
+from src.utils import build_download_urls
+
+
+def make_version(version: str) -> dict:
+    return {
+        "version": version,
+        "date": "2025-01-01",
+        "build_id": f"build-{version}",
+        "downloads": {},
+    }
+
+
+README = "\n".join(
+    [
+        "Last Updated | 最后更新时间:  `2024-01-01 00:00:00`",
+        "",
+        "<!-- VERSION_TABLE_START -->",
+        "| 版本号<br>Version | 发布日期<br>Release Date | macOS | Windows | Linux |",
+        "|--------|----------|-------|---------|-------|",
+        "| 2.6.17 | 2025-01-01 | 暂无 | 暂无 | 暂无 |",
+        "",
+        "<!-- VERSION_TABLE_END -->",
+        "",
+    ]
+)
+
+
+class VersionPipelineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_file = Path(self.temp_dir.name) / "versions.json"
+        self.readme_file = Path(self.temp_dir.name) / "README.md"
+        self.data_file.write_text(json.dumps({"versions": [make_version("2.6.17")]}), encoding="utf-8")
+        self.readme_file.write_text(README, encoding="utf-8")
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def make_pipeline(self, version: str, render: bool = True) -> VersionPipeline:
+        scanner = CursorVersionScanner(str(self.data_file), probe_platform=None)
+        self.fetch_calls = []
+
+        async def fake_fetch_all() -> list:
+            self.fetch_calls.append(version)
+            return [make_version(version)]
+
+        scanner._fetch_all_platforms = fake_fetch_all
+        return VersionPipeline(scanner, readme_file=str(self.readme_file) if render else None)
+
+    def test_unchanged_run_skips_persist_and_render(self) -> None:
+        pipeline = self.make_pipeline("2.6.17")
+        data_mtime = os.stat(self.data_file).st_mtime_ns
+
+        with patch("src.formatter.ReadmeFormatter") as formatter:
+            result = asyncio.run(pipeline.run())
+
+        self.assertEqual(
+            result,
+            {"success": True, "new_version": False, "version": "2.6.17", "data_changed": False, "readme_updated": False},
+        )
+        formatter.assert_not_called()
+        self.assertEqual(os.stat(self.data_file).st_mtime_ns, data_mtime)
+        self.assertEqual(self.readme_file.read_text(encoding="utf-8"), README)
+
+    def test_new_version_renders_readme_from_shared_store(self) -> None:
+        pipeline = self.make_pipeline("2.6.18")
+
+        with patch("src.formatter.load_json_file", side_effect=AssertionError("data file reloaded")):
+            result = asyncio.run(pipeline.run())
+
+        self.assertTrue(result["success"])
+        self.assertTrue(result["new_version"])
+        self.assertTrue(result["readme_updated"])
+        saved = json.loads(self.data_file.read_text(encoding="utf-8"))
+        self.assertEqual([item["version"] for item in saved["versions"]], ["2.6.18", "2.6.17"])
+        rows = [line for line in self.readme_file.read_text(encoding="utf-8").splitlines() if line.startswith("| 2.")]
+        self.assertEqual([row.split("|")[1].strip() for row in rows], ["2.6.18", "2.6.17"])
+
+
+    def test_fetches_once_and_saves_only_new_versions_without_readme(self) -> None:
+        unchanged = asyncio.run(self.make_pipeline("2.6.17", render=False).run())
+
+        self.assertEqual((unchanged["success"], unchanged["new_version"], unchanged["version"]), (True, False, "2.6.17"))
+        self.assertEqual(self.fetch_calls, ["2.6.17"])
+        self.assertNotIn("last_updated", json.loads(self.data_file.read_text(encoding="utf-8")))
+
+        updated = asyncio.run(self.make_pipeline("2.6.18", render=False).run())
+
+        self.assertEqual((updated["success"], updated["new_version"], updated["version"]), (True, True, "2.6.18"))
+        self.assertEqual(self.fetch_calls, ["2.6.18"])
+        self.assertFalse(updated["readme_updated"])
+        self.assertEqual(self.readme_file.read_text(encoding="utf-8"), README)
+        saved = json.loads(self.data_file.read_text(encoding="utf-8"))
+        self.assertEqual([item["version"] for item in saved["versions"]], ["2.6.18", "2.6.17"])
+
+
+    def test_respun_build_replaces_stored_build_so_next_probe_matches(self) -> None:
+        stale = dict(make_version("2.6.17"), dead_links=["linux/x64"])
+        self.data_file.write_text(json.dumps({"versions": [stale]}), encoding="utf-8")
+        respun = {"version": "2.6.17", "build_id": "respun-2.6.17"}
+        full_fetches = []
+
+        def make_scanner() -> CursorVersionScanner:
+            scanner = CursorVersionScanner(str(self.data_file), probe_platform="linux-x64")
+
+            async def fake_probe(platform: str, track: str = "latest") -> dict:
+                return {"url": "https://example.com/file", "release": dict(respun)}
+
+            async def fake_fetch_all() -> list:
+                full_fetches.append(True)
+                return [dict(respun, date="2025-02-01", downloads=build_download_urls(respun["version"], respun["build_id"]))]
+
+            scanner._fetch_latest_download_info = fake_probe
+            scanner._fetch_all_platforms = fake_fetch_all
+            return scanner
+
+        first = asyncio.run(VersionPipeline(make_scanner(), readme_file=str(self.readme_file)).run())
+
+        self.assertTrue(first["data_changed"])
+        [saved] = json.loads(self.data_file.read_text(encoding="utf-8"))["versions"]
+        self.assertEqual(saved["build_id"], respun["build_id"])
+        self.assertEqual(saved["date"], "2025-01-01")
+        self.assertNotIn("dead_links", saved)
+        self.assertIn(respun["build_id"], self.readme_file.read_text(encoding="utf-8"))
+
+        second = asyncio.run(VersionPipeline(make_scanner(), readme_file=str(self.readme_file)).run())
+
+        self.assertFalse(second["data_changed"])
+        self.assertEqual(len(full_fetches), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.index import build_index
+from src.query import VersionQuery, parse_specifier, resolve_range, result_urls, specifier_bounds
+from src.store import VersionStore
+from src.utils import save_json_file
+from src.versioning import version_key
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_FILE = ROOT / "versions.json"
+
+
+class VersionQueryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_file = Path(self.temp_dir.name) / "versions.json"
+        self.index_file = Path(self.temp_dir.name) / "versions.idx"
+        shutil.copy(DATA_FILE, self.data_file)
+        self.store = VersionStore.load(str(self.data_file))
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _versions(self, results) -> list:
+        return [result["version"] for result in results]
+
+    def test_specifier_ranges_match_linear_filter_with_and_without_index(self) -> None:
+        build_index(str(self.data_file), str(self.index_file))
+        versions = [entry["version"] for entry in self.store]
+
+        for text in (">=2.0,<2.3", "==1.*", "~=1.4.0", "<=0.45.0", ">2.6.18", "!=2.6.18,>=2.6", "2.6.18", ">=99"):
+            specifier = parse_specifier(text)
+            expected = [version for version in versions if specifier.contains(version)]
+            for index_file in (str(self.index_file), None):
+                with VersionQuery(str(self.data_file), index_file) as query:
+                    self.assertEqual(self._versions(query.find(specifier=specifier)), expected, (text, index_file))
+
+    def test_resolve_range_uses_bounds_on_sorted_keys(self) -> None:
+        keys = [version_key(version) for version in ("1.9.9", "2.0.0", "2.5.1", "2.9.0", "3.0.0a1", "3.0.0")]
+        self.assertEqual(resolve_range(keys, *specifier_bounds(parse_specifier("==2.*"))), range(1, 4))
+        self.assertEqual(resolve_range(keys, *specifier_bounds(parse_specifier(">2.0,<=2.9"))), range(2, 4))
+        self.assertEqual(resolve_range(keys, *specifier_bounds(parse_specifier(">=3.1,<2"))), range(6, 6))
+
+    def test_filters_by_platform_build_id_and_date_on_compact_data(self) -> None:
+        self.store.set_compact(True)
+        latest = self.store.latest()
+        latest["dead_links"] = ["linux/arm64"]
+        save_json_file(str(self.data_file), self.store.to_data())
+        build_index(str(self.data_file), str(self.index_file))
+
+        with VersionQuery(str(self.data_file), str(self.index_file)) as query:
+            [result] = query.find(platform="linux-aarch64", specifier=parse_specifier("==2.*"), limit=1)
+            self.assertEqual(list(result["downloads"]), ["linux"])
+            self.assertTrue(result_urls([result])[0].endswith(f"Cursor-{result['version']}-aarch64.AppImage"))
+            self.assertNotEqual(result["version"], latest["version"])
+
+            [by_build] = query.find(build_id=latest["build_id"][:10], platform="mac", arch="universal")
+            self.assertEqual(by_build["version"], latest["version"])
+            self.assertEqual(result_urls([by_build]), [self.store.downloads(latest)["mac"]["universal"]])
+
+            dated = query.find(since="2025-06-01", until="2025-06-30")
+            self.assertTrue(dated)
+            self.assertTrue(all("2025-06-01" <= result["date"] <= "2025-06-30" for result in dated))
+            self.assertEqual(self._versions(dated), sorted(self._versions(dated), key=version_key, reverse=True))
+
+
+    def test_cli_exits_quietly_when_reader_closes_pipe(self) -> None:
+        process = subprocess.Popen(
+            [sys.executable, "main.py", "--data-file", str(self.data_file), "--no-index", "query", "--format", "urls"],
+            cwd=ROOT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self.assertTrue(process.stdout.readline().startswith(b"https://"))
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+
+        self.assertEqual(process.wait(), 0)
+        self.assertEqual(stderr, b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.http_client import AsyncHttpClient
+from src.scanner import CursorVersionScanner
+from src.standin_api import StandInDownloadApi, load_fixtures
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "download_api.json"
+
+
+class StandInDownloadApiTests(unittest.TestCase):
+    def scan(self, api: StandInDownloadApi, runs: int = 1, **scanner_options) -> list:
+        async def run() -> list:
+            async with api, AsyncHttpClient() as client:
+                results = []
+                for _ in range(runs):
+                    scanner = CursorVersionScanner(
+                        "missing.json",
+                        http_client=client,
+                        api_base_url=api.base_url,
+                        retry_backoff=0,
+                        **scanner_options,
+                    )
+                    results.append(await scanner._fetch_all_platforms())
+                return results
+
+        return asyncio.run(run())
+
+    def test_full_fetch_runs_offline_with_latency_and_etag(self) -> None:
+        api = StandInDownloadApi(load_fixtures(str(FIXTURES)), latency={"*": 0.01, "darwin-arm64": 0.05})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_file = str(Path(temp_dir) / "versions.state.json")
+            first, second = self.scan(api, runs=2, state_file=state_file)
+
+        self.assertEqual(first[0]["version"], "3.15.6")
+        self.assertEqual(first[0]["build_id"], "a1f686545fd0ce8917bbd2449f733551a9bce420")
+        self.assertEqual(second, first)
+        self.assertEqual([request["status"] for request in api.requests], [200] * 7 + [304] * 7)
+
+    def test_injected_errors_and_rate_limits_are_retried(self) -> None:
+        fixtures = load_fixtures(str(FIXTURES))
+        api = StandInDownloadApi(fixtures, error_rate={"linux-arm64": 1.0}, seed=1)
+
+        [result] = self.scan(api, max_retries=1)
+
+        self.assertEqual(result[0]["version"], "3.15.6")
+        arm64 = [request["status"] for request in api.requests if request["platform"] == "linux-arm64"]
+        self.assertEqual(arm64, [500, 500])
+
+        api = StandInDownloadApi(fixtures, rate_limit=4, rate_window=0.2, retry_after=1)
+        CursorVersionScanner.MAX_RETRY_AFTER, max_retry_after = 0.3, CursorVersionScanner.MAX_RETRY_AFTER
+        try:
+            [result] = self.scan(api, max_retries=2)
+        finally:
+            CursorVersionScanner.MAX_RETRY_AFTER = max_retry_after
+
+        statuses = [request["status"] for request in api.requests]
+        self.assertEqual(statuses.count(200), 7)
+        self.assertIn(429, statuses)
+        self.assertEqual(result[0]["downloads"]["linux"]["arm64"], fixtures["latest"]["linux-arm64"]["downloadUrl"])
+
+    def test_fixture_matches_download_url_templates(self) -> None:
+        data = json.loads(FIXTURES.read_text(encoding="utf-8"))
+
+        self.assertEqual(sorted(data["latest"]), sorted(CursorVersionScanner("missing.json")._iter_platforms()))
+
+
+if __name__ == "__main__":
+    unittest.main()
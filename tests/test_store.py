@@ -0,0 +1,125 @@
+import json
+import unittest
+from pathlib import Path
+
+from src.store import VersionStore, compact_entry, expand_entry, find_version_entry, iter_version_entries
+from src.utils import build_download_urls, sort_version_entries
+
+
+def make_version(version: str) -> dict:
+    return {
+        "version": version,
+        "date": "2025-01-01",
+        "build_id": f"build-{version}",
+        "downloads": {},
+    }
+
+
+class VersionStoreTests(unittest.TestCase):
+    def test_insert_keeps_semantic_order_and_indexes(self) -> None:
+        store = VersionStore({"versions": [make_version("1.6.6"), make_version("1.5.11")], "last_updated": "x"})
+
+        self.assertTrue(store.insert(make_version("1.6.45")))
+        self.assertTrue(store.insert(make_version("1.5.2")))
+        self.assertFalse(store.insert(make_version("1.6.6")))
+
+        self.assertEqual(
+            [item["version"] for item in store],
+            ["1.6.45", "1.6.6", "1.5.11", "1.5.2"],
+        )
+        self.assertEqual(store.get_by_build_id("build-1.5.2")["version"], "1.5.2")
+        self.assertEqual(store.latest()["version"], "1.6.45")
+        self.assertIn("1.5.11", store)
+        self.assertEqual(list(store.to_data()), ["versions", "last_updated"])
+
+    def test_loaded_history_matches_full_sort(self) -> None:
+        data_file = Path(__file__).resolve().parent.parent / "versions.json"
+        data = json.loads(data_file.read_text(encoding="utf-8"))
+
+        store = VersionStore.load(str(data_file))
+
+        self.assertEqual(
+            [item["version"] for item in store],
+            [item["version"] for item in sort_version_entries(data["versions"])],
+        )
+
+    def test_load_missing_file_returns_empty_store(self) -> None:
+        store = VersionStore.load("missing.json")
+
+        self.assertEqual(len(store), 0)
+        self.assertIsNone(store.latest())
+
+    def test_compact_format_round_trips_history(self) -> None:
+        data_file = Path(__file__).resolve().parent.parent / "versions.json"
+        data = json.loads(data_file.read_text(encoding="utf-8"))
+
+        store = VersionStore(data)
+        store.set_compact(True)
+        compact_data = json.loads(json.dumps(store.to_data()))
+        restored = VersionStore(compact_data)
+        restored.set_compact(False)
+
+        self.assertEqual(compact_data["format"], 2)
+        self.assertLess(len(json.dumps(compact_data)), len(json.dumps(data)) / 3)
+        self.assertEqual(restored.to_data(), VersionStore(data).to_data())
+
+    def test_compact_store_derives_template_urls_lazily(self) -> None:
+        build_id = "a1f686545fd0ce8917bbd2449f733551a9bce420"
+        full = {
+            "version": "3.15.6",
+            "date": "2026-08-06",
+            "build_id": build_id,
+            "downloads": build_download_urls("3.15.6", build_id),
+        }
+        full["downloads"]["linux"]["x64"] = "https://mirror.example.com/Cursor-3.15.6.AppImage"
+        del full["downloads"]["windows"]["arm64"]
+
+        store = VersionStore({"format": 2, "versions": []})
+        store.insert(dict(full))
+        stored = store.get("3.15.6")
+
+        self.assertEqual(
+            stored["downloads"],
+            {"windows": {"arm64": None}, "linux": {"x64": "https://mirror.example.com/Cursor-3.15.6.AppImage"}},
+        )
+        self.assertEqual(store.downloads(stored), full["downloads"])
+        self.assertEqual(expand_entry(compact_entry(full)), full)
+
+    def test_replace_build_reindexes_and_keeps_compact_overrides(self) -> None:
+        old_build, new_build = "d1893fd7f5de2b705e0c040fb710b08f6afd4239", "68fbec5aed9da587d1c6a64172792f505bafa252"
+        store = VersionStore({"format": 2, "versions": []})
+        store.insert({"version": "2.6.17", "date": "2025-01-01", "build_id": old_build, "downloads": build_download_urls("2.6.17", old_build)})
+        entry = store.get("2.6.17")
+        entry["artifacts"] = {"linux": {"x64": {"size": 1}}}
+        store.dirty = False
+
+        downloads = build_download_urls("2.6.17", new_build)
+        del downloads["windows"]["arm64"]
+        self.assertTrue(store.replace_build(entry, {"version": "2.6.17", "build_id": new_build, "downloads": downloads}))
+        self.assertFalse(store.replace_build(entry, {"version": "2.6.17", "build_id": new_build}))
+
+        self.assertTrue(store.dirty)
+        self.assertIsNone(store.get_by_build_id(old_build))
+        self.assertIs(store.get_by_build_id(new_build), entry)
+        self.assertNotIn("artifacts", entry)
+        self.assertEqual(entry["downloads"], {"windows": {"arm64": None}})
+        self.assertEqual(store.downloads(entry), downloads)
+
+    def test_streaming_reader_matches_full_load_and_stops_early(self) -> None:
+        data_file = Path(__file__).resolve().parent.parent / "versions.json"
+        data = json.loads(data_file.read_text(encoding="utf-8"))
+
+        self.assertEqual(list(iter_version_entries(str(data_file), chunk_size=257)), data["versions"])
+
+        reader = iter_version_entries(str(data_file), chunk_size=257)
+        head = next(reader)
+        reader.close()
+        self.assertEqual(head["version"], data["versions"][0]["version"])
+
+        self.assertEqual(find_version_entry(str(data_file), "0.40.0")["date"], "2024-08-22")
+        self.assertIsNone(find_version_entry(str(data_file), "99.0.0"))
+        self.assertIsNone(find_version_entry(str(data_file), "1.6.99"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.utils import save_json_file
+
+
+class SaveJsonFileTests(unittest.TestCase):
+    def test_unchanged_content_is_not_rewritten(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_file = Path(temp_dir) / "versions.json"
+            data = {"versions": [{"version": "1.6.6"}, {"version": "1.6.45"}], "last_updated": "x"}
+
+            first = save_json_file(str(data_file), dict(data))
+            inode = os.stat(data_file).st_ino
+            second = save_json_file(str(data_file), dict(data))
+
+            self.assertTrue(first and first.changed)
+            self.assertTrue(second)
+            self.assertFalse(second.changed)
+            self.assertEqual(os.stat(data_file).st_ino, inode)
+            self.assertEqual(
+                [item["version"] for item in json.loads(data_file.read_text(encoding="utf-8"))["versions"]],
+                ["1.6.45", "1.6.6"],
+            )
+
+    def test_failed_serialization_keeps_existing_file(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_file = Path(temp_dir) / "versions.json"
+            data_file.write_text('{"versions": []}', encoding="utf-8")
+
+            result = save_json_file(str(data_file), {"versions": [], "bad": object()})
+
+            self.assertFalse(result)
+            self.assertEqual(data_file.read_text(encoding="utf-8"), '{"versions": []}')
+            self.assertEqual(os.listdir(temp_dir), ["versions.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -93,7 +93,7 @@ class VersionSortingTests(unittest.TestCase):
             "linux-arm64": f"https://downloads.cursor.com/production/{newer_build}/linux/arm64/Cursor-2.6.18-aarch64.AppImage",
         }
 
-        async def fake_fetch(platform: str) -> dict:
+        async def fake_fetch(platform: str, track: str = "latest") -> dict:
             return {
                 "url": responses[platform],
                 "release": scanner._extract_release_from_url(responses[platform]),
@@ -110,6 +110,109 @@ class VersionSortingTests(unittest.TestCase):
             f"https://downloads.cursor.com/production/{newer_build}/win32/x64/system-setup/CursorSetup-x64-2.6.18.exe",
         )
 
+    def test_fetch_all_platforms_runs_requests_concurrently(self) -> None:
+        scanner = CursorVersionScanner("missing.json", max_concurrency=7)
+        build_id = "cccccccccccccccccccccccccccccccccccccccc"
+        in_flight = 0
+        peak = 0
+
+        async def fake_fetch(platform: str, track: str = "latest") -> dict:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            # 越靠前的平台越晚返回，验证合并顺序不依赖完成顺序
+            await asyncio.sleep(0.01 * (7 - scanner._iter_platforms().index(platform)))
+            in_flight -= 1
+            url = f"https://downloads.cursor.com/production/{build_id}/{platform}/Cursor-2.6.18.bin"
+            return {"url": url, "release": {"version": "2.6.18", "build_id": build_id}}
+
+        scanner._fetch_latest_download_info = fake_fetch
+
+        result = asyncio.run(scanner._fetch_all_platforms())
+
+        self.assertEqual(peak, 7)
+        self.assertEqual(list(result[0]["downloads"]), ["mac", "windows", "linux"])
+        self.assertEqual(result[0]["build_id"], build_id)
+
+    def test_fetch_all_platforms_respects_concurrency_limit_and_deadline(self) -> None:
+        scanner = CursorVersionScanner("missing.json", max_concurrency=2, fetch_timeout=0.2)
+        build_id = "dddddddddddddddddddddddddddddddddddddddd"
+        in_flight = 0
+        peak = 0
+
+        async def fake_fetch(platform: str, track: str = "latest") -> dict:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                if platform == "linux-arm64":
+                    await asyncio.sleep(10)
+                await asyncio.sleep(0.01)
+            finally:
+                in_flight -= 1
+            url = f"https://downloads.cursor.com/production/{build_id}/{platform}/Cursor-2.6.18.bin"
+            return {"url": url, "release": {"version": "2.6.18", "build_id": build_id}}
+
+        scanner._fetch_latest_download_info = fake_fetch
+
+        result = asyncio.run(scanner._fetch_all_platforms())
+
+        self.assertEqual(peak, 2)
+        self.assertEqual(result[0]["version"], "2.6.18")
+        self.assertEqual(
+            result[0]["downloads"]["linux"]["arm64"],
+            f"https://downloads.cursor.com/production/{build_id}/linux/arm64/Cursor-2.6.18-aarch64.AppImage",
+        )
+
+    def test_fetch_all_platforms_scans_tracks_through_shared_scheduler(self) -> None:
+        scanner = CursorVersionScanner(
+            "missing.json",
+            max_concurrency=4,
+            tracks=["latest", "stable", "prerelease"],
+        )
+        releases = {
+            "latest": ("2.6.18", "1" * 40),
+            "stable": ("2.6.18", "1" * 40),
+            "prerelease": ("2.7.0", "2" * 40),
+        }
+        requested = []
+        in_flight = 0
+        peak = 0
+
+        async def fake_fetch(platform: str, track: str = "latest") -> dict:
+            nonlocal in_flight, peak
+            requested.append((track, platform))
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            version, build_id = releases[track]
+            url = f"https://downloads.cursor.com/production/{build_id}/{platform}/Cursor-{version}.bin"
+            return {"url": url, "release": {"version": version, "build_id": build_id}}
+
+        scanner._fetch_latest_download_info = fake_fetch
+
+        result = asyncio.run(scanner._fetch_all_platforms())
+
+        self.assertEqual(len(requested), 21)
+        self.assertEqual(peak, 4)
+        self.assertEqual(
+            [(item["version"], item["tracks"]) for item in result],
+            [("2.7.0", ["prerelease"]), ("2.6.18", ["latest", "stable"])],
+        )
+
+    def test_process_versions_merges_tracks_into_existing_entries(self) -> None:
+        scanner = CursorVersionScanner("missing.json")
+        scanner.versions_data = {"versions": [make_version("2.6.18"), make_version("2.6.17")]}
+        stable = dict(make_version("2.6.17"), tracks=["stable"])
+
+        self.assertTrue(scanner._is_new_version(stable))
+        result = scanner.process_versions([stable])
+
+        self.assertEqual([item["version"] for item in result], ["2.6.18", "2.6.17"])
+        self.assertNotIn("tracks", result[0])
+        self.assertEqual(result[1]["tracks"], ["latest", "stable"])
+
     def test_extract_release_from_url_supports_legacy_linux_urls(self) -> None:
         scanner = CursorVersionScanner("missing.json")
         build_id = "ae378be9dc2f5f1a6a1a220c6e25f9f03c8d4e19"
@@ -179,7 +282,7 @@ class VersionSortingTests(unittest.TestCase):
             def json(self) -> dict:
                 return self._data
 
-        async def fake_request(url: str, headers=None, timeout: int = 10):
+        async def fake_request(url: str, headers=None, timeout: int = 10, client=None):
             platform = url.split("platform=")[1].split("&")[0]
             return FakeResponse(responses[platform])
 
@@ -198,6 +301,56 @@ class VersionSortingTests(unittest.TestCase):
             responses["linux-arm64"]["downloadUrl"],
         )
 
+    def test_check_new_version_probes_one_platform_before_full_fetch(self) -> None:
+        scanner = CursorVersionScanner("missing.json", probe_platform="linux-x64")
+        scanner.versions_data = {"versions": [make_version("2.6.17")]}
+        probed = []
+        full_fetches = []
+
+        def make_probe(release):
+            async def fake_fetch(platform: str, track: str = "latest"):
+                probed.append(platform)
+                if release is None:
+                    return None
+                return {"url": "https://example.com/file", "release": release}
+            return fake_fetch
+
+        async def fake_fetch_all() -> list:
+            full_fetches.append(True)
+            return [make_version("2.6.18")]
+
+        scanner._fetch_all_platforms = fake_fetch_all
+
+        scanner._fetch_latest_download_info = make_probe({"version": "2.6.17", "build_id": "build-2.6.17"})
+        self.assertFalse(asyncio.run(scanner.check_new_version()))
+        self.assertEqual(full_fetches, [])
+
+        scanner._fetch_latest_download_info = make_probe({"version": "2.6.18", "build_id": "build-2.6.18"})
+        self.assertTrue(asyncio.run(scanner.check_new_version()))
+        self.assertEqual(len(full_fetches), 1)
+
+        scanner._fetch_latest_download_info = make_probe(None)
+        self.assertTrue(asyncio.run(scanner.check_new_version()))
+        self.assertEqual(len(full_fetches), 2)
+        self.assertEqual(probed, ["linux-x64"] * 3)
+
+    def test_check_new_version_reads_history_without_loading_store(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_file = Path(temp_dir) / "versions.json"
+            data_file.write_text(
+                json.dumps({"versions": [make_version("2.6.17"), make_version("2.6.16")]}, indent=2),
+                encoding="utf-8",
+            )
+            scanner = CursorVersionScanner(str(data_file), probe_platform="linux-x64")
+
+            async def fake_fetch(platform: str, track: str = "latest") -> dict:
+                return {"url": "https://example.com/file", "release": {"version": "2.6.17", "build_id": "build-2.6.17"}}
+
+            scanner._fetch_latest_download_info = fake_fetch
+
+            self.assertFalse(asyncio.run(scanner.check_new_version()))
+            self.assertIsNone(scanner._store)
+
     def test_readme_formatter_sorts_versions_before_rendering(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             data_file = Path(temp_dir) / "versions.json"
@@ -265,6 +418,81 @@ class VersionSortingTests(unittest.TestCase):
 
             self.assertIn(f"Last Updated | 最后更新时间:  `{last_updated}`", content)
 
+    def test_update_readme_inserts_only_new_rows_between_markers(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_file = Path(temp_dir) / "versions.json"
+            readme_file = Path(temp_dir) / "README.md"
+            versions = [make_version("2.6.18"), make_version("2.6.17"), make_version("2.6.10")]
+            data_file.write_text(json.dumps({"versions": versions}), encoding="utf-8")
+            readme_file.write_text(
+                "\n".join(
+                    [
+                        "Last Updated | 最后更新时间:  `2024-01-01 00:00:00`",
+                        "",
+                        "<!-- VERSION_TABLE_START -->",
+                        "| 版本号<br>Version | 发布日期<br>Release Date | macOS | Windows | Linux |",
+                        "|--------|----------|-------|---------|-------|",
+                        "| 2.6.17 | hand-edited | 暂无 | 暂无 | 暂无 |",
+                        "",
+                        "<!-- VERSION_TABLE_END -->",
+                        "",
+                        "## License",
+                    ]
+                ),
+                encoding="utf-8",
+            )
+            formatter = ReadmeFormatter(str(data_file), str(readme_file))
+
+            self.assertTrue(formatter.update_readme(new_entries=[versions[0]]))
+            rows = [line for line in readme_file.read_text(encoding="utf-8").splitlines() if line.startswith("| 2.")]
+            self.assertEqual([row.split("|")[1].strip() for row in rows], ["2.6.18", "2.6.17"])
+            self.assertIn("hand-edited", rows[1])
+
+            # 新增的版本比表格首行旧时需要重新生成整个表格
+            self.assertTrue(formatter.update_readme(new_entries=[versions[2]]))
+            content = readme_file.read_text(encoding="utf-8")
+            rows = [line for line in content.splitlines() if line.startswith("| 2.")]
+            self.assertEqual([row.split("|")[1].strip() for row in rows], ["2.6.18", "2.6.17", "2.6.10"])
+            self.assertNotIn("hand-edited", content)
+            self.assertTrue(content.endswith("<!-- VERSION_TABLE_END -->\n\n## License"))
+
+    def test_sharded_output_rewrites_only_touched_major_pages(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_file = Path(temp_dir) / "versions.json"
+            readme_file = Path(temp_dir) / "README.md"
+            shard_dir = Path(temp_dir) / "docs" / "versions"
+            versions = [make_version("2.6.18"), make_version("2.6.17"), make_version("1.7.54"), make_version("0.50.7")]
+            data_file.write_text(json.dumps({"versions": versions[1:]}), encoding="utf-8")
+            readme_file.write_text(
+                "\n".join(
+                    [
+                        "<!-- VERSION_TABLE_START -->",
+                        "<!-- VERSION_TABLE_END -->",
+                        "",
+                        "## License",
+                    ]
+                ),
+                encoding="utf-8",
+            )
+
+            formatter = ReadmeFormatter(str(data_file), str(readme_file), shard_dir=str(shard_dir), readme_limit=2)
+            self.assertTrue(formatter.update_readme())
+            self.assertEqual(sorted(path.name for path in shard_dir.iterdir()), ["0.x.md", "1.x.md", "2.x.md"])
+
+            frozen = shard_dir / "1.x.md"
+            frozen.write_text(frozen.read_text(encoding="utf-8") + "frozen\n", encoding="utf-8")
+
+            data_file.write_text(json.dumps({"versions": versions}), encoding="utf-8")
+            formatter = ReadmeFormatter(str(data_file), str(readme_file), shard_dir=str(shard_dir), readme_limit=2)
+            self.assertTrue(formatter.update_readme(new_entries=[versions[0]]))
+
+            readme = readme_file.read_text(encoding="utf-8")
+            readme_rows = [line.split("|")[1].strip() for line in readme.splitlines() if line.startswith("| ") and "." in line.split("|")[1]]
+            self.assertEqual(readme_rows, ["2.6.18", "2.6.17"])
+            self.assertIn("[1.x](docs/versions/1.x.md)", readme)
+            self.assertIn("| 2.6.18 |", (shard_dir / "2.x.md").read_text(encoding="utf-8"))
+            self.assertTrue(frozen.read_text(encoding="utf-8").endswith("frozen\n"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from src.utils import compare_versions, sort_version_entries
+from src.versioning import parse_version, version_key
+
+
+class VersioningTests(unittest.TestCase):
+    def test_pre_release_suffixes_sort_before_final_release(self) -> None:
+        versions = ["2.0.0", "2.0.0rc1", "2.0.0b2", "2.0.0a1", "2.0.0.dev1", "1.9.9", "2.0.0.post1"]
+
+        ordered = sorted(versions, key=version_key)
+
+        self.assertEqual(
+            ordered,
+            ["1.9.9", "2.0.0.dev1", "2.0.0a1", "2.0.0b2", "2.0.0rc1", "2.0.0", "2.0.0.post1"],
+        )
+
+    def test_trailing_zeros_compare_equal_and_invalid_versions_sort_last(self) -> None:
+        self.assertEqual(compare_versions("1.0", "1.0.0"), 0)
+        self.assertEqual(compare_versions("1.6.45", "1.6.6"), 1)
+
+        entries = sort_version_entries([{"version": "unknown"}, {"version": "0.1.0"}, {"version": "3.15.6"}])
+
+        self.assertEqual([item["version"] for item in entries], ["3.15.6", "0.1.0", "unknown"])
+
+    def test_parse_version_is_memoized(self) -> None:
+        self.assertIs(parse_version("3.14.27"), parse_version("3.14.27"))
+        self.assertEqual(parse_version("3.14.27").key, version_key("3.14.27"))
+
+
+if __name__ == "__main__":
+    unittest.main()
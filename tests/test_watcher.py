@@ -0,0 +1,67 @@
+import asyncio
+import os
+import random
+import signal
+import unittest
+
+from src.watcher import VersionWatcher
+
+
+class FakePipeline:
+    def __init__(self, results: list):
+        self.results = list(results)
+        self.runs = 0
+
+    async def run(self, probe: bool = True) -> dict:
+        self.runs += 1
+        return self.results.pop(0) if self.results else {"success": True, "new_version": False}
+
+
+class VersionWatcherTests(unittest.TestCase):
+    def test_interval_backs_off_when_quiet_and_resets_after_release(self) -> None:
+        watcher = VersionWatcher(FakePipeline([]), min_interval=60, max_interval=300, backoff=2.0, jitter=0)
+        quiet = {"success": True, "new_version": False}
+
+        self.assertEqual(
+            [watcher.next_interval(quiet) for _ in range(4)],
+            [120, 240, 300, 300],
+        )
+        self.assertEqual(watcher.next_interval({"success": True, "new_version": True}), 60)
+
+        watcher = VersionWatcher(FakePipeline([]), min_interval=100, jitter=0.1, rng=random.Random(1))
+        delays = [watcher._with_jitter(100) for _ in range(20)]
+        self.assertTrue(all(90 <= delay <= 110 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_sigterm_stops_watch_loop_between_polls(self) -> None:
+        pipeline = FakePipeline([])
+        watcher = VersionWatcher(pipeline, min_interval=60, jitter=0)
+
+        async def run() -> None:
+            watcher.install_signal_handlers()
+            asyncio.get_running_loop().call_later(0.05, os.kill, os.getpid(), signal.SIGTERM)
+            await asyncio.wait_for(watcher.run(), timeout=5)
+
+        asyncio.run(run())
+
+        self.assertEqual(pipeline.runs, 1)
+        self.assertEqual(watcher.polls, 1)
+
+    def test_failed_poll_keeps_watching(self) -> None:
+        class FailingPipeline(FakePipeline):
+            async def run(self, probe: bool = True) -> dict:
+                self.runs += 1
+                if self.runs == 1:
+                    raise RuntimeError("boom")
+                return {"success": True, "new_version": True, "version": "2.6.18"}
+
+        pipeline = FailingPipeline([])
+        watcher = VersionWatcher(pipeline, min_interval=0, jitter=0)
+
+        asyncio.run(watcher.run(max_polls=2))
+
+        self.assertEqual(pipeline.runs, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()